@@ -0,0 +1,112 @@
+"""
+This module generates the synthetic address books and notebooks used by the benchmarks.
+
+The data depends only on the size and the seed, so every run and every machine benchmarks
+the same books. Contacts get a unique name, one or two phones, and most of them a birthday,
+an email and an address; notes get a title, a few sentences of text and one to three tags.
+
+Usage:
+    python -m benchmarks.data [size]   (prints a sample of the generated data)
+"""
+import random
+import sys
+
+from src.contacts.address_book import AddressBook
+from src.contacts.record import Record
+from src.notes.note import Note
+from src.notes.notebook import NoteBook
+
+SIZES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+FIRST_NAMES = ["Olena", "Taras", "Anna", "John", "Maria", "Petro", "Sofia", "Andrii", "Emma",
+               "Ivan", "Kateryna", "Oleh", "Iryna", "David", "Laura", "Mykola", "Nina", "Paul"]
+FAMILY_NAMES = ["Shevchenko", "Kovalenko", "Smith", "Bondarenko", "Tkachenko", "Brown",
+                "Kravchenko", "Melnyk", "Oliinyk", "Garcia", "Lysenko", "Moroz", "Wilson"]
+STREETS = ["Main Street", "Khreshchatyk", "Shevchenko Avenue", "Park Lane", "Sadova", "Lesi Ukrainky"]
+CITIES = ["Kyiv", "Lviv", "Odesa", "Kharkiv", "Dnipro", "Springfield"]
+WORDS = ["meeting", "server", "budget", "release", "review", "draft", "customer", "invoice",
+         "backup", "deploy", "call", "report", "travel", "doctor", "birthday", "gift", "recipe",
+         "train", "ticket", "holiday", "project", "deadline", "migration", "database", "garden"]
+TAGS = ["work", "home", "urgent", "ideas", "finance", "health", "family", "travel", "later", "done"]
+
+
+def parse_size(size):
+    """Returns the number of entries for a size name (1k, 100k, 1m) or a plain number."""
+    size = size.lower()
+    if size in SIZES:
+        return SIZES[size]
+    if size.isdigit():
+        return int(size)
+    raise ValueError(f"Unknown size: {size}. Use {', '.join(SIZES)} or a number.")
+
+
+def contact_name(i):
+    """Returns the unique name of the i-th generated contact."""
+    return f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {FAMILY_NAMES[i // len(FIRST_NAMES) % len(FAMILY_NAMES)]} {i}"
+
+
+def contact_email(i):
+    """Returns the email of the i-th generated contact; contacts whose i is a multiple of 5 have none."""
+    return None if i % 5 == 0 else f"user{i}@example.com"
+
+
+def generate_records(size, seed=0, start=0):
+    """Yields `size` pseudo-random contacts, numbered from `start`."""
+    rng = random.Random(seed * 1000003 + start)
+    for i in range(start, start + size):
+        record = Record(contact_name(i))
+        record.add_phone(f"{rng.randrange(10**10):010d}")
+        if rng.random() < 0.3:
+            record.add_phone(f"{rng.randrange(10**10):010d}")
+        if rng.random() < 0.8:
+            record.add_birthday(f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1950, 2010)}")
+        email = contact_email(i)
+        if email:
+            record.add_email(email)
+        if rng.random() < 0.6:
+            record.add_address(f"{rng.randint(1, 200)} {rng.choice(STREETS)}, {rng.choice(CITIES)}")
+        yield record
+
+
+def build_address_book(size, seed=0):
+    """Builds an address book of `size` generated contacts."""
+    book = AddressBook()
+    for record in generate_records(size, seed):
+        book.add_record(record)
+    book.dirty = False
+    return book
+
+
+def note_title(i):
+    """Returns the unique title of the i-th generated note."""
+    return f"{WORDS[i % len(WORDS)].capitalize()} note {i}"
+
+
+def generate_notes(size, seed=0):
+    """Yields `size` pseudo-random notes."""
+    rng = random.Random(seed)
+    for i in range(size):
+        text = ". ".join(" ".join(rng.choices(WORDS, k=rng.randint(4, 9))) for _ in range(rng.randint(1, 3)))
+        tags = ", ".join(rng.sample(TAGS, rng.randint(1, 3)))
+        yield Note(note_title(i), text.capitalize() + ".", tags)
+
+
+def build_notebook(size, seed=0):
+    """Builds a notebook of `size` generated notes."""
+    notebook = NoteBook()
+    for note in generate_notes(size, seed):
+        notebook.add_note(note)
+    notebook.dirty = False
+    return notebook
+
+
+def main():
+    size = parse_size(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for record in generate_records(size):
+        print(record)
+    for note in generate_notes(size):
+        print(f"{note}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+This module measures the memory taken by each contact and note, and the size of their
+pickles, using tracemalloc. Only the records are counted, not the book or its indexes.
+
+Usage:
+    python -m benchmarks.memory [number_of_records]
+"""
+import pickle
+import random
+import sys
+import tracemalloc
+
+from src.contacts.record import Record
+from src.notes.note import Note
+
+
+def build_records(size, seed=0):
+    """Builds contacts with a name, two phones, a birthday, an email and an address."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(size):
+        record = Record(f"Person {i} Surname{rng.randint(0, 999)}")
+        record.add_phone(f"{rng.randint(0, 10**10 - 1):010d}")
+        record.add_phone(f"{rng.randint(0, 10**10 - 1):010d}")
+        record.add_birthday(f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1950, 2010)}")
+        record.add_email(f"person{i}@example.com")
+        record.add_address(f"{rng.randint(1, 200)} Main Street, Springfield")
+        records.append(record)
+    return records
+
+
+def build_notes(size, seed=0):
+    """Builds notes with a title, a short text and two tags."""
+    rng = random.Random(seed)
+    return [Note(f"Note {i}", f"Text of note {i}: {rng.random()}", f"tag{rng.randint(0, 99)}, work")
+            for i in range(size)]
+
+
+def measure(build, size):
+    """Returns the bytes allocated per object by build(size) and the pickled bytes per object."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build(size)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    pickled = len(pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL))
+    return allocated / size, pickled / size
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{size} objects each")
+    print(f"{'':<10}{'bytes in memory':>17}{'bytes pickled':>15}")
+    for name, build in (("contact", build_records), ("note", build_notes)):
+        in_memory, pickled = measure(build, size)
+        print(f"{name:<10}{in_memory:>17.0f}{pickled:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
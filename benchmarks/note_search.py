@@ -0,0 +1,63 @@
+"""
+This module benchmarks substring note search: the trigram-narrowed NoteBook.find_notes
+against the original list comprehensions, which are kept as NoteBook._scan.
+
+Usage:
+    python -m benchmarks.note_search [number_of_notes]
+"""
+import random
+import sys
+import time
+
+from src.notes.note import Note
+from src.notes.notebook import NoteBook
+
+COMMON = ["meeting", "server", "budget", "release", "review", "draft", "customer"]
+QUERIES = [("meet", "all"), ("conf", "all"), ("reconfig", "text"), ("budget", "title"),
+           ("backup", "tags"), ("zzz", "all"), ("customer review", "text"), ("ab", "text")]
+
+
+def build_notebook(size, seed=0):
+    """Builds a notebook of pseudo-random notes that is the same for every run."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    rare = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(20000)]
+    rare += ["reconfigure", "backup", "conference"]
+    notebook = NoteBook()
+    for i in range(size):
+        words = [rng.choice(COMMON) if rng.random() < 0.3 else rng.choice(rare) for _ in range(60)]
+        title = f"{' '.join(words[:3])} {i}"
+        text = " ".join(words)
+        tags = ", ".join(rng.sample(rare, 2))
+        notebook.add_note(Note(title, text, tags))
+    return notebook
+
+
+def best_of(func, repeat=5):
+    """Returns the fastest of several timed calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    notebook = build_notebook(size)
+
+    start = time.perf_counter()
+    notebook.find_notes("warm", "all")
+    print(f"{size} notes, index build: {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    print(f"{'query':<22}{'field':<7}{'scan ms':>10}{'index ms':>10}{'speedup':>9}")
+    for term, field in QUERIES:
+        assert notebook.find_notes(term, field) == notebook._scan(term, field)
+        scan = best_of(lambda: notebook._scan(term, field))
+        indexed = best_of(lambda: notebook.find_notes(term, field))
+        print(f"{term!r:<22}{field:<7}{scan:>10.2f}{indexed:>10.2f}{scan / indexed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+This module times the hot paths of the bot on generated books (see `benchmarks.data`)
+and compares the timings with a stored baseline.
+
+For every size it times:
+- AddressBook.add_record, find and delete;
+- show-contact by email;
+- AddressBook.get_upcoming_birthdays;
+- NoteBook.find_notes for each search_in field;
+- rendering pages of all-contacts and all-notes, as lists and tables, into a null sink;
+- save_data and load_data of both books, with the pickle and record store backends
+  (the SQLite backend writes every change through, so it has no snapshot save to time).
+
+The first use of a lazily built index is timed on its own (the `*_index_build` entries),
+so the other entries measure warm lookups. Each entry is the best of several runs.
+
+The results can be written as JSON, and a later run can be compared against them: an
+operation is flagged as a regression when it is slower than the baseline by more than the
+threshold ratio. With regressions, the exit status is 1.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1k,100k,1m] [--output FILE] [--baseline FILE]
+                               [--threshold 1.25] [--repeat 3] [--backends pkl,rec]
+"""
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.data import (build_address_book, build_notebook, contact_email, contact_name,
+                             generate_records, parse_size)
+from src.contacts.address_book import AddressBook
+from src.contacts.commands import all_contacts, show_contact
+from src.notes.note_commands import all_notes
+from src.notes.notebook import NoteBook
+from src.utils.persistence import load_data, save_data
+
+# Lookups, additions and deletions per timed run
+QUERIES = 1000
+NOTE_QUERIES = {
+    "title": ["budget", "note 12", "zzz"],
+    "text": ["deploy", "server migration", "aba"],
+    "tags": ["urgent", "fin", "nothing"],
+    "all": ["travel", "review draft", "qqq"],
+}
+# Timings shorter than this are too noisy to be flagged as regressions
+MIN_SECONDS = 0.001
+
+
+def timed(func, repeat=1):
+    """Returns the best wall time of `repeat` calls of func, in seconds."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def entry(seconds, ops):
+    """Builds a result entry for `ops` operations that took `seconds` together."""
+    return {"ops": ops, "seconds": round(seconds, 6), "us_per_op": round(seconds / ops * 1e6, 3)}
+
+
+def bench_contacts(book, size, repeat, seed=0):
+    """Times the address book operations; yields (name, entry) pairs."""
+    rng = random.Random(seed)
+    names = [contact_name(rng.randrange(size)) for _ in range(QUERIES)]
+    emails = [email for email in (contact_email(rng.randrange(size)) for _ in range(QUERIES)) if email]
+    extra = list(generate_records(QUERIES, seed, start=size))
+
+    def add_and_delete():
+        nonlocal add_seconds, delete_seconds
+        start = time.perf_counter()
+        for record in extra:
+            book.add_record(record)
+        middle = time.perf_counter()
+        for record in extra:
+            book.delete(record.name.value)
+        add_seconds = min(add_seconds, middle - start)
+        delete_seconds = min(delete_seconds, time.perf_counter() - middle)
+
+    add_seconds = delete_seconds = math.inf
+    for _ in range(repeat):
+        add_and_delete()
+    yield "contacts.add_record", entry(add_seconds, len(extra))
+    yield "contacts.delete", entry(delete_seconds, len(extra))
+    yield "contacts.find", entry(timed(lambda: [book.find(name) for name in names], repeat), len(names))
+    yield "contacts.show_contact_by_email", entry(
+        timed(lambda: [show_contact([email], book) for email in emails], repeat), len(emails))
+    yield "contacts.birthday_index_build", entry(timed(lambda: book.get_upcoming_birthdays(7)), 1)
+    for days in (7, 30):
+        yield f"contacts.upcoming_birthdays_{days}d", entry(
+            timed(lambda: book.get_upcoming_birthdays(days), repeat), 1)
+
+
+def bench_notes(notebook, repeat):
+    """Times the note searches; yields (name, entry) pairs."""
+    yield "notes.index_build", entry(timed(lambda: notebook.find_notes("warm", "all")), 1)
+    for search_in, terms in NOTE_QUERIES.items():
+        yield f"notes.find_notes_{search_in}", entry(
+            timed(lambda: [notebook.find_notes(term, search_in) for term in terms], repeat), len(terms))
+
+
+def bench_rendering(book, notebook, repeat):
+    """Times rendering the first, middle and last pages into a null sink; yields (name, entry) pairs."""
+    for kind, command, data in (("contacts", all_contacts, book), ("notes", all_notes, notebook)):
+        pages = max(1, -(-len(data) // 50))
+        numbers = sorted({1, (pages + 1) // 2, pages})
+        for style, options in (("list", []), ("table", ["--table"])):
+            calls = [["--page", str(number)] + options for number in numbers]
+            with open(os.devnull, "w") as sink, redirect_stdout(sink):
+                seconds = timed(lambda: [command(args, data) for args in calls], repeat)
+            yield f"{kind}.render_{style}_page", entry(seconds, len(calls))
+
+
+def bench_storage(book, notebook, backends, repeat):
+    """Times saving and loading both books for each backend; yields (name, entry) pairs."""
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            for kind, book_data, factory in (("contacts", book, AddressBook), ("notes", notebook, NoteBook)):
+                filename = os.path.join(directory, f"{kind}.{backend}")
+                data = book_data
+                if backend != "pkl":
+                    # The record store only writes books loaded from a store, so copy into one
+                    data = load_data(filename, factory)
+                    data.data.update(book_data.data)
+
+                def save():
+                    # An unchanged book is not saved again
+                    data.dirty = True
+                    save_data(data, filename)
+
+                yield f"{kind}.save_{backend}", entry(timed(save, repeat), 1)
+                yield f"{kind}.load_{backend}", entry(timed(lambda: len(load_data(filename, factory)), repeat), 1)
+
+
+def run_size(label, size, repeat, backends):
+    """Builds the books of one size and runs every benchmark on them; returns the entries."""
+    results = {}
+
+    def record(name, result):
+        results[name] = result
+        print(f"  {name:<36}{result['us_per_op']:>14.1f} us/op{result['seconds'] * 1000:>12.1f} ms", flush=True)
+
+    print(f"{label} ({size} contacts, {size} notes)")
+    start = time.perf_counter()
+    book = build_address_book(size)
+    record("contacts.build", entry(time.perf_counter() - start, size))
+    start = time.perf_counter()
+    notebook = build_notebook(size)
+    record("notes.build", entry(time.perf_counter() - start, size))
+    for benchmark in (bench_contacts(book, size, repeat), bench_notes(notebook, repeat),
+                      bench_rendering(book, notebook, repeat),
+                      bench_storage(book, notebook, backends, repeat)):
+        for name, result in benchmark:
+            record(name, result)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares the results with a baseline run and prints the changes.
+
+    Returns:
+        list: The (size, operation, ratio) of the operations slower than the baseline
+            by more than the threshold ratio.
+    """
+    regressions = []
+    print(f"\nCompared with the baseline of {baseline['meta'].get('created', 'unknown date')} "
+          f"(regression threshold {threshold:.2f}x):")
+    for label, entries in results["results"].items():
+        for name, result in entries.items():
+            base = baseline["results"].get(label, {}).get(name)
+            if base is None or not base["us_per_op"]:
+                continue
+            ratio = result["us_per_op"] / base["us_per_op"]
+            flag = ""
+            if ratio > threshold and result["seconds"] >= MIN_SECONDS:
+                regressions.append((label, name, ratio))
+                flag = "  REGRESSION"
+            elif ratio < 1 / threshold:
+                flag = "  faster"
+            print(f"  {label:<6}{name:<36}{base['us_per_op']:>12.1f}{result['us_per_op']:>12.1f} us/op"
+                  f"{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot on generated address books and notebooks.")
+    parser.add_argument("--sizes", default="1k,100k",
+                        help="comma-separated sizes: 1k, 100k, 1m or a number (default: 1k,100k)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing; the best is kept (default: 3)")
+    parser.add_argument("--backends", default="pkl,rec",
+                        help="file backends to save and load with: pkl, rec or both (default: pkl,rec)")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare the results with a previous JSON output")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio flagged as a regression (default: 1.25)")
+    options = parser.parse_args()
+    if options.threshold <= 1:
+        parser.error("--threshold must be greater than 1.")
+
+    try:
+        sizes = [(label.strip().lower(), parse_size(label.strip())) for label in options.sizes.split(",")]
+    except ValueError as e:
+        parser.error(str(e))
+    backends = [backend.strip().lstrip(".") for backend in options.backends.split(",") if backend.strip()]
+    if not backends or set(backends) - {"pkl", "rec"}:
+        parser.error("--backends takes pkl, rec or both.")
+    baseline = None
+    if options.baseline:
+        with open(options.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": options.repeat,
+            "backends": backends,
+        },
+        "results": {label: run_size(label, size, options.repeat, backends) for label, size in sizes},
+    }
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nResults written to {options.output}.")
+    if baseline is not None:
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression{'s' if len(regressions) > 1 else ''}.")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+This module benchmarks field validation: the field constructors of the baseline commit,
+the last one before `src.utils.validation` was added, against the current field
+constructors and the batch `validate_many`, on inputs with one invalid value in ten.
+
+The baseline `src/contacts/fields.py` is read with `git show` and loaded as a module of
+its own, so the comparison runs the code that actually shipped before the change. Pass
+`--baseline REV` to compare with another revision instead.
+
+Usage:
+    python -m benchmarks.validation [number_of_values] [--baseline REV]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import time
+
+from src.contacts.fields import Address, Birthday, Email, Phone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIELDS_PATH = "src/contacts/fields.py"
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+
+def default_baseline():
+    """Returns the commit before the one that added src/utils/validation.py."""
+    added = git("log", "-1", "--format=%H", "--diff-filter=A", "--", "src/utils/validation.py").strip()
+    if not added:
+        raise SystemExit("src/utils/validation.py is not in the history; pass --baseline REV.")
+    return f"{added}^"
+
+
+def load_baseline_fields(revision):
+    """Loads src/contacts/fields.py as it was at a revision, as the module `baseline_fields`."""
+    source = git("show", f"{revision}:{FIELDS_PATH}")
+    spec = importlib.util.spec_from_loader("baseline_fields", loader=None, origin=f"{revision}:{FIELDS_PATH}")
+    module = importlib.util.module_from_spec(spec)
+    exec(compile(source, spec.origin, "exec"), module.__dict__)
+    return module
+
+
+def build_values(size, seed=0):
+    """Builds the inputs of each field, the same for every run; one in ten is invalid."""
+    rng = random.Random(seed)
+
+    def pick(valid, invalid):
+        return [invalid() if rng.random() < 0.1 else valid() for _ in range(size)]
+
+    return {
+        "phone": pick(lambda: f"{rng.randint(0, 10**10 - 1):010d}",
+                      lambda: rng.choice(["12345", "12345678901", "abcdefghij", "050-123-45"])),
+        "birthday": pick(lambda: f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1950, 2010)}",
+                         lambda: rng.choice(["31.02.2000", "1990-01-01", "29.02.2001", "00.01.2000"])),
+        "email": pick(lambda: f"user{rng.randint(0, 10**6)}@example.com",
+                      lambda: rng.choice(["user@", "no-at.example.com", "a b@example.com"])),
+        "address": pick(lambda: f"{rng.randint(1, 200)} Main Street, Springfield",
+                        lambda: "x" * 101),
+    }
+
+
+def one_by_one(build, values):
+    """Builds a field per value, catching an exception per invalid value; returns the fields."""
+    fields = []
+    for value in values:
+        try:
+            fields.append(build(value))
+        except ValueError:
+            fields.append(None)
+    return fields
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark field validation against a baseline revision.")
+    parser.add_argument("size", nargs="?", type=int, default=1000000, help="values per field (default: 1000000)")
+    parser.add_argument("--baseline", metavar="REV",
+                        help="the revision to compare with (default: the commit before src/utils/validation.py)")
+    options = parser.parse_args()
+    revision = options.baseline or default_baseline()
+    baseline = load_baseline_fields(revision)
+    size = options.size
+    values = build_values(size)
+    fields = (("phone", baseline.Phone, Phone), ("birthday", baseline.Birthday, Birthday),
+              ("email", baseline.Email, Email), ("address", baseline.Address, Address))
+
+    print(f"Baseline: {git('log', '-1', '--format=%h %s', revision).strip()}")
+    print(f"{size} values per field, {size // 10} of them invalid on average\n")
+    print(f"{'field':<10}{'before s':>10}{'fields s':>10}{'batch s':>10}{'speedup':>10}")
+    for name, before, field in fields:
+        inputs = values[name]
+        built_before, before_seconds = timed(lambda: one_by_one(before, inputs))
+        built_fields, fields_seconds = timed(lambda: one_by_one(field, inputs))
+        results, batch_seconds = timed(lambda: field.validate_many(inputs))
+        assert ([built is None for built in built_before] == [built is None for built in built_fields]
+                == [built is None for built, _ in results]), name
+        del built_before, built_fields, results
+        print(f"{name:<10}{before_seconds:>10.2f}{fields_seconds:>10.2f}{batch_seconds:>10.2f}"
+              f"{before_seconds / batch_seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
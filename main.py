@@ -1,81 +1,131 @@
 """
 This is the main file of the assistant bot. It is responsible for the interaction with the user.
+
+Heavy dependencies (prompt_toolkit, colorama, tabulate) are imported only when they are
+needed, so the welcome line is printed before any of them are loaded. Run with
+`--startup-profile` to see how long each startup phase takes.
 """
-from src.utils.promt_session import get_promt_session
-from src.utils.command_completer import CommandCompleter
-from src.constants.controls import COMMANDS
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import sys
+
+from src.utils.command_registry import REGISTRY
 from src.constants.file_names import CONTACTS_FILE_NAME, NOTES_FILE_NAME
-from src.notes.note_commands import add_note, find_notes_interactive
-from src.features.help import print_help
+from src.utils.metrics import METRICS
 from src.utils.persistence import save_data, load_data
-from src.utils.utils import parse_input
+from src.utils.startup import StartupProfile
 from src.contacts.address_book import AddressBook
 from src.notes.notebook import NoteBook
-from src.contacts.commands import add_contact, change_contact, delete_contact, show_contact, add_birthday, show_birthday, birthdays
 
 
-def main():
+def parse_arguments(argv=None):
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(description="The assistant bot for contacts and notes.")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run the commands in FILE (or standard input) in one transaction, without the prompt")
+    parser.add_argument("--yes", action="store_true",
+                        help="in batch mode, answer 'yes' to every confirmation (the default is 'no'); optional offers are always declined")
+    parser.add_argument("--quiet", action="store_true",
+                        help="in batch mode, do not print the output of the commands")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append the latency metrics of the commands to FILE (JSON Lines) when the session ends")
+    parser.add_argument("--autosave", type=float, metavar="SECONDS",
+                        help="save the changed books in the background every SECONDS seconds")
+    parser.add_argument("--warm-indexes", action="store_true",
+                        help="build the search and birthday indexes in the background after startup")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print the time spent in each startup phase and exit")
+    parser.add_argument("--startup-budget", type=float, metavar="MS",
+                        help="with --startup-profile, exit with status 1 if startup takes longer than MS milliseconds")
+    options = parser.parse_args(argv)
+    if options.autosave is not None and options.autosave <= 0:
+        parser.error("--autosave takes a positive number of seconds.")
+    return options
+
+
+def save_books(state):
+    """Save both books and report what was written."""
+    for data, file_name in ((state["book"], CONTACTS_FILE_NAME), (state["notebook"], NOTES_FILE_NAME)):
+        stats = save_data(data, file_name)
+        if stats is not None:
+            print(f"Saved {stats.bytes_written} bytes to {stats.filename} in {stats.seconds * 1000:.1f} ms.")
+
+
+def run_batch_mode(options):
+    """Run a command script without the prompt and save the books once at the end."""
+    from src.utils.batch import run_batch
+
+    state = {"book": load_data(CONTACTS_FILE_NAME, AddressBook),
+             "notebook": load_data(NOTES_FILE_NAME, NoteBook)}
+    try:
+        if options.batch == "-":
+            stats = run_batch(sys.stdin, state, "yes" if options.yes else "no", options.quiet)
+        else:
+            with open(options.batch, encoding="utf-8") as script:
+                stats = run_batch(script, state, "yes" if options.yes else "no", options.quiet)
+    except Exception as e:
+        print(f"The batch was stopped by an error, nothing was saved: {e!r}")
+        return 1
+    finally:
+        if options.metrics:
+            METRICS.flush(options.metrics)
+    save_books(state)
+    rate = stats.commands / stats.seconds if stats.seconds else 0.0
+    print(f"Ran {stats.commands} commands in {stats.seconds:.2f} s ({rate:.0f} commands/s).")
+    return 0
+
+
+def main(argv=None):
     """
     The main function to run the assistant bot.
     """
+    options = parse_arguments(argv)
+    if options.batch is not None:
+        return run_batch_mode(options)
+
+    profile = StartupProfile(STARTED)
+    profile.lap("imports")
+    print("Welcome to the assistant bot! Type 'help' to see the list of available commands.")
+
     # Load data from files
     book = load_data(CONTACTS_FILE_NAME, AddressBook)
     notebook = load_data(NOTES_FILE_NAME, NoteBook)
-    print("Welcome to the assistant bot! Type 'help' to see the list of available commands.")
+    state = {"book": book, "notebook": notebook}
+    profile.lap("data load")
+
+    # prompt_toolkit is the heaviest dependency, so it is imported only once the data is loaded
+    from src.utils.promt_session import get_promt_session
+    from src.utils.command_completer import CommandCompleter, CompletionEngine
+    profile.lap("prompt_toolkit import")
 
-    # Initialize the PromptSession with the CommandCompleter
-    command_completer = CommandCompleter(COMMANDS.values())
+    # Initialize the PromptSession with the CommandCompleter, run off the UI thread
+    command_completer = CompletionEngine(CommandCompleter(REGISTRY, book))
+    METRICS.completion = command_completer.latency
     session = get_promt_session(command_completer)
+    profile.lap("prompt session")
+
+    if options.startup_profile:
+        print(profile.report())
+        if options.startup_budget is not None and profile.total * 1000 > options.startup_budget:
+            print(f"Startup took longer than the budget of {options.startup_budget:g} ms.")
+            return 1
+        return 0
+
+    # asyncio is only needed by the interactive loop, so batch runs and profiles do not load it
+    import asyncio
+    from src.utils.repl import Repl
 
     try:
-        while True:
-            try:
-                # Get user input
-                user_input = session.prompt("Enter a command: ", default="")
-                command, *args = parse_input(user_input)
-
-                # Check the command and execute the corresponding function
-                if command in COMMANDS.values():
-                    if command == COMMANDS['hello']:
-                        print("How can I help you?")
-                    elif command == COMMANDS['add_contact']:
-                        print(add_contact(args, book))
-                    elif command == COMMANDS['change_contact']:
-                        print(change_contact(args, book))
-                    elif command == COMMANDS['delete_contact']:
-                        print(delete_contact(args, book))
-                    elif command == COMMANDS['show_contact']:
-                        print(show_contact(args, book))
-                    elif command == COMMANDS['all_contacts']:
-                        book.display_all_contacts()
-                    elif command == COMMANDS['add_birthday']:
-                        print(add_birthday(args, book))
-                    elif command == COMMANDS['show_birthday']:
-                        print(show_birthday(args, book))
-                    elif command == COMMANDS['birthdays']:
-                        print(birthdays(args, book))
-                    elif command == COMMANDS['add_note']:
-                        print(add_note(notebook))
-                    elif command == COMMANDS['all_notes']:
-                        notebook.display_all_notes()
-                    elif command == COMMANDS['find_notes']:
-                        print(find_notes_interactive(notebook))
-                    elif command == COMMANDS['help']:
-                        print_help()
-                    elif command in [COMMANDS['close'], COMMANDS['exit']]:
-                        print("Good bye!")
-                        break
-                    else:
-                        print("Invalid command.")
-                else:
-                    print("Invalid command.")
-            except KeyboardInterrupt:
-                print("\nUse 'close' or 'exit' to quit.")
+        # Read commands on the event loop; commands that touch the books run on a worker thread
+        asyncio.run(Repl(session, state, options.autosave, options.warm_indexes).run())
     finally:
         # Save data to files before exiting
-        save_data(book, CONTACTS_FILE_NAME)
-        save_data(notebook, NOTES_FILE_NAME)
-
+        save_books(state)
+        if options.metrics:
+            METRICS.flush(options.metrics)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
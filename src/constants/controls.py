@@ -9,13 +9,21 @@ COMMANDS = {
     "change_contact": "change-contact",
     "delete_contact": "delete-contact",
     "show_contact": "show-contact",
+    "find_by_phone": "find-by-phone",
     "all_contacts": "all-contacts",
     "add_birthday": "add-birthday",
     "show_birthday": "show-birthday",
     "birthdays": "birthdays",
+    "import_contacts": "import-contacts",
+    "export_contacts": "export-contacts",
     "add_note": "add-note",
     "all_notes": "all-notes",
     "find_notes": "find-notes",
+    "tags": "tags",
+    "stats": "stats",
+    "mem_report": "mem-report",
+    "jobs": "jobs",
+    "cancel": "cancel",
     "help": "help",
     "close": "close",
     "exit": "exit"
@@ -2,15 +2,28 @@
 AddressBook class built on top of Python's UserDict class. 
 It provides functionality to store, retrieve, update, and delete contact records, 
 as well as manage additional features like searching, 
-displaying upcoming birthdays, and showing all contacts
+displaying upcoming birthdays, and handing out contacts one page at a time
 """
-from collections import UserDict
 from datetime import datetime, timedelta
+from src.utils.persistence import PersistentDict
+from src.contacts.fields import Phone
+from src.contacts.indexes import EmailIndex, PhoneIndex, BirthdayIndex, FuzzyNameIndex, NamePrefixIndex, next_birthday
 
-class AddressBook(UserDict):
+
+class AddressBook(PersistentDict):
     """
     The AddressBook class serves as a container for managing contact records
     """
+    storage_kind = "contacts"
+    # The secondary indexes the address book can build, by name
+    INDEXES = {
+        "emails": EmailIndex,
+        "phones": PhoneIndex,
+        "birthdays": BirthdayIndex,
+        "fuzzy_names": FuzzyNameIndex,
+        "name_prefixes": NamePrefixIndex,
+    }
+
     def add_record(self, record):
         """
         Adds a contact record to the address book.
@@ -26,8 +39,90 @@ class AddressBook(UserDict):
         """
         if record.name.value in self.data:
             raise ValueError("Record with this name already exists.")
+        if record.email:
+            self.check_email(record, record.email)
+        self.data[record.name.value] = record
+        self._adopt(record)
+        for index in self._built_indexes():
+            index.add(record)
+        self._log("put", record.name.value, record)
+
+    def merge_records(self, records):
+        """
+        Adds many validated records at once, merging each into the existing contact of the
+        same name, if there is one. The changes are journaled in a single write.
+
+        Args:
+            records (iterable): The Record objects to merge in.
+
+        Returns:
+            tuple: (number of added contacts, number of updated contacts,
+                    list of (record, error message) pairs for the rejected records).
+        """
+        merged, rejected = [], []
+        added = 0
+        for record in records:
+            if record.email:
+                try:
+                    self.check_email(record, record.email)
+                except ValueError as e:
+                    rejected.append((record, str(e)))
+                    continue
+            existing = self.data.get(record.name.value)
+            if existing is None:
+                self.data[record.name.value] = record
+                self._adopt(record)
+                for index in self._built_indexes():
+                    index.add(record)
+                added += 1
+            else:
+                existing.merge(record)
+                record = existing
+                self.data[record.name.value] = record
+                for index in self._built_indexes():
+                    index.update(record)
+            merged.append(record)
+        self._log_many("put", [(record.name.value, record) for record in merged])
+        return added, len(merged) - added, rejected
+
+    def record_changed(self, record):
+        """
+        Records that a contact stored in the address book was modified in place.
+
+        Args:
+            record (Record): The changed contact record.
+        """
+        # Database-backed books write the record through to their table
         self.data[record.name.value] = record
+        for index in self._built_indexes():
+            index.update(record)
+        self._log("put", record.name.value, record)
 
+    def _adopt(self, record):
+        record._book = self
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        for record in self.data.values():
+            self._adopt(record)
+
+
+    def iter_records(self, has_birthday=False, has_email=False):
+        """
+        Yields the contact records one at a time, optionally filtered.
+
+        Args:
+            has_birthday (bool): Only yield contacts with a birthday.
+            has_email (bool): Only yield contacts with an email.
+        """
+        # A database-backed book applies the filters in its query
+        select_contacts = getattr(self.data, "select_contacts", None)
+        if select_contacts is not None:
+            yield from select_contacts(has_birthday, has_email)
+            return
+        for record in self.data.values():
+            if (not has_birthday or record.birthday) and (not has_email or record.email):
+                yield record
 
     def find(self, query):
         """
@@ -40,9 +135,103 @@ class AddressBook(UserDict):
             Record or None: If the contact is found, the corresponding Record object is returned.
                             If no match is found, None is returned.
         """
-        # Find a record by query
+        # Find a record by query; a database-backed book answers it with a primary-key lookup
         return self.data.get(query)
 
+    def complete_name(self, prefix, limit=20, build=True):
+        """
+        Lists the contact names starting with a prefix, ignoring case, for autocompletion.
+
+        Args:
+            prefix (str): The part of the name typed so far.
+            limit (int): The maximum number of names to return.
+            build (bool): Whether to build the name index if it is not built yet; the
+                completion thread passes False, as only the thread changing the book may.
+
+        Returns:
+            list: Matching contact names in alphabetical order, or None if the index is
+                not built and build is False.
+        """
+        index = self._index("name_prefixes", build)
+        return None if index is None else index.complete(prefix, limit)
+
+    def suggest_names(self, query, limit=3):
+        """
+        Suggests the names of existing contacts closest to a name that was not found.
+
+        Args:
+            query (str): The name that was looked up.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: Contact names one typo (or one swapped pair of letters) away from the query,
+                  closest first.
+        """
+        return self._index("fuzzy_names").closest(query, limit)
+
+    def find_by_email(self, email):
+        """
+        Finds the contact record using an email address, ignoring case.
+
+        Args:
+            email (str): The email address to look up.
+
+        Returns:
+            Record or None: The record with this email, or None if no contact uses it.
+        """
+        # A database-backed book looks the email up in its own index
+        find_by_email = getattr(self.data, "find_by_email", None)
+        if find_by_email is not None:
+            return find_by_email(EmailIndex.key(email))
+        name = self._index("emails").get(email)
+        return self.data.get(name) if name is not None else None
+
+    def phone_owners(self, number):
+        """
+        Returns the names of the contacts using a phone number.
+
+        Args:
+            number (int): The phone number, packed with Phone.pack.
+
+        Returns:
+            set: The contact names; empty if nobody uses the number.
+        """
+        # A database-backed book looks the number up in its own phone table
+        phone_owners = getattr(self.data, "phone_owners", None)
+        if phone_owners is not None:
+            return phone_owners(number)
+        return self._index("phones").get(number)
+
+    def find_by_phone(self, phone):
+        """
+        Finds the contacts using a phone number.
+
+        Args:
+            phone (str): The 10-digit phone number.
+
+        Returns:
+            list: The records with this phone number, sorted by name.
+
+        Raises:
+            ValueError: If the phone number is invalid.
+        """
+        return [self.data[name] for name in sorted(self.phone_owners(Phone.pack(phone)))]
+
+    def check_email(self, record, email):
+        """
+        Makes sure an email is not used by a contact other than the given record.
+
+        Args:
+            record (Record): The record that is about to use the email.
+            email (Email or str): The email address.
+
+        Raises:
+            ValueError: If another contact already uses this email.
+        """
+        owner = self.find_by_email(str(email))
+        if owner is not None and owner.name.value != record.name.value:
+            raise ValueError(f"Email {email} is already used by {owner.name.value}.")
+
     def delete(self, name):
         """
         Deletes a contact record from the address book by name.
@@ -58,60 +247,46 @@ class AddressBook(UserDict):
         """
         # Check if the contact exists in the address book
         if name in self.data:
-            del self.data[name]
+            record = self.data.pop(name)
+            record._book = None
+            for index in self._built_indexes():
+                index.discard(record)
+            self._log("delete", name)
         else:
             raise ValueError("Record not found.")
         
     def get_upcoming_birthdays(self, days):
         """
         this function shows all upcoming birthdays from address.book buding perion entered in the input
+
+        Only the days inside the window are looked up in the birthday index. Birthdays on
+        29 February are celebrated on 28 February in non-leap years.
         """
         today = datetime.today().date()
         end_date = today + timedelta(days=days)
 
         upcoming_birthdays = []
 
-        for record in self.data.values():
-            # Ensure the record has a valid birthday value
-            if not (hasattr(record, 'birthday') and record.birthday and record.birthday.value):
-                continue  # Skip records without a valid birthday
-
-            # Calculate the birthday for this year
-            birthday_date = record.birthday.value.date()
-            birthday_this_year = birthday_date.replace(year=today.year)
-
-            # If the birthday has already passed this year, use next year's date
-            if birthday_this_year < today:
-                birthday_this_year = birthday_this_year.replace(year=today.year + 1)
-
-            # Check if the birthday falls within the specified range
-            if today <= birthday_this_year <= end_date:
-                # Adjust the congratulation date if it falls on a weekend
-                if birthday_this_year.weekday() in (5, 6):  # Saturday or Sunday
-                    days_to_monday = (7 - birthday_this_year.weekday()) % 7
-                    congratulation_date = birthday_this_year + timedelta(days=days_to_monday)
-                else:
-                    congratulation_date = birthday_this_year
-
-                upcoming_birthdays.append({
-                    "name": record.name.value,
-                    "congratulation_date": congratulation_date.strftime("%d.%m.%Y")
-                })
+        # A database-backed book selects the candidates through its own birthday index
+        find_birthdays = getattr(self.data, "find_birthdays", None)
+        if find_birthdays is not None:
+            matches = ((record.name.value, next_birthday(record.birthday.date, today))
+                       for record in find_birthdays(today, end_date))
+            matches = [(name, day) for name, day in matches if day <= end_date]
+        else:
+            matches = self._index("birthdays").between(today, end_date)
 
-        return upcoming_birthdays
+        for name, birthday_this_year in matches:
+            # Adjust the congratulation date if it falls on a weekend
+            if birthday_this_year.weekday() in (5, 6):  # Saturday or Sunday
+                days_to_monday = (7 - birthday_this_year.weekday()) % 7
+                congratulation_date = birthday_this_year + timedelta(days=days_to_monday)
+            else:
+                congratulation_date = birthday_this_year
 
-    
-    def display_all_contacts(self):
-        """
-        function shows all contacts
-        """
-        if not self.data:
-            print("The address book is empty.")
-        if not hasattr(self, 'email'):
-            self.email = None
-        if not hasattr(self, 'address'):
-            self.address = None 
-        else:
-            print("All contacts:")
-            for record in self.data.values():
-                print(record)
\ No newline at end of file
+            upcoming_birthdays.append({
+                "name": name,
+                "congratulation_date": congratulation_date.strftime("%d.%m.%Y")
+            })
+
+        return upcoming_birthdays
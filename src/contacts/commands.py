@@ -9,13 +9,34 @@ The following operations are provided:
 5. `show_birthday` - Displays a contact's birthday.
 6. `birthdays` - Displays a list of upcoming birthdays within a specified number of days.
 7. `delete_contact` - Deletes a contact from the address book after confirming the deletion.
+8. `import_contacts` - Imports contacts in bulk from a CSV or vCard file.
+9. `export_contacts` - Exports contacts to a CSV, JSON Lines or vCard file.
+10. `all_contacts` - Shows the contacts one page at a time, as a list or a table.
+11. `find_by_phone` - Shows the contacts that use a phone number.
 Each function includes appropriate validation and error handling to ensure proper contact management. The input_error decorator is used to catch common input-related errors such as invalid arguments or missing information.
+
+The importer, the exporter and the renderer are imported by the commands that use them,
+so the other contact commands do not load them.
 """
 from src.utils.utils import input_error
-from src.contacts.fields import  Phone
+from src.utils.user_input import ask, confirm, offer
 from .record import Record
 
+# Table column widths of the last page shown, so the next page lines up with it
+_table_widths = {}
+
+
+def contact_not_found(name, book, message="Contact not found."):
+    """
+    Builds the 'not found' reply for a name, suggesting the closest existing contact names.
+    """
+    suggestions = book.suggest_names(name)
+    if suggestions:
+        return f"{message} Did you mean: {', '.join(suggestions)}?"
+    return message
 
+
+@input_error
 def add_contact(args, book):
     """
     Function to handle adding a contact.
@@ -40,10 +61,9 @@ def add_contact(args, book):
         book.add_record(record)
         message = "Contact added."
 
-    # Add the phone number to the record
+    # Add the phone number to the record; add_phone validates it
     try:
-        phone = Phone(phone)  # Assuming Phone validation here
-        record.add_phone(phone.value)
+        record.add_phone(phone)
     except ValueError as e:
         return str(e)  # Return the error if phone validation fails
 
@@ -83,9 +103,9 @@ def add_contact(args, book):
 
     # Prompt the user for additional details if none were provided
     if not any([address, email, birthday]):
-        response = input("Maybe you want to add more details? Such as address, email, and birthday? (yes/no): ")
+        response = offer("Maybe you want to add more details? Such as address, email, and birthday? (yes/no): ")
         if response.lower() == 'yes':
-            additional_info = input("Please enter additional details (e.g., email example@gmail.com birthday DD.MM.YYYY address: text up to 100 symbols): ").split()
+            additional_info = ask("Please enter additional details (e.g., email example@gmail.com birthday DD.MM.YYYY address: text up to 100 symbols): ").split()
 
             # Process the additional info
             i = 0
@@ -155,7 +175,7 @@ def change_contact(args, book):
     # Find the contact by name
     record = book.find(name)
     if record is None:
-        return f"Contact not found. Debug: Contact with name '{name}' was not found."
+        return contact_not_found(name, book)
 
     # Handle the field-to-change logic
     if field_to_change == "phone":
@@ -172,13 +192,11 @@ def change_contact(args, book):
         return "Phone changed."
 
     elif field_to_change == "email":
-        if "@" not in new_value or "." not in new_value:
-            return "Invalid email format."
-        record.email = new_value
+        record.add_email(new_value)
         return "Email changed."
 
     elif field_to_change == "address":
-        record.address = new_value
+        record.add_address(new_value)
         return "Address changed."
 
     elif field_to_change == "birthday":
@@ -204,21 +222,32 @@ def show_contact(args, book):
     record = book.find(query)
     
     if record is None:
-        
-        # If no record is found by name, search by email
-        for rec in book.data.values():  # Iterate through all records
-            # Check if email exists and matches the query
-            if hasattr(rec, 'email') and rec.email and str(rec.email).lower() == query.lower():
-                record = rec
-                break
-
-    # If no record is found by either name or email, raise an error
+        # If no record is found by name, look the query up in the email index
+        record = book.find_by_email(query)
+
+    # If no record is found by either name or email, suggest the closest names
     if record is None:
-        raise KeyError(f"Contact not found for query: {query}")
+        return contact_not_found(query, book)
     
     return record
 
 
+@input_error
+def find_by_phone(args, book):
+    """
+    Shows the contacts that use a phone number, looked up in the book-wide phone index.
+
+    Args:
+        args (list): A list containing the phone number.
+        book (AddressBook): The address book to search.
+    """
+    if len(args) != 1:
+        raise ValueError("Please provide one phone number.")
+    records = book.find_by_phone(args[0])
+    if not records:
+        return "No contact has this phone number."
+    return "\n".join(str(record) for record in records)
+
 
 @input_error
 def add_birthday(args, book):
@@ -232,7 +261,7 @@ def add_birthday(args, book):
     name = ' '.join(name_parts).strip()
     record = book.find(name)
     if record is None:
-        raise KeyError("Contact not found")
+        return contact_not_found(name, book)
     
     record.add_birthday(birthday)
     return "Birthday added."
@@ -246,7 +275,7 @@ def show_birthday(args, book):
     print(f"Looking up record for: {name}")
     record = book.find(name)
     if record is None:
-        raise KeyError("Contact not found")
+        return contact_not_found(name, book)
     return record.birthday or "No birthday set"
 
 
@@ -294,10 +323,10 @@ def delete_contact(args, book):
     # Find contact
     record = book.find(name)
     if record is None:
-        return f"Contact '{name}' not found."
+        return contact_not_found(name, book, f"Contact '{name}' not found.")
     
     # Ask for confirmation
-    confirmation = input(f"Are you sure you want to delete '{name}'? (yes/no): ").strip().lower()
+    confirmation = confirm(f"Are you sure you want to delete '{name}'? (yes/no): ").strip().lower()
     if confirmation == "yes":
         # Remove the record from the book
         book.delete(name)
@@ -306,3 +335,80 @@ def delete_contact(args, book):
         return f"Contact '{name}' was not deleted."
     else:
         return "Invalid input. Please enter 'yes' or 'no'."
+
+
+@input_error
+def import_contacts(args, book):
+    """
+    Imports contacts in bulk from a CSV or vCard file.
+
+    Rows are validated in parallel and merged into the address book; a contact that already
+    exists gets the new phones and details. Rejected rows are listed in an error report,
+    `<file>.errors.csv` unless another report file is given.
+
+    Args:
+        args (list): The file to import, optionally followed by the report file.
+        book (AddressBook): The address book to import into.
+    """
+    from src.contacts.importer import import_contacts as import_file
+
+    if not args:
+        raise ValueError("Please provide the file to import (CSV or vCard).")
+    filename = args[0]
+    report = args[1] if len(args) > 1 else f"{filename}.errors.csv"
+    try:
+        stats = import_file(filename, book, report)
+    except FileNotFoundError:
+        return f"File '{filename}' not found."
+    message = f"Imported {stats.added + stats.updated} contacts ({stats.added} added, {stats.updated} updated)."
+    if stats.rejected:
+        rows = "row was" if stats.rejected == 1 else "rows were"
+        message += f" {stats.rejected} {rows} rejected, see {report}."
+    return message
+
+
+@input_error
+def export_contacts(args, book):
+    """
+    Exports contacts to a CSV, JSON Lines or vCard file.
+
+    The format is taken from the file extension (.csv, .jsonl, .vcf) unless it is given
+    after the file name. The options `has-birthday` and `has-email` limit the export to
+    contacts with a birthday or an email.
+
+    Args:
+        args (list): The file name, optionally followed by the format and the options.
+        book (AddressBook): The address book to export.
+    """
+    from src.contacts.exporter import FORMATS, export_contacts as export_file
+
+    if not args:
+        raise ValueError("Please provide the file to export to (.csv, .jsonl or .vcf).")
+    filename, *options = args
+    options = [option.lower() for option in options]
+    formats = [option for option in options if option in FORMATS]
+    unknown = [option for option in options if option not in FORMATS + ("has-birthday", "has-email")]
+    if unknown:
+        raise ValueError(f"Unknown option: {unknown[0]}. Use a format ({', '.join(FORMATS)}), has-birthday or has-email.")
+    stats = export_file(book, filename, formats[0] if formats else None,
+                        "has-birthday" in options, "has-email" in options)
+    return f"Exported {stats.contacts} contacts to {stats.filename} in {stats.seconds:.2f} s."
+
+
+@input_error
+def all_contacts(args, book):
+    """
+    Shows one page of contacts.
+
+    Args:
+        args (list): Paging options: --page N, --page-size N, --table and --pager.
+        book (AddressBook): The address book to show.
+    """
+    from src.features.render import get_page, parse_page_options, render_contacts, show
+
+    options = parse_page_options(args)
+    page = get_page(book, options.page, options.page_size)
+    text, widths = render_contacts(page, options.table, _table_widths.get(options.page_size))
+    if widths is not None:
+        _table_widths[options.page_size] = widths
+    show(text, options.pager)
@@ -0,0 +1,136 @@
+"""
+This module exports the contacts of an address book to CSV, JSON Lines or vCard.
+
+Records are taken one at a time from `AddressBook.iter_records` and written through a
+large write buffer, so the output is never held in memory as a whole. The export goes to
+a temporary file that is renamed over the target at the end, so a backup that is
+interrupted never replaces a good one with a truncated file.
+
+The CSV columns and vCard properties are the ones `import-contacts` reads, so an export
+can be imported again.
+"""
+
+from collections import namedtuple
+import csv
+import json
+import os
+import time
+
+from src.contacts.fields import Phone
+from src.utils.jobs import checkpoint
+
+WRITE_BUFFER = 1024 * 1024
+# Records written between two progress checkpoints
+CHECKPOINT_EVERY = 10000
+FORMATS = ("csv", "jsonl", "vcard")
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".vcf": "vcard", ".vcard": "vcard"}
+CSV_COLUMNS = ["name", "phones", "email", "birthday", "address"]
+
+ExportStats = namedtuple("ExportStats", ["filename", "contacts", "seconds"])
+
+
+def format_for(filename):
+    """Returns the export format matching a file extension, or None."""
+    return EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def contact_fields(record):
+    """Returns the exported values of a record as a dict of strings (the phones as a list)."""
+    return {
+        "name": record.name.value,
+        "phones": [Phone.unpack(number) for number in record.phone_numbers],
+        "email": str(record.email) if record.email else "",
+        "birthday": str(record.birthday) if record.birthday else "",
+        "address": str(record.address) if record.address else "",
+    }
+
+
+def write_csv(records, stream):
+    """Writes one CSV row per record, with the phones separated by ';'. Returns the count."""
+    writer = csv.writer(stream)
+    writer.writerow(CSV_COLUMNS)
+    count = 0
+    for record in records:
+        writer.writerow((record.name.value, ";".join(map(Phone.unpack, record.phone_numbers)),
+                         record.email or "", record.birthday or "", record.address or ""))
+        count += 1
+    return count
+
+
+def write_jsonl(records, stream):
+    """Writes one JSON object per line and record. Returns the count."""
+    count = 0
+    for record in records:
+        stream.write(json.dumps(contact_fields(record), ensure_ascii=False))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+def vcard_escape(value):
+    """Escapes a vCard property value."""
+    return (value.replace("\\", "\\\\").replace(",", "\\,")
+            .replace(";", "\\;").replace("\n", "\\n"))
+
+
+def write_vcard(records, stream):
+    """Writes one vCard 3.0 card per record. Returns the count."""
+    count = 0
+    for record in records:
+        lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{vcard_escape(record.name.value)}"]
+        lines += [f"TEL:{number:010d}" for number in record.phone_numbers]
+        if record.email:
+            lines.append(f"EMAIL:{vcard_escape(str(record.email))}")
+        if record.birthday:
+            lines.append(f"BDAY:{record.birthday.date.isoformat()}")
+        if record.address:
+            lines.append(f"ADR:;;{vcard_escape(str(record.address))};;;;")
+        lines.append("END:VCARD\n")
+        stream.write("\n".join(lines))
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "vcard": write_vcard}
+
+
+def _checkpointed(records, total):
+    """Passes the records through, reporting progress and allowing cancellation every few thousand."""
+    for count, record in enumerate(records, start=1):
+        if count % CHECKPOINT_EVERY == 0:
+            checkpoint(count, total, "contacts exported")
+        yield record
+
+
+def export_contacts(book, filename, export_format=None, has_birthday=False, has_email=False):
+    """
+    Exports the contacts of an address book to a file.
+
+    Args:
+        book (AddressBook): The address book to export.
+        filename (str): The file to write.
+        export_format (str): One of FORMATS; chosen by the file extension if None.
+        has_birthday (bool): Only export contacts with a birthday.
+        has_email (bool): Only export contacts with an email.
+
+    Returns:
+        ExportStats: The file written, the number of exported contacts and the time it took.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    export_format = export_format or format_for(filename)
+    if export_format not in WRITERS:
+        raise ValueError(f"Unknown export format. Use one of: {', '.join(FORMATS)}.")
+    start = time.perf_counter()
+    tmp = f"{filename}.tmp"
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER) as stream:
+            count = WRITERS[export_format](_checkpointed(book.iter_records(has_birthday, has_email), len(book)),
+                                           stream)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, filename)
+    return ExportStats(filename, count, time.perf_counter() - start)
@@ -2,18 +2,63 @@
 This module provides a framework for managing contact information. 
 It defines several classes to represent different fields of a contact record, 
 including Field, Name, Phone, Birthday, Email, and Address. 
-Each class encapsulates specific validation rules and behaviors for its respective field
+Each class encapsulates specific validation rules and behaviors for its respective field.
+
+The classes keep their attributes in __slots__ (see `src.utils.compact`), so a field costs
+a few dozen bytes instead of an object plus a __dict__.
+
+Phone, Birthday, Email and Address validate through `src.utils.validation`: the constructor
+raises ValueError, and `validate_many` checks a batch of values without raising. The email
+pattern is compiled once, and birthdays are parsed by `parse_date` rather than strptime.
 """
-from datetime import datetime
+from calendar import isleap
+from datetime import date, datetime
 import re
 
-class Field:
+from src.utils.compact import Compact
+from src.utils.validation import Validated
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def parse_date(value):
+    """
+    Parses a date in the format DD.MM.YYYY into a date ordinal.
+
+    Like strptime("%d.%m.%Y"), it also accepts a one-digit day or month (1.2.2000).
+
+    Returns:
+        int: The date as returned by date.toordinal(), or None if the value is not a valid date.
+    """
+    if not isinstance(value, str) or not value.isascii():
+        return None
+    parts = value.split(".")
+    if len(parts) != 3:
+        return None
+    day, month, year = parts
+    if not (0 < len(day) <= 2 and 0 < len(month) <= 2 and len(year) == 4
+            and day.isdigit() and month.isdigit() and year.isdigit()):
+        return None
+    day, month, year = int(day), int(month), int(year)
+    if year < 1 or not 1 <= month <= 12:
+        return None
+    if not 1 <= day <= (29 if month == 2 and isleap(year) else DAYS_IN_MONTH[month]):
+        return None
+    return date(year, month, day).toordinal()
+
+
+class Field(Compact):
     """
     Represents a generic field in a contact record.
 
+    Subclasses declare the slot their value is stored in.
+
     Attributes:
         value (str): The value of the field, which must be a string of up to 255 characters.
     """
+    __slots__ = ()
+
     def __init__(self, value):
         """
         Initializes a Field instance with a given value.
@@ -37,23 +82,30 @@ class Name(Field):
         first_name (str): The first name of the contact.
         family_name (str): The family name of the contact, defaulting to an empty string if not provided.
     """
+    __slots__ = ("value",)
+
     def __init__(self, value):
         """
         Initializes a Name instance with a given value.
 
-        The value is split into first and family name. If only one name is provided, it is stored as the first name.
-
         Args:
             value (str): The full name of the contact, with parts separated by a space.
 
         Raises:
             ValueError: If the name value is empty, exceeds 255 characters, or is not a string.
         """
-        parts = value.split(maxsplit=1)
-        
-        self.first_name = parts[0]
-        self.family_name = parts[1] if len(parts) > 1 else ""
         super().__init__(value)
+
+    @property
+    def first_name(self):
+        """The first word of the name; computed on access rather than stored."""
+        return self.value.split(maxsplit=1)[0]
+
+    @property
+    def family_name(self):
+        """The rest of the name after the first word, or an empty string."""
+        parts = self.value.split(maxsplit=1)
+        return parts[1] if len(parts) > 1 else ""
     
     def __str__(self):
         """
@@ -64,68 +116,113 @@ class Name(Field):
         """
         return f"{self.first_name} {self.family_name}".strip()
 
-class Phone(Field):
+class Phone(Validated, Field):
     """
     Represents a phone number field for a contact.
 
     A phone number must be exactly 10 digits long and contain only numeric characters.
+    `Phone(value)` raises ValueError if the phone number is invalid.
 
     Attributes:
         value (str): The phone number value as a string.
     """
-    def __init__(self, value):
-        """
-        Initializes a Phone instance after validating the phone number.
+    __slots__ = ("value",)
 
-        Args:
-            value (str): The phone number to be assigned to the contact.
-
-        Raises:
-            ValueError: If the phone number is invalid (not 10 digits or contains non-numeric characters).
-        """
-        self.validate(value)
-        super().__init__(value)
-
-    @staticmethod
-    def validate(value):
+    @classmethod
+    def parse(cls, value):
         """
         Validates the phone number.
 
         A valid phone number must:
         - Contain exactly 10 digits.
-        - Be entirely numeric.
+        - Be entirely numeric (ASCII digits 0-9).
 
         Args:
             value (str): The phone number to validate.
 
+        Returns:
+            tuple: (the phone number, None), or (None, error message) if it is invalid.
+        """
+        if isinstance(value, str) and len(value) == 10 and value.isascii() and value.isdigit():
+            return value, None
+        return None, "Invalid phone number. It must contain exactly 10 digits."
+
+    @staticmethod
+    def pack(value):
+        """
+        Validates a phone number and returns it as an integer, the form records store it in.
+
         Raises:
-            ValueError: If the phone number does not meet validation criteria.
+            ValueError: If the phone number is invalid.
         """
-        if not value.isdigit() or len(value) != 10:
-            raise ValueError("Invalid phone number. It must contain exactly 10 digits.")
-        
-class Birthday(Field):
+        Phone.validate(value)
+        return int(value)
+
+    @staticmethod
+    def unpack(number):
+        """Returns the 10-digit string of a packed phone number, with its leading zeros."""
+        return f"{number:010d}"
+
+    @classmethod
+    def from_number(cls, number):
+        """Builds a Phone from a packed phone number without validating it again."""
+        return cls.from_parsed(cls.unpack(number))
+
+
+class Birthday(Validated, Field):
     """
     Represents a birthday field for a contact.
-    The birthday must be in the format "DD.MM.YYYY" and will be stored as a datetime object.
+    The birthday must be in the format "DD.MM.YYYY". It is stored as a date ordinal
+    (days since 1 January of year 1), a single integer instead of a datetime object.
+    `Birthday(value)` raises ValueError if the date is not in the correct format or is invalid.
     Attributes:
-        value (datetime): The parsed date of birth.
+        ordinal (int): The date of birth as returned by date.toordinal().
+        value (datetime): The date of birth, built from the ordinal on access.
+        date (date): The date of birth as a date, built from the ordinal on access.
     """
-    def __init__(self, value):
+    __slots__ = ("ordinal",)
+    slot = "ordinal"
+
+    @classmethod
+    def parse(cls, value):
         """
-        Initializes a Birthday instance after validating and parsing the date.
+        Parses the birthday.
 
         Args:
             value (str): The birthday in the format "DD.MM.YYYY".
 
-        Raises:
-            ValueError: If the date is not in the correct format or is invalid.
+        Returns:
+            tuple: (the date ordinal, None), or (None, error message) if the date is invalid.
         """
-        try:
-            self.value = datetime.strptime(value, "%d.%m.%Y")
-        except ValueError:
-            raise ValueError("Invalid date format. Use DD.MM.YYYY")
-    
+        ordinal = parse_date(value)
+        if ordinal is None:
+            return None, "Invalid date format. Use DD.MM.YYYY"
+        return ordinal, None
+
+    @classmethod
+    def from_ordinal(cls, ordinal):
+        """
+        Builds a Birthday from a date that was already parsed and validated.
+
+        Args:
+            ordinal (int): The date of birth as returned by date.toordinal().
+        """
+        return cls.from_parsed(ordinal)
+
+    @property
+    def value(self):
+        return datetime.fromordinal(self.ordinal)
+
+    @property
+    def date(self):
+        return date.fromordinal(self.ordinal)
+
+    def _migrate(self, state):
+        # Birthdays pickled before they were stored as ordinals hold a datetime
+        if "value" in state:
+            state = {"ordinal": state["value"].toordinal()}
+        return state
+
     def __str__(self):
         """
         Returns the birthday as a string in the format "DD.MM.YYYY".
@@ -133,59 +230,56 @@ class Birthday(Field):
         Returns:
             str: The birthday formatted as a string.
         """
-        return self.value.strftime("%d.%m.%Y")
+        return self.date.strftime("%d.%m.%Y")
 
-class Email:
+class Email(Validated, Compact):
     """
     Represents the email address of a contact.
 
+    `Email(email)` raises ValueError if the email format is invalid.
+
     Attributes:
-        value (str): The email address as a string.
+        email (str): The email address as a string.
     """
-    def __init__(self, email):
-        """
-        Initializes an Email instance with a given email address.
+    __slots__ = ("email",)
+    slot = "email"
 
-        Args:
-            value (str): The email address.
-        """
-        if self.validate(email):
-            self.email = email
-        else:
-            raise ValueError("Invalid email format.")
-    
     def __str__(self):
         return self.email
 
-    def validate(self, email):
+    @classmethod
+    def parse(cls, email):
         """
         Validate the email to be sure is it real
         """
-        pattern = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-        return re.match(pattern, email) is not None
+        if isinstance(email, str) and EMAIL_PATTERN.fullmatch(email):
+            return email, None
+        return None, "Invalid email format."
     
-class Address:
+class Address(Validated, Compact):
     """
     Represents the address of a contact.
 
+    `Address(address)` raises ValueError if the address is longer than 100 characters.
+
     Attributes:
-        value (str): The address as a string, multi-words, limited to 100 characters.
+        address (str): The address as a string, multi-words, limited to 100 characters.
     """
-    def __init__(self, address):
-        # Validate the address
-        if self.validate(address):
-            self.address = address.strip()  # Remove leading/trailing whitespace
-        else:
-            raise ValueError("Invalid address. Must be up to 100 characters.")
-    
+    __slots__ = ("address",)
+    slot = "address"
+
     def __str__(self):
         return self.address
 
-    @staticmethod
-    def validate(address):
+    @classmethod
+    def parse(cls, address):
         """
         Validates the address to ensure it is a string of up to 100 characters.
         :param address: The address to validate.
-        :return: True if valid, False otherwise.
+        :return: (the address without leading/trailing whitespace, None), or (None, error message).
         """
-        return isinstance(address, str) and len(address.strip()) <= 100
\ No newline at end of file
+        if isinstance(address, str):
+            address = address.strip()
+            if len(address) <= 100:
+                return address, None
+        return None, "Invalid address. Must be up to 100 characters."
\ No newline at end of file
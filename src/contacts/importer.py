@@ -0,0 +1,260 @@
+"""
+This module imports contacts in bulk from CSV and vCard files.
+
+The input file is read as a stream of rows and cut into chunks. The chunks are validated
+in a process pool with the field classes of `src.contacts.fields`, a bounded number of
+chunks at a time. Valid records are then merged into the address book one chunk at a
+time, and rejected rows are written to an error report as they come. Memory use therefore
+depends on the chunk size and the number of workers, not on the size of the input file.
+
+The workers are started with forkserver (or spawn where it is not available), never by
+forking the bot itself: the bot runs a worker thread for its commands and a completion
+thread, and a process forked from a threaded one can deadlock on a lock held by another
+thread at the time of the fork.
+
+CSV files need a header row. The recognised columns are name, phone (or phones, several
+numbers separated by ';'), email, birthday (DD.MM.YYYY) and address; other columns are
+ignored. vCard files use the FN, TEL, EMAIL, BDAY and ADR properties.
+"""
+
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import gc
+import multiprocessing
+import os
+import re
+
+from src.contacts.fields import Address, Birthday, Email, Phone
+from src.contacts.record import Record
+from src.utils.jobs import checkpoint
+
+CHUNK_SIZE = 2000
+# Chunks waiting for a worker, per worker; bounds the memory used by the pipeline
+CHUNKS_IN_FLIGHT = 2
+VCARD_EXTENSIONS = (".vcf", ".vcard")
+
+ImportStats = namedtuple("ImportStats", ["added", "updated", "rejected"])
+
+
+def read_csv_rows(stream):
+    """
+    Yields (line number, fields) pairs from a CSV file with a header row.
+
+    The fields are a dict with the recognised columns, keyed by lowercase column name.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        fields = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+        phones = fields.get("phones") or fields.get("phone") or ""
+        yield reader.line_num, {
+            "name": fields.get("name", ""),
+            "phones": [phone.strip() for phone in phones.split(";") if phone.strip()],
+            "email": fields.get("email", ""),
+            "birthday": fields.get("birthday", ""),
+            "address": fields.get("address", ""),
+        }
+
+
+def _vcard_birthday(value):
+    """Converts a vCard BDAY value (YYYY-MM-DD or YYYYMMDD) to DD.MM.YYYY; other values are kept."""
+    match = re.fullmatch(r"(\d{4})-?(\d{2})-?(\d{2})", value)
+    if match is None:
+        return value
+    year, month, day = match.groups()
+    return f"{day}.{month}.{year}"
+
+
+def _vcard_unescape(value):
+    """Undoes the escaping of commas, semicolons, newlines and backslashes in a vCard value."""
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _vcard_lines(stream):
+    """Yields (line number, unfolded line) pairs; continuation lines start with a space or tab."""
+    pending, start = None, 0
+    for number, line in enumerate(stream, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield start, pending
+        pending, start = line, number
+    if pending is not None:
+        yield start, pending
+
+
+def read_vcard_rows(stream):
+    """Yields (line number of BEGIN:VCARD, fields) pairs from a vCard file."""
+    fields, start = None, 0
+    for number, line in _vcard_lines(stream):
+        prop, _, value = line.partition(":")
+        # Drop parameters such as TEL;TYPE=cell and group prefixes such as item1.EMAIL
+        prop = prop.split(";", 1)[0].rsplit(".", 1)[-1].upper()
+        value = value.strip()
+        if prop == "BEGIN" and value.upper() == "VCARD":
+            fields = {"name": "", "phones": [], "email": "", "birthday": "", "address": ""}
+            start = number
+        elif fields is None:
+            continue
+        elif prop == "END":
+            yield start, fields
+            fields = None
+        elif prop == "FN":
+            fields["name"] = _vcard_unescape(value)
+        elif prop == "TEL":
+            fields["phones"].append(value)
+        elif prop == "EMAIL" and not fields["email"]:
+            fields["email"] = _vcard_unescape(value)
+        elif prop == "BDAY":
+            fields["birthday"] = _vcard_birthday(value)
+        elif prop == "ADR" and not fields["address"]:
+            parts = re.split(r"(?<!\\);", value)
+            fields["address"] = ", ".join(_vcard_unescape(part) for part in parts if part.strip())
+
+
+def read_rows(stream, filename):
+    """Picks the reader for a file by its extension."""
+    if os.path.splitext(filename)[1].lower() in VCARD_EXTENSIONS:
+        return read_vcard_rows(stream)
+    return read_csv_rows(stream)
+
+
+def chunks(rows, size):
+    """Groups rows into lists of at most `size` rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_fields(fields):
+    """
+    Validates the fields of one row with the `parse` methods of the field classes,
+    the same checks a Record applies, without raising an exception per invalid row.
+
+    Returns:
+        tuple: (values, None), or (None, the first error message) if a value is invalid.
+            The values are (name, packed phones, birthday ordinal, email, address).
+    """
+    name = fields["name"]
+    if not name:
+        return None, "Missing name."
+    phones = array("q")
+    for phone in fields["phones"]:
+        phone, error = Phone.parse(phone)
+        if error is not None:
+            return None, error
+        number = int(phone)
+        if number in phones:
+            return None, f"The contact already has the phone {phone}."
+        phones.append(number)
+    values = [name, phones]
+    for key, field in (("birthday", Birthday), ("email", Email), ("address", Address)):
+        value = None
+        if fields[key]:
+            value, error = field.parse(fields[key])
+            if error is not None:
+                return None, error
+        values.append(value)
+    return tuple(values), None
+
+
+def validate_chunk(chunk):
+    """
+    Validates a chunk of rows; runs in a worker process.
+
+    Records are expensive to pickle, so the validated values are sent back as plain
+    tuples, with the birthday already parsed into a date ordinal.
+
+    Returns:
+        list: (line number, name, values or None, error message or None) per row.
+    """
+    return [(line, fields["name"], *parse_fields(fields)) for line, fields in chunk]
+
+
+def record_from_values(values):
+    """Rebuilds a Record from the values returned by `validate_chunk`, without validating them again."""
+    name, phones, birthday, email, address = values
+    record = Record(name)
+    record.phone_numbers = phones
+    if birthday is not None:
+        record.birthday = Birthday.from_ordinal(birthday)
+    if email is not None:
+        record.email = Email.from_parsed(email)
+    if address is not None:
+        record.address = Address.from_parsed(address)
+    return record
+
+
+def _worker_context():
+    """Returns a multiprocessing context that does not fork the current, threaded process."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _validated(rows, chunk_size, workers):
+    """Yields the validated chunks in input order, keeping a bounded number in flight."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks(rows, chunk_size):
+            yield validate_chunk(chunk)
+        return
+    # The workers only validate rows into tuples, which form no reference cycles, and run
+    # nothing else, so the garbage collector is switched off in them for the whole import
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_worker_context(), initializer=gc.disable) as pool:
+        in_flight = deque()
+        for chunk in chunks(rows, chunk_size):
+            in_flight.append(pool.submit(validate_chunk, chunk))
+            if len(in_flight) >= workers * CHUNKS_IN_FLIGHT:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def import_contacts(filename, book, report_filename, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Imports the contacts of a CSV or vCard file into the address book.
+
+    Args:
+        filename (str): The file to import.
+        book (AddressBook): The address book to merge the contacts into.
+        report_filename (str): The CSV file the rejected rows are written to, if there are any.
+        chunk_size (int): The number of rows validated together.
+        workers (int): The number of worker processes; defaults to the number of CPUs.
+            With a single worker, the rows are validated in this process.
+
+    Returns:
+        ImportStats: The numbers of added, updated and rejected contacts.
+    """
+    added = updated = rejected = 0
+    report = writer = None
+    try:
+        with open(filename, newline="", encoding="utf-8-sig") as stream:
+            for results in _validated(read_rows(stream, filename), chunk_size, workers):
+                errors = [(line, name, error) for line, name, _, error in results if error]
+                records = [(line, record_from_values(values)) for line, _, values, _ in results if values]
+                lines = {id(record): line for line, record in records}
+                chunk_added, chunk_updated, conflicts = book.merge_records(record for _, record in records)
+                added += chunk_added
+                updated += chunk_updated
+                errors += [(lines[id(record)], record.name.value, error) for record, error in conflicts]
+                if errors:
+                    if report is None:
+                        report = open(report_filename, "w", newline="", encoding="utf-8")
+                        writer = csv.writer(report)
+                        writer.writerow(["line", "name", "error"])
+                    writer.writerows(sorted(errors))
+                    rejected += len(errors)
+                # Lets a cancelled import stop between chunks; the merged chunks are kept
+                checkpoint(added + updated + rejected, unit="rows imported")
+    finally:
+        if report is not None:
+            report.close()
+    return ImportStats(added, updated, rejected)
@@ -0,0 +1,374 @@
+"""
+This module contains the secondary indexes an AddressBook keeps next to its records.
+
+Every index is derived from the records, so it is never pickled. The book builds an index
+from its records the first time it is needed and afterwards keeps it current through
+three operations:
+- `add(record)` - a record was added to the book.
+- `discard(record)` - a record was removed from the book.
+- `update(record)` - a record stored in the book was changed in place.
+
+Indexes that only need the contact names may define `add_key(name)`; the book then
+builds them from its keys without decoding any record.
+
+Classes:
+    EmailIndex: Maps casefolded email addresses to contact names.
+    PhoneIndex: Maps packed phone numbers to the names of the contacts using them.
+    BirthdayIndex: Groups contact names into one bucket per day of the year.
+    FuzzyNameIndex: Finds the contact names closest to a misspelled one.
+    NamePrefixIndex: Lists the contact names starting with a prefix, for autocompletion.
+"""
+from bisect import bisect_left, insort
+import calendar
+from datetime import date, timedelta
+import threading
+
+
+class EmailIndex:
+    """
+    A hash index from casefolded email address to contact name.
+
+    Attributes:
+        names (dict): Casefolded email -> contact name.
+        emails (dict): Contact name -> the casefolded email it is indexed under.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.emails = {}
+
+    @staticmethod
+    def key(email):
+        """Returns the index key for an email (an Email object or a plain string)."""
+        return str(email).strip().casefold()
+
+    def get(self, email):
+        """Returns the name of the contact using the email, or None."""
+        return self.names.get(self.key(email))
+
+    def add(self, record):
+        if record.email:
+            key = self.key(record.email)
+            self.names.setdefault(key, record.name.value)
+            self.emails[record.name.value] = key
+
+    def discard(self, record):
+        key = self.emails.pop(record.name.value, None)
+        if key is not None and self.names.get(key) == record.name.value:
+            del self.names[key]
+
+    def update(self, record):
+        self.discard(record)
+        self.add(record)
+
+
+class PhoneIndex:
+    """
+    A hash index from packed phone number to the names of the contacts using it.
+
+    Attributes:
+        names (dict): Phone number -> a contact name, or a set of names if several contacts share it.
+        numbers (dict): Contact name -> the phone numbers it is indexed under.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.numbers = {}
+
+    def get(self, number):
+        """Returns the set of names of the contacts using a packed phone number."""
+        stored = self.names.get(number)
+        if stored is None:
+            return set()
+        return stored if isinstance(stored, set) else {stored}
+
+    def add(self, record):
+        name = record.name.value
+        numbers = tuple(record.phone_numbers)
+        for number in numbers:
+            stored = self.names.get(number)
+            if stored is None:
+                self.names[number] = name
+            elif isinstance(stored, set):
+                stored.add(name)
+            elif stored != name:
+                self.names[number] = {stored, name}
+        self.numbers[name] = numbers
+
+    def discard(self, record):
+        name = record.name.value
+        for number in self.numbers.pop(name, ()):
+            stored = self.names.get(number)
+            if stored == name:
+                del self.names[number]
+            elif isinstance(stored, set):
+                stored.discard(name)
+                if len(stored) == 1:
+                    self.names[number] = stored.pop()
+
+    def update(self, record):
+        self.discard(record)
+        self.add(record)
+
+
+def birthday_on(birthday, year):
+    """
+    Returns the date a birthday falls on in the given year.
+
+    Birthdays on 29 February are celebrated on 28 February in non-leap years.
+    """
+    if birthday.month == 2 and birthday.day == 29 and not calendar.isleap(year):
+        return date(year, 2, 28)
+    return birthday.replace(year=year)
+
+
+def next_birthday(birthday, today):
+    """Returns the first date on or after today that the birthday falls on."""
+    this_year = birthday_on(birthday, today.year)
+    return this_year if this_year >= today else birthday_on(birthday, today.year + 1)
+
+
+class BirthdayIndex:
+    """
+    A 366-bucket index of contact names by the day of the year of their birthday.
+
+    Buckets are numbered by the day of a leap year, so 29 February has its own bucket.
+
+    Attributes:
+        buckets (list): One set of contact names per day of the year.
+        days (dict): Contact name -> the bucket it is stored in.
+        order (dict): Contact name -> insertion number, used to list matches in book order.
+    """
+    FEB_29 = date(2000, 2, 29).timetuple().tm_yday - 1
+
+    def __init__(self):
+        self.buckets = [set() for _ in range(366)]
+        self.days = {}
+        self.order = {}
+        self._counter = 0
+
+    @staticmethod
+    def bucket(day):
+        """Returns the bucket of a date's month and day."""
+        return date(2000, day.month, day.day).timetuple().tm_yday - 1
+
+    def _place(self, record):
+        name = record.name.value
+        if record.birthday:
+            bucket = self.bucket(record.birthday.date)
+            self.buckets[bucket].add(name)
+            self.days[name] = bucket
+
+    def add(self, record):
+        self.order[record.name.value] = self._counter
+        self._counter += 1
+        self._place(record)
+
+    def discard(self, record):
+        self._remove(record.name.value)
+        self.order.pop(record.name.value, None)
+
+    def _remove(self, name):
+        bucket = self.days.pop(name, None)
+        if bucket is not None:
+            self.buckets[bucket].discard(name)
+
+    def update(self, record):
+        self._remove(record.name.value)
+        self._place(record)
+
+    def between(self, start, end):
+        """
+        Finds the contacts whose next birthday falls between two dates, inclusive.
+
+        Only the buckets inside the window are visited.
+
+        Args:
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+
+        Returns:
+            list: (name, birthday date) pairs, in the order the contacts were added.
+        """
+        found = {}
+        day = start
+        for _ in range(min((end - start).days, 365) + 1):
+            buckets = [self.bucket(day)]
+            if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+                buckets.append(self.FEB_29)
+            for bucket in buckets:
+                for name in self.buckets[bucket]:
+                    found.setdefault(name, day)
+            day += timedelta(days=1)
+        return sorted(found.items(), key=lambda item: self.order[item[0]])
+
+
+def edit_distance(first, second, bound):
+    """
+    Returns the optimal string alignment distance between two strings: the number of
+    inserted, deleted or substituted characters and swapped neighbours needed to turn
+    one into the other. Returns bound + 1 as soon as the distance must exceed the bound.
+    """
+    if abs(len(first) - len(second)) > bound:
+        return bound + 1
+    previous, current = None, list(range(len(second) + 1))
+    for i, a in enumerate(first, start=1):
+        before, previous, current = previous, current, [i] + [0] * len(second)
+        for j, b in enumerate(second, start=1):
+            cost = 0 if a == b else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if j > 1 and i > 1 and a == second[j - 2] and first[i - 2] == b:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > bound:
+            return bound + 1
+    return current[-1]
+
+
+class FuzzyNameIndex:
+    """
+    A symmetric-delete index over casefolded contact names.
+
+    Every name is stored under itself and under each string obtained by deleting one of
+    its characters. Two names within one insertion, deletion, substitution or swap of each
+    other always share one of these keys, so a lookup only probes len(query) + 1 keys and
+    then ranks the few candidates by edit distance, independently of the book size. The
+    price is memory: about len(name) + 1 keys per contact.
+
+    Names two edits apart do not always share a key (e.g. after two substitutions), so the
+    index only finds names within MAX_DISTANCE = 1; reaching distance 2 would take about
+    len(name) ** 2 / 2 keys per contact.
+
+    Attributes:
+        keys (dict): Deletion key -> a contact name, or a set of names if several share it.
+    """
+    MAX_DISTANCE = 1
+
+    def __init__(self):
+        self.keys = {}
+
+    @staticmethod
+    def deletions(name):
+        """Returns the name with each of its characters deleted in turn, plus the name itself."""
+        return {name} | {name[:i] + name[i + 1:] for i in range(len(name))}
+
+    def add_key(self, name):
+        for key in self.deletions(name.casefold()):
+            stored = self.keys.get(key)
+            if stored is None:
+                self.keys[key] = name
+            elif isinstance(stored, set):
+                stored.add(name)
+            elif stored != name:
+                self.keys[key] = {stored, name}
+
+    def add(self, record):
+        self.add_key(record.name.value)
+
+    def discard(self, record):
+        name = record.name.value
+        for key in self.deletions(name.casefold()):
+            stored = self.keys.get(key)
+            if stored == name:
+                del self.keys[key]
+            elif isinstance(stored, set):
+                stored.discard(name)
+                if len(stored) == 1:
+                    self.keys[key] = stored.pop()
+
+    def update(self, record):
+        """Names never change in place, so there is nothing to update."""
+
+    def closest(self, query, limit=3, max_distance=MAX_DISTANCE):
+        """
+        Returns up to `limit` contact names closest to the query, ignoring case.
+
+        Args:
+            query (str): The (possibly misspelled) name.
+            limit (int): The maximum number of names to return.
+            max_distance (int): The largest edit distance to accept, at most MAX_DISTANCE.
+
+        Returns:
+            list: Names ordered by edit distance, then alphabetically.
+
+        Raises:
+            ValueError: If max_distance is larger than the index can find.
+        """
+        if max_distance > self.MAX_DISTANCE:
+            raise ValueError(f"The name index only finds names up to {self.MAX_DISTANCE} edit away.")
+        query = query.casefold()
+        candidates = set()
+        for key in self.deletions(query):
+            stored = self.keys.get(key)
+            if isinstance(stored, set):
+                candidates |= stored
+            elif stored is not None:
+                candidates.add(stored)
+        ranked = []
+        for name in candidates:
+            distance = edit_distance(query, name.casefold(), max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, name))
+        return [name for _, name in sorted(ranked)[:limit]]
+
+
+class NamePrefixIndex:
+    """
+    A sorted array of (casefolded name, name) pairs answering prefix queries with bisect.
+
+    A query costs O(log n) to find the first match plus one step per returned name, so it
+    is bounded by the size of the output rather than the size of the book.
+
+    Name completion queries the index from its own thread while the worker thread adds
+    and removes names, so every access to the array holds the index's lock.
+
+    Attributes:
+        names (list): (casefolded name, name) pairs, sorted once the index is built.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._sorted = True
+        self._lock = threading.Lock()
+
+    def add_key(self, name):
+        # Keys are collected unsorted while the index is built and sorted once by `finish`;
+        # nobody else can see the index before that, so no lock is needed
+        self.names.append((name.casefold(), name))
+        self._sorted = False
+
+    def finish(self):
+        """Sorts the names collected while the index was built."""
+        if not self._sorted:
+            self.names.sort()
+            self._sorted = True
+
+    def add(self, record):
+        with self._lock:
+            insort(self.names, (record.name.value.casefold(), record.name.value))
+
+    def discard(self, record):
+        entry = (record.name.value.casefold(), record.name.value)
+        with self._lock:
+            i = bisect_left(self.names, entry)
+            if i < len(self.names) and self.names[i] == entry:
+                del self.names[i]
+
+    def update(self, record):
+        """Names never change in place, so there is nothing to update."""
+
+    def complete(self, prefix, limit=20):
+        """
+        Returns up to `limit` names starting with the prefix, ignoring case, in alphabetical order.
+
+        Args:
+            prefix (str): The beginning of a contact name.
+            limit (int): The maximum number of names to return.
+        """
+        prefix = prefix.casefold()
+        found = []
+        with self._lock:
+            i = bisect_left(self.names, (prefix,))
+            while i < len(self.names) and len(found) < limit and self.names[i][0].startswith(prefix):
+                found.append(self.names[i][1])
+                i += 1
+        return found
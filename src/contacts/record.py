@@ -22,7 +22,8 @@ which handles the collection of multiple `Record` instances.
 
 Attributes:
     name (Name): The Name object representing the contact's name.
-    phones (list): A list to store `Phone` objects associated with the contact.
+    phone_numbers (array): The contact's phone numbers, packed as 64-bit integers.
+    phones (list): The phone numbers as `Phone` objects, built on access.
     birthday (Birthday or None): The contact's birthday as a `Birthday` object, if set.
     email (Email or None): The contact's email address as an `Email` object, if set.
     address (Address or None): The contact's address as an `Address` object, if set.
@@ -38,6 +39,7 @@ Methods:
     - add_birthday(birthday): Sets or updates the contact's birthday.
     - add_email(email): Sets or updates the contact's email.
     - add_address(address): Sets or updates the contact's address.
+    - merge(other): Copies the details of another record of the same contact.
     - __str__(): Returns a string representation of the contact record.
 
 Dependencies:
@@ -47,18 +49,26 @@ Dependencies:
     - Address: Represents the contact's physical address.
     - Email: Represents the contact's email address.
 """
+from array import array
+
 from src.contacts.fields import Name, Phone, Birthday, Address, Email
+from src.utils.compact import Compact
 
-class Record:
+class Record(Compact):
     """
     Record
     Attributes:
         name (Name): The Name object representing the contact's name.
-        phones (list): An empty list to store Phone objects.
+        phone_numbers (array): The phone numbers as an array('q'); a validated 10-digit
+            number fits in an int64, so each phone costs 8 bytes.
         birthday (None): Placeholder for a Birthday object.
         email (None): Placeholder for an Email object.
         address (None): Placeholder for an Address object.
     """
+    # __weakref__ lets database-backed books keep decoded records in a weak cache
+    __slots__ = ("name", "phone_numbers", "birthday", "email", "address", "_book", "__weakref__")
+    # The AddressBook holding this record; set by AddressBook.add_record and never pickled
+    _transient = ("_book",)
 
     def __init__(self, name):
         """
@@ -68,10 +78,37 @@ class Record:
         name (str): The name of the contact.
         """
         self.name = Name(name)
-        self.phones = []
+        self.phone_numbers = array("q")
         self.birthday = None
         self.email = None
         self.address = None
+        self._book = None
+
+    @property
+    def phones(self):
+        """The phone numbers as Phone objects, built from the packed numbers on access."""
+        return [Phone.from_number(number) for number in self.phone_numbers]
+
+    def _position(self, phone):
+        """Returns the position of a phone number in phone_numbers, or -1."""
+        try:
+            number = Phone.pack(phone)
+        except ValueError:
+            return -1
+        try:
+            return self.phone_numbers.index(number)
+        except ValueError:
+            return -1
+
+    def _check_new_phone(self, number):
+        """
+        Rejects a packed phone number the contact already has.
+
+        The check scans the record's own few numbers; the book-wide phone index is left to
+        `AddressBook.find_by_phone`, as building it decodes every record of a lazy store.
+        """
+        if number in self.phone_numbers:
+            raise ValueError(f"The contact already has the phone {Phone.unpack(number)}.")
 
     def add_phone(self, phone):
         """
@@ -81,9 +118,12 @@ class Record:
             phone (str): The phone number to add.
 
         Raises:
-            ValueError: If the phone number is invalid.
+            ValueError: If the phone number is invalid or the contact already has it.
         """
-        self.phones.append(Phone(phone))
+        number = Phone.pack(phone)
+        self._check_new_phone(number)
+        self.phone_numbers.append(number)
+        self._changed()
 
     def delete_phone(self, phone):
         """
@@ -95,15 +135,11 @@ class Record:
         Raises:
             ValueError: If the phone number does not exist in the record.
         """
-        phone_to_remove = None
-        for p in self.phones:
-            if p.value == phone:
-                phone_to_remove = p
-                break
-        if phone_to_remove:
-            self.phones.remove(phone_to_remove)
-        else:
+        position = self._position(phone)
+        if position < 0:
             raise ValueError("Phone not found.")
+        del self.phone_numbers[position]
+        self._changed()
 
     def edit_phone(self, old_phone, new_phone):
         """
@@ -116,13 +152,16 @@ class Record:
         Raises:
             ValueError: If the old phone number is not found in the contact's phone list.
             ValueError: If the new phone number is invalid (not 10 digits or contains non-numeric characters).
+            ValueError: If the contact already has the new phone number.
         """
-        for p in self.phones:
-            if p.value == old_phone:
-                Phone.validate(new_phone)
-                p.value = new_phone
-                return
-        raise ValueError("Phone not found.")
+        position = self._position(old_phone)
+        if position < 0:
+            raise ValueError("Phone not found.")
+        number = Phone.pack(new_phone)
+        if number != self.phone_numbers[position]:
+            self._check_new_phone(number)
+        self.phone_numbers[position] = number
+        self._changed()
 
     def find_phone(self, phone):
         """
@@ -134,16 +173,11 @@ class Record:
         Returns:
             Phone or None: If the phone number is found, the corresponding Phone object is returned. 
                             If the phone number is not found, None is returned.
-
-        Prints:
-            The phone object if found.
-
         """
-        for p in self.phones:
-            if p.value == phone:
-                print(p)
-                return p
-        return None
+        position = self._position(phone)
+        if position < 0:
+            return None
+        return Phone.from_number(self.phone_numbers[position])
     
     def show_contact(self, args, book):
         """
@@ -161,7 +195,7 @@ class Record:
         record = book.find(name)
         if not record:
             return f"Contact '{name}' not found."
-        phones = "; ".join(p.value for p in record.phones) if record.phones else "No phone numbers set"
+        phones = "; ".join(map(Phone.unpack, record.phone_numbers)) if record.phone_numbers else "No phone numbers set"
         email = record.email if record.email else "Not provided"
         address = record.address if record.address else "Not provided"
         birthday = record.birthday if record.birthday else "Not set"
@@ -179,6 +213,7 @@ class Record:
             ValueError: If the birthday format is invalid.
         """
         self.birthday = Birthday(birthday)
+        self._changed()
 
     def add_email(self, email):
         """
@@ -188,9 +223,13 @@ class Record:
             email (str): The email address to update.
 
         Raises:
-            ValueError: If the email format is invalid.
+            ValueError: If the email format is invalid or another contact in the book uses it.
         """
-        self.email = Email(email)
+        email = Email(email)
+        if self._book is not None:
+            self._book.check_email(self, email)
+        self.email = email
+        self._changed()
 
     def add_address(self, address):
         """
@@ -203,6 +242,36 @@ class Record:
             ValueError: If the address is invalid.
         """
         self.address = Address(address)
+        self._changed()
+
+    def merge(self, other):
+        """
+        Copies the details of another record of the same contact into this one.
+
+        Phones missing from this record are added; the birthday, email and address of the
+        other record replace these ones when they are set. The owning book is not notified.
+
+        Args:
+            other (Record): The record to merge in.
+        """
+        known = set(self.phone_numbers)
+        self.phone_numbers.extend(number for number in other.phone_numbers if number not in known)
+        for field in ("birthday", "email", "address"):
+            value = getattr(other, field)
+            if value:
+                setattr(self, field, value)
+
+    def _migrate(self, state):
+        # Records pickled before phones were packed hold a list of Phone objects
+        if "phones" in state:
+            state = dict(state)
+            state["phone_numbers"] = array("q", (int(phone.value) for phone in state.pop("phones")))
+        return state
+
+    def _changed(self):
+        """Lets the owning address book journal the new state of this record."""
+        if self._book is not None:
+            self._book.record_changed(self)
 
     def __str__(self):
         """
@@ -211,7 +280,7 @@ class Record:
         Returns:
             str: A summary of the contact's details, including name, phones, birthday, email, and address.
         """
-        phones = '; '.join(p.value for p in self.phones)
+        phones = '; '.join(map(Phone.unpack, self.phone_numbers))
         birthday = f"birthday: {self.birthday}" if self.birthday else "no birthday set"
         address = f"address: {getattr(self, 'address', 'no address set')}"
         email = f"email: {getattr(self, 'email', 'no email set')}"
@@ -1,10 +1,8 @@
 """This module contains the function to display the help message."""
 
-from colorama import Fore, Style, init
-from tabulate import tabulate
 from src.constants.controls import COMMANDS
 
-init(autoreset=True)
+_colorama_ready = False
 
 
 def print_help():
@@ -14,6 +12,14 @@ def print_help():
     using the `colorama` library and formats the data into a table using
     the `tabulate` library.
     """
+    # colorama and tabulate are only needed here, so they are not imported at startup
+    global _colorama_ready
+    from colorama import Fore, Style, init
+    from tabulate import tabulate
+    if not _colorama_ready:
+        init(autoreset=True)
+        _colorama_ready = True
+
     help_data = [
         (COMMANDS['hello'], "", "Greet the assistant."),
         (COMMANDS['add_contact'], "<name> <phone>",
@@ -25,19 +31,36 @@ def print_help():
         (COMMANDS['delete_contact'], "<name>", "Delete existing contact."),
         (COMMANDS['show_contact'], "<name> or <email>",
          "Show the full contact information."),
-        (COMMANDS['all_contacts'], "",
-         "Display all contacts in the address book."),
+        (COMMANDS['find_by_phone'], "<phone>",
+         "Show the contacts with the given phone number."),
+        (COMMANDS['all_contacts'], "[--page N] [--page-size N] [--table] [--pager]",
+         "Display the contacts one page at a time, as a list or a table, optionally in a pager."),
         (COMMANDS['add_birthday'], "<name> <date>",
          "Add a birthday for the given contact (format: DD.MM.YYYY)."),
         (COMMANDS['show_birthday'], "<name>",
          "Show the birthday of the given contact."),
         (COMMANDS['birthdays'], "<days>",
          "Show contacts with birthdays in the next given number of days."),
+        (COMMANDS['import_contacts'], "<file> [<report file>]",
+         "Import contacts from a CSV or vCard file. Rejected rows are listed in the report (default: <file>.errors.csv)."),
+        (COMMANDS['export_contacts'], "<file> [csv|jsonl|vcard] [has-birthday] [has-email]",
+         "Export contacts to a CSV, JSON Lines or vCard file, optionally only those with a birthday or an email."),
         (COMMANDS['add_note'], "",
          "Add a new note. You will be prompted to enter the title, text, and tags."),
-        (COMMANDS['all_notes'], "", "Display all notes in the notebook."),
+        (COMMANDS['all_notes'], "[--page N] [--page-size N] [--table] [--pager]",
+         "Display the notes one page at a time, as a list or a table, optionally in a pager."),
         (COMMANDS['find_notes'], "",
          "Search notes by title, text, or tags. Then select a note to edit or delete."),
+        (COMMANDS['tags'], "[<query>]",
+         "List tags with their note counts, or show notes matching a tag query (AND, OR, NOT, parentheses)."),
+        (COMMANDS['stats'], "",
+         "Show how many times each command ran in this session, its errors and its p50/p95/p99 latency."),
+        (COMMANDS['mem_report'], "[start [<frames>] | stop | top [<N>] | snapshot | diff [<N>]]",
+         "Show the memory taken by each structure of the books and their indexes; with tracemalloc, the top allocation sites and the change since a snapshot."),
+        (COMMANDS['jobs'], "",
+         "Show the queued, running and recently finished jobs. End a command with & to run it in the background."),
+        (COMMANDS['cancel'], "<job number>",
+         "Cancel a queued or running job. Ctrl-C cancels the command running in the foreground."),
         (COMMANDS['help'], "", "Show this help message."),
         (f"{COMMANDS['close']}, {COMMANDS['exit']}",
          "", "Exit the assistant bot.")
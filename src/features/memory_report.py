@@ -0,0 +1,238 @@
+"""
+This module implements the `mem-report` command, which attributes the memory of a session.
+
+Two sources are combined:
+- A walk of the books with `sys.getsizeof`, broken down by structure: the mappings, the
+  Record and Note objects, each field, and every secondary index that has been built.
+  An object reachable from several structures is counted once, in the first structure
+  that reaches it, so the parts add up to the total.
+- `tracemalloc`, once started with `mem-report start`: the current and peak traced
+  memory, the source lines that allocated the most, and the difference between the
+  present and a snapshot taken earlier, e.g. before a bulk import or a search.
+
+tracemalloc only sees allocations made after it was started, and slows the bot down
+while it runs, so it is off until asked for.
+"""
+
+from array import array
+from collections import deque
+import sys
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+import weakref
+
+from src.utils.compact import Compact, state_slots
+from src.utils.utils import input_error
+
+DEFAULT_TOP = 10
+# Objects the walk does not look inside
+OPAQUE = (str, bytes, bytearray, int, float, complex, bool, array, type(None), range, memoryview)
+# Objects the walk neither counts nor looks inside: code and references that lead out of the books
+SKIPPED = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, weakref.ref)
+
+_snapshot = None
+
+
+def _slot_values(obj):
+    """Yields the values of the slots of an object that are set."""
+    if isinstance(obj, Compact):
+        # The transient slots point back at the book
+        names = state_slots(type(obj))
+    else:
+        names = []
+        for klass in type(obj).__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            names += [slots] if isinstance(slots, str) else slots
+    for name in names:
+        try:
+            yield getattr(obj, name)
+        except AttributeError:
+            pass
+
+
+def deep_size(obj, seen):
+    """
+    Returns the bytes taken by an object and everything it references that is not in `seen`.
+
+    Args:
+        obj: The object to measure.
+        seen (set): The ids of the objects already counted; updated with the ones counted now.
+    """
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SKIPPED):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, OPAQUE):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            stack.extend(_slot_values(obj))
+    return total
+
+
+def _index_sizes(book, seen):
+    """Returns (name, bytes) for each secondary index the book has built."""
+    return [(f"index: {name}", deep_size(index, seen))
+            for name, index in sorted(book.__dict__.get("_indexes", {}).items())]
+
+
+def book_breakdown(book, fields, seen):
+    """
+    Measures one book, structure by structure.
+
+    Args:
+        book (PersistentDict): The book to measure.
+        fields (tuple): (label, attribute) pairs of the fields of its values.
+        seen (set): The ids of the objects already counted.
+
+    Returns:
+        list: (structure, bytes) pairs.
+    """
+    # The books themselves are not walked: the values point back at them
+    seen.add(id(book))
+    if not isinstance(book.data, dict):
+        # Database and record store backends keep most values on disk; only what is in memory is counted
+        storage = f"storage: {type(book.data).__name__} (values in memory only)"
+        return [(storage, deep_size(book.data, seen))] + _index_sizes(book, seen)
+    values = list(book.data.values())
+    sizes = [("objects", sum(sys.getsizeof(value) for value in values))]
+    seen.update(id(value) for value in values)
+    for label, attribute in fields:
+        sizes.append((label, sum(deep_size(getattr(value, attribute), seen) for value in values)))
+    sizes.append(("data dict and keys", deep_size(book.data, seen)))
+    return sizes + _index_sizes(book, seen)
+
+
+def structure_report(book, notebook):
+    """Returns the breakdown of the memory taken by both books, as a table."""
+    seen = set()
+    sections = [
+        (f"AddressBook ({len(book)} contacts)", book_breakdown(book, (
+            ("names", "name"), ("phones", "phone_numbers"), ("birthdays", "birthday"),
+            ("emails", "email"), ("addresses", "address")), seen)),
+        (f"NoteBook ({len(notebook)} notes)", book_breakdown(notebook, (
+            ("titles", "title"), ("text", "text"), ("tags", "tags")), seen)),
+    ]
+    total = sum(size for _, sizes in sections for _, size in sizes)
+    lines = []
+    for title, sizes in sections:
+        lines.append(title)
+        for label, size in sizes:
+            share = size / total * 100 if total else 0.0
+            lines.append(f"  {label:<40}{format_size(size):>12}{share:>7.1f}%")
+    lines.append(f"{'Total':<42}{format_size(total):>12}")
+    return "\n".join(lines)
+
+
+def format_size(size):
+    """Formats a number of bytes with a binary unit, keeping the sign of a difference."""
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{sign}{size:.0f} {unit}" if unit == "B" else f"{sign}{size:.1f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.1f} GiB"
+
+
+def _take_snapshot():
+    """Takes a tracemalloc snapshot without the allocations of tracemalloc itself."""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+def _site(trace):
+    frame = trace.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_sites(limit):
+    """Returns the source lines holding the most traced memory, as printable lines."""
+    statistics = _take_snapshot().statistics("lineno")[:limit]
+    if not statistics:
+        return "No traced allocations yet."
+    return "\n".join(f"{format_size(stat.size):>12}{stat.count:>10} blocks  {_site(stat)}"
+                     for stat in statistics)
+
+
+def snapshot_diff(limit):
+    """Returns the source lines whose traced memory changed most since the saved snapshot."""
+    differences = _take_snapshot().compare_to(_snapshot, "lineno")[:limit]
+    changed = [stat for stat in differences if stat.size_diff]
+    if not changed:
+        return "Nothing changed since the snapshot."
+    total = sum(stat.size_diff for stat in differences)
+    lines = [f"{format_size(stat.size_diff):>12}{stat.count_diff:>+10} blocks  {_site(stat)}" for stat in changed]
+    lines.append(f"Total of these lines: {format_size(total)}")
+    return "\n".join(lines)
+
+
+def tracing_summary():
+    """Returns the current and peak traced memory, or how to start tracing."""
+    if not tracemalloc.is_tracing():
+        return "tracemalloc is off; use 'mem-report start' to trace allocations."
+    current, peak = tracemalloc.get_traced_memory()
+    return f"Traced memory: {format_size(current)} now, {format_size(peak)} at peak."
+
+
+def _limit(args, position):
+    if len(args) <= position:
+        return DEFAULT_TOP
+    if not args[position].isdigit() or int(args[position]) < 1:
+        raise ValueError("The number of lines must be a positive number.")
+    return int(args[position])
+
+
+@input_error
+def mem_report(args, book, notebook):
+    """
+    Reports where the memory of the session goes.
+
+    Args:
+        args (list): Empty for the breakdown by structure, or one of:
+            start [frames] - start tracing allocations with tracemalloc;
+            stop - stop tracing and drop the snapshot;
+            top [N] - the N source lines holding the most traced memory;
+            snapshot - remember the traced allocations, for a later diff;
+            diff [N] - the N source lines whose memory changed most since the snapshot.
+        book (AddressBook): The address book.
+        notebook (NoteBook): The notebook.
+    """
+    global _snapshot
+    action = args[0].lower() if args else ""
+    if not action:
+        return f"{structure_report(book, notebook)}\n{tracing_summary()}"
+    if action == "start":
+        if tracemalloc.is_tracing():
+            return "tracemalloc is already tracing."
+        tracemalloc.start(_limit(args, 1) if len(args) > 1 else 1)
+        return "Tracing allocations. Memory allocated from now on is attributed to its source line."
+    if action not in ("stop", "top", "snapshot", "diff"):
+        raise ValueError("Unknown mem-report action. Use start, stop, top, snapshot or diff.")
+    if not tracemalloc.is_tracing():
+        raise ValueError("tracemalloc is off; use 'mem-report start' first.")
+    if action == "stop":
+        tracemalloc.stop()
+        _snapshot = None
+        return "Stopped tracing allocations."
+    if action == "top":
+        return f"{tracing_summary()}\n{top_sites(_limit(args, 1))}"
+    if action == "snapshot":
+        _snapshot = _take_snapshot()
+        return "Snapshot taken; run 'mem-report diff' to see what changed since."
+    if _snapshot is None:
+        raise ValueError("There is no snapshot to compare with; use 'mem-report snapshot' first.")
+    return snapshot_diff(_limit(args, 1))
@@ -0,0 +1,167 @@
+"""
+This module renders contacts and notes one page at a time.
+
+A page is fetched from the book with `PersistentDict.page`, which decodes only the records
+on that page, and rendered into a single string that is written with one call, or handed
+to a pager. The render functions have no side effects: they take the records and return
+text. Table column widths can be carried from one page to the next, so the columns of
+consecutive pages line up; tabulate is imported only when a table is rendered.
+"""
+
+from collections import namedtuple
+import sys
+
+DEFAULT_PAGE_SIZE = 50
+CONTACT_HEADERS = ("Name", "Phones", "Birthday", "Email", "Address")
+NOTE_HEADERS = ("Title", "Text", "Tags")
+
+Page = namedtuple("Page", ["items", "number", "pages", "total"])
+PageOptions = namedtuple("PageOptions", ["page", "page_size", "table", "pager"])
+
+
+def parse_page_options(args):
+    """
+    Parses the paging options of a listing command.
+
+    Accepts `--page N`, `--page-size N`, `--table` and `--pager`.
+
+    Raises:
+        ValueError: If an option is unknown or its value is not a positive number.
+    """
+    page, page_size, table, pager = 1, DEFAULT_PAGE_SIZE, False, False
+    i = 0
+    while i < len(args):
+        option = args[i].lower()
+        if option in ("--page", "--page-size"):
+            if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                raise ValueError(f"{option} needs a positive number.")
+            if option == "--page":
+                page = int(args[i + 1])
+            else:
+                page_size = int(args[i + 1])
+            i += 2
+            continue
+        if option == "--table":
+            table = True
+        elif option == "--pager":
+            pager = True
+        else:
+            raise ValueError(f"Unknown option: {args[i]}. Use --page, --page-size, --table or --pager.")
+        i += 1
+    return PageOptions(page, page_size, table, pager)
+
+
+def get_page(book, number, size):
+    """
+    Fetches one page of a book.
+
+    Raises:
+        ValueError: If the page is past the end of the book.
+    """
+    total = len(book)
+    pages = max(1, -(-total // size))
+    if number > pages:
+        raise ValueError(f"Page {number} does not exist; there {'is' if pages == 1 else 'are'} {pages} page{'s' if pages > 1 else ''}.")
+    return Page(book.page(number, size), number, pages, total)
+
+
+def _cell_width(cell):
+    return max((len(line) for line in cell.split("\n")), default=0)
+
+
+def column_widths(rows, headers, widths=None):
+    """
+    Returns the width of each column: the widest cell or header, and at least the given widths.
+
+    Args:
+        rows (list): The rows of the table, as lists of strings.
+        headers (tuple): The column headers.
+        widths (list): The widths to start from, e.g. those of the previous page.
+    """
+    widths = list(widths) if widths else [len(header) for header in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], _cell_width(cell))
+    return widths
+
+
+def render_table(rows, headers, widths):
+    """Renders rows as a tabulate table whose columns are at least `widths` wide."""
+    from tabulate import tabulate
+    padded = [header.ljust(width) for header, width in zip(headers, widths)]
+    return tabulate(rows, headers=padded, tablefmt="simple", disable_numparse=True)
+
+
+def contact_row(record):
+    """Returns the table cells of a contact."""
+    return [record.name.value, "; ".join(f"{number:010d}" for number in record.phone_numbers),
+            str(record.birthday) if record.birthday else "",
+            str(record.email) if record.email else "",
+            str(record.address) if record.address else ""]
+
+
+def note_row(note):
+    """Returns the table cells of a note."""
+    return [note.title.value, note.text.value, str(note.tags) if note.tags.tags else ""]
+
+
+def _footer(page, noun):
+    footer = f"Page {page.number} of {page.pages} ({page.total} {noun})."
+    if page.number < page.pages:
+        footer += f" Use --page {page.number + 1} to see more."
+    return footer
+
+
+def render_contacts(page, table=False, widths=None):
+    """
+    Renders a page of contacts.
+
+    Args:
+        page (Page): The page to render.
+        table (bool): Whether to render a table instead of one line per contact.
+        widths (list): With a table, the column widths to start from.
+
+    Returns:
+        tuple: The text and the column widths used (None without a table).
+    """
+    if not page.total:
+        return "The address book is empty.", widths
+    if table:
+        rows = [contact_row(record) for record in page.items]
+        widths = column_widths(rows, CONTACT_HEADERS, widths)
+        body = render_table(rows, CONTACT_HEADERS, widths)
+    else:
+        body = "\n".join(str(record) for record in page.items)
+    return f"All contacts:\n{body}\n{_footer(page, 'contacts')}", widths
+
+
+def render_notes(page, table=False, widths=None):
+    """
+    Renders a page of notes.
+
+    Args:
+        page (Page): The page to render.
+        table (bool): Whether to render a table instead of one block per note.
+        widths (list): With a table, the column widths to start from.
+
+    Returns:
+        tuple: The text and the column widths used (None without a table).
+    """
+    if not page.total:
+        return "The notebook is empty.", widths
+    if table:
+        rows = [note_row(note) for note in page.items]
+        widths = column_widths(rows, NOTE_HEADERS, widths)
+        body = render_table(rows, NOTE_HEADERS, widths)
+    else:
+        body = "\n\n".join(str(note) for note in page.items)
+    return f"All notes:\n{body}\n\n{_footer(page, 'notes')}", widths
+
+
+def show(text, pager=False):
+    """Writes text to the terminal in one write, or through the pager ($PAGER) if asked."""
+    if pager:
+        import pydoc
+        pydoc.pager(text)
+    else:
+        sys.stdout.write(text + "\n")
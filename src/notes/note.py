@@ -14,9 +14,10 @@ Dependencies:
 
 from src.notes.note_fields import Title, Text, Tags
 # Importing Title, Text, and Tags classes for handling note fields (titles, text, tags)
+from src.utils.compact import Compact
 
 
-class Note:
+class Note(Compact):
     """
     A class representing a single note with a title, text, and optional tags.
 
@@ -28,6 +29,8 @@ class Note:
     Methods:
         __str__(): Returns a formatted string representation of the note.
     """
+    # __weakref__ lets database-backed notebooks keep decoded notes in a weak cache
+    __slots__ = ("title", "text", "tags", "__weakref__")
 
     def __init__(self, title, text, tags=None):
         """
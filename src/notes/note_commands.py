@@ -14,7 +14,12 @@ Features:
 - Tags class offers methods to manage a list of tags, including parsing from a comma-separated string.
 """
 from src.utils.utils import input_error  # Decorator for handling input-related errors
+from src.utils.user_input import ask  # Reads answers from the terminal or a batch script
 from src.notes.note import Note  # Note class for creating and managing notes
+from src.notes.note_fields import Title, Text  # Shared validation of titles and text
+
+# Table column widths of the last page shown, so the next page lines up with it
+_table_widths = {}
 
 # Function to add a note to the notebook
 
@@ -33,14 +38,12 @@ def add_note(notebook):
     Returns:
         str: A success message after adding the note.
     """
-    title = input("Enter the title of the note: ").strip()
-    if not title:
-        raise ValueError("Title cannot be empty.")
-    text = input("Enter the text of the note: ").strip()
-    if not text:
-        raise ValueError("Text cannot be empty.")
-
-    tags_input = input(
+    title = ask("Enter the title of the note: ").strip()
+    Title.validate(title, "Title cannot be empty.")
+    text = ask("Enter the text of the note: ").strip()
+    Text.validate(text, "Text cannot be empty.")
+
+    tags_input = ask(
         "Would you like to add tags? (Enter tags separated by commas or press Enter to skip): ").strip()
     tags = tags_input.split(",") if tags_input else []
 
@@ -63,24 +66,20 @@ def edit_note(notebook, note_to_edit):
         str: A success message if the note is edited successfully.
     """
     # Prompt the user for new values
-    new_title = input("Enter the new title of the note: ").strip()
-    if not new_title:
-        raise ValueError("Title cannot be empty.")
-    new_text = input("Enter the new text of the note: ").strip()
-    if not new_text:
-        raise ValueError("Text cannot be empty.")
-
-    new_tags_input = input(
+    new_title = ask("Enter the new title of the note: ").strip()
+    Title.validate(new_title, "Title cannot be empty.")
+    new_text = ask("Enter the new text of the note: ").strip()
+    Text.validate(new_text, "Text cannot be empty.")
+
+    new_tags_input = ask(
         "Enter new tags separated by commas (or press Enter to skip): ").strip()
     new_tags = new_tags_input.split(",") if new_tags_input else []
 
     # Attempt to create a new note
     try:
         new_note = Note(new_title, new_text, ", ".join(new_tags) if new_tags else None)
-        # Add the new note to the notebook
-        notebook.add_note(new_note)
-        # Remove the old note only after the new note is successfully added
-        del notebook.data[note_to_edit.title.value]
+        # Replace the old note only after the new note is successfully created
+        notebook.edit_note(note_to_edit.title.value, new_note)
         return "Note edited successfully."
     except ValueError as e:
         return f"Failed to edit note: {str(e)}"
@@ -99,12 +98,11 @@ def delete_note_by_title(notebook):
     Returns:
         str: A success or error message depending on whether the note was found and deleted.
     """
-    title = input("Enter the title of the note to delete: ").strip()
-    if not title:
-        raise ValueError("Title cannot be empty.")
+    title = ask("Enter the title of the note to delete: ").strip()
+    Title.validate(title, "Title cannot be empty.")
 
     if title in notebook.data:
-        del notebook.data[title]
+        notebook.delete_note(title)
         return f"Note '{title}' deleted successfully."
     return f"Note '{title}' not found."
 
@@ -124,11 +122,11 @@ def find_notes_interactive(notebook):
     Returns:
         str: A message indicating the result of the operation (e.g., no matches, action taken).
     """
-    search_term = input("Enter the search term: ").strip()
+    search_term = ask("Enter the search term: ").strip()
     if not search_term:
         raise ValueError("Search term cannot be empty.")
 
-    search_in = input(
+    search_in = ask(
         "Where do you want to search? (title, text, tags, all): ").strip().lower()
     if search_in not in {"title", "text", "tags", "all"}:
         raise ValueError(
@@ -145,7 +143,7 @@ def find_notes_interactive(notebook):
         print(f"{idx}. {note}\n")
 
     # Ask the user for the next action
-    action = input(
+    action = ask(
         "Would you like to edit or delete a note? (edit/delete/skip): ").strip().lower()
     if action not in {"edit", "delete", "skip"}:
         return "Invalid action. Skipping."
@@ -156,7 +154,7 @@ def find_notes_interactive(notebook):
     try:
         # Validate and retrieve the note to edit or delete
         index = int(
-            input(f"Enter the note number (1-{len(results)}): ").strip())
+            ask(f"Enter the note number (1-{len(results)}): ").strip())
         if index < 1 or index > len(results):
             raise ValueError
         note_to_edit = results[index - 1]
@@ -169,4 +167,49 @@ def find_notes_interactive(notebook):
     if action == "edit":
         # Edit the selected note
         result = edit_note(notebook, note_to_edit)
-        return result
\ No newline at end of file
+        return result
+
+@input_error
+def list_tags(args, notebook):
+    """
+    Without arguments, lists every tag with the number of notes carrying it.
+    With arguments, treats them as a boolean tag query (e.g. "work AND NOT done")
+    and lists the matching notes.
+
+    Args:
+        args: The words of the tag query, if any.
+        notebook: The notebook object to look in.
+
+    Returns:
+        str: The tag counts or the matching notes.
+    """
+    if not args:
+        counts = notebook.tag_counts()
+        if not counts:
+            return "There are no tags."
+        return "\n".join(f"{tag}: {count}" for tag, count in counts)
+
+    results = notebook.find_by_tags(" ".join(args))
+    if not results:
+        return "No matching notes found."
+    found = f"Found {len(results)} matching note{'s' if len(results) > 1 else ''}:\n"
+    return "\n".join([found] + [f"{idx}. {note}\n" for idx, note in enumerate(results, start=1)])
+
+
+@input_error
+def all_notes(args, notebook):
+    """
+    Shows one page of notes.
+
+    Args:
+        args: Paging options: --page N, --page-size N, --table and --pager.
+        notebook: The notebook object to show.
+    """
+    from src.features.render import get_page, parse_page_options, render_notes, show
+
+    options = parse_page_options(args)
+    page = get_page(notebook, options.page, options.page_size)
+    text, widths = render_notes(page, options.table, _table_widths.get(options.page_size))
+    if widths is not None:
+        _table_widths[options.page_size] = widths
+    show(text, options.pager)
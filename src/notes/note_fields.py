@@ -17,14 +17,21 @@ Classes:
     Tags:
         - Manages a list of tags associated with a note.
         - Includes methods for parsing and adding tags from a comma-separated string.
+        - Normalizes every tag once, when it is added: lowercase, single spaces, interned.
 
 Features:
 - Ensures proper validation for note fields such as title and text.
 - Provides utility for managing tags with flexible parsing and representation.
+- Keeps attributes in __slots__ (see `src.utils.compact`) instead of a __dict__.
+- Validates titles and text through `src.utils.validation`, the path the note commands share.
 """
+import sys
 
+from src.utils.compact import Compact
+from src.utils.validation import Validated
 
-class NoteField:
+
+class NoteField(Compact):
     """
     Base class for all note fields such as title and text.
 
@@ -34,6 +41,7 @@ class NoteField:
     Methods:
         __str__(): Returns the string representation of the field.
     """
+    __slots__ = ("value",)
 
     def __init__(self, value):
         self.value = value  # Assign the value to the field
@@ -48,65 +56,51 @@ class NoteField:
         return str(self.value)
 
 
-class Title(NoteField):
+class Title(Validated, NoteField):
     """
     Represents the title of a note.
 
-    Inherits from NoteField and adds validation for the title.
+    Inherits from NoteField and adds validation for the title:
+    `Title(value)` raises ValueError if the title is empty.
     """
+    __slots__ = ()
 
-    def __init__(self, value):
+    @classmethod
+    def parse(cls, value):
         """
-        Initializes the Title object with the given value.
-
-        Args:
-            value: The title of the note.
+        Validates the title of the note.
 
-        Raises:
-            ValueError: If the title is empty.
+        Returns:
+            tuple: (the title, None), or (None, error message) if the title is empty.
         """
         if not value:
-            # Validate that title is not empty
-            raise ValueError("Title is required.")
-        super().__init__(value)  # Initialize the parent class
+            return None, "Title is required."
+        return value, None
 
 
-class Text(NoteField):
+class Text(Validated, NoteField):
     """
     Represents the text content of a note.
 
-    Inherits from NoteField and adds validation for the text.
+    Inherits from NoteField and adds validation for the text:
+    `Text(value)` raises ValueError if the text content is empty.
     """
+    __slots__ = ()
 
-    def __init__(self, value):
-        """
-        Initializes the Text object with the given value.
-
-        Args:
-            value: The text content of the note.
-
-        Raises:
-            ValueError: If the text content is empty.
-        """
-        self.validate(value)  # Validate the text content
-        super().__init__(value)  # Initialize the parent class
-
-    @staticmethod
-    def validate(value):
+    @classmethod
+    def parse(cls, value):
         """
         Validates the text content of the note.
 
-        Args:
-            value: The text content to validate.
-
-        Raises:
-            ValueError: If the text content is empty.
+        Returns:
+            tuple: (the text, None), or (None, error message) if the text content is empty.
         """
         if not value:
-            raise ValueError("The note must contain at least one symbol.")
+            return None, "The note must contain at least one symbol."
+        return value, None
 
 
-class Tags:
+class Tags(Compact):
     """
     Represents the tags associated with a note.
 
@@ -117,6 +111,7 @@ class Tags:
         add_tags_from_string(tags_string): Parses and adds tags from a comma-separated string.
         __str__(): Returns a comma-separated string representation of the tags.
     """
+    __slots__ = ("tags",)
 
     def __init__(self, tags_string=None):
         """
@@ -131,17 +126,36 @@ class Tags:
             # Parse and add tags if provided
             self.add_tags_from_string(tags_string)
 
+    @staticmethod
+    def normalize(tag):
+        """
+        Returns the normalized form of a tag: lowercased, with whitespace collapsed to single spaces.
+
+        Args:
+            tag: The tag as entered by the user.
+        """
+        return sys.intern(" ".join(tag.split()).lower())
+
     def add_tags_from_string(self, tags_string):
         """
         Parses a comma-separated string and adds valid tags to the tags list.
 
+        Tags are normalized here, once, so the tag index and tag queries can compare them exactly.
+
         Args:
             tags_string: A comma-separated string of tags.
         """
-        # Strip whitespace and ignore empty tags
-        tag_list = [tag.strip()
-                    for tag in tags_string.split(",") if tag.strip()]
-        self.tags.extend(tag_list)  # Add the parsed tags to the list
+        # Normalize, ignore empty tags and skip tags the note already has
+        for tag in tags_string.split(","):
+            tag = self.normalize(tag)
+            if tag and tag not in self.tags:
+                self.tags.append(tag)
+
+    def __setstate__(self, state):
+        # Notes saved before tags were normalized are normalized when they are loaded
+        super().__setstate__(state)
+        tags, self.tags = getattr(self, "tags", []), []
+        self.add_tags_from_string(",".join(tags))
 
     def __str__(self):
         """
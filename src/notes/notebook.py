@@ -3,16 +3,299 @@ This module provides the NoteBook class for managing a collection of notes.
 
 Features:
 - Add notes with unique titles.
-- Display all notes in the notebook.
+- Hand out notes one page at a time (rendered by `src.features.render`).
 - Search notes by title, text, tags, or all fields.
+- Keep an inverted index of the words in every field, updated as notes change.
+- Keep a trigram index of those words that narrows substring searches before the final check.
+- Keep an exact tag index answering AND/OR/NOT tag queries and tag counts.
 """
-from collections import UserDict
+from collections import defaultdict
+import re
 
+from src.utils.persistence import PersistentDict
+from src.notes.note_fields import Tags
 
-class NoteBook(UserDict):
+WORD = re.compile(r"\w+")
+FIELDS = ("title", "text", "tags")
+TAG_QUERY_TOKEN = re.compile(r"[()]|[^\s()]+")
+TAG_OPERATORS = ("and", "or", "not")
+
+
+def field_values(note, field):
+    """Returns the lowercased strings of a note field (one per tag for 'tags')."""
+    if field == "title":
+        return [note.title.value.lower()]
+    if field == "text":
+        return [note.text.value.lower()]
+    return [tag.lower() for tag in note.tags.tags]
+
+
+def trigrams(value):
+    """Returns the set of three-character substrings of a string."""
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class TrigramIndex:
+    """
+    A trigram index over the vocabulary of one note field.
+
+    A word can only contain a substring of three or more characters if it contains every
+    trigram of that substring, so intersecting the trigram postings narrows the words that
+    have to be checked with `in` to a handful.
+
+    Attributes:
+        postings (dict): Trigram -> set of words.
+    """
+    MIN_LENGTH = 3
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+
+    def add_word(self, word):
+        for gram in trigrams(word):
+            self.postings[gram].add(word)
+
+    def discard_word(self, word):
+        for gram in trigrams(word):
+            words = self.postings[gram]
+            words.discard(word)
+            if not words:
+                del self.postings[gram]
+
+    def words_containing(self, part, vocabulary):
+        """
+        Returns the words of the vocabulary that contain the given part.
+
+        Parts shorter than three characters have no trigrams, so the whole vocabulary is checked.
+        """
+        if len(part) < self.MIN_LENGTH:
+            return [word for word in vocabulary if part in word]
+        sets = sorted((self.postings.get(gram, set()) for gram in trigrams(part)), key=len)
+        return [word for word in sets[0].intersection(*sets[1:]) if part in word]
+
+
+class InvertedIndex:
+    """
+    An inverted index from lowercased word to the titles of the notes containing it,
+    with separate postings for the title, text and tags fields, plus a trigram index
+    over the words of each field.
+
+    Attributes:
+        postings (dict): Field -> word -> set of note titles.
+        trigrams (dict): Field -> TrigramIndex of the words in `postings`.
+        words (dict): Note title -> field -> the words indexed for it.
+        order (dict): Note title -> insertion number, used to list matches in notebook order.
+    """
+
+    def __init__(self):
+        self.postings = {field: {} for field in FIELDS}
+        self.trigrams = {field: TrigramIndex() for field in FIELDS}
+        self.words = {}
+        self.order = {}
+        self._counter = 0
+
+    def add(self, note):
+        title = note.title.value
+        self.order[title] = self._counter
+        self._counter += 1
+        self.words[title] = {}
+        for field in FIELDS:
+            postings = self.postings[field]
+            words = {word for value in field_values(note, field) for word in WORD.findall(value)}
+            self.words[title][field] = words
+            for word in words:
+                titles = postings.get(word)
+                if titles is None:
+                    titles = postings[word] = set()
+                    self.trigrams[field].add_word(word)
+                titles.add(title)
+
+    def discard(self, note):
+        title = note.title.value
+        for field, words in self.words.pop(title, {}).items():
+            postings = self.postings[field]
+            for word in words:
+                titles = postings[word]
+                titles.discard(title)
+                if not titles:
+                    del postings[word]
+                    self.trigrams[field].discard_word(word)
+        self.order.pop(title, None)
+
+    def update(self, note):
+        self.discard(note)
+        self.add(note)
+
+    def match_words(self, search_term, fields):
+        """Returns the titles of the notes containing every word of the search term in one of the fields."""
+        result = None
+        for word in WORD.findall(search_term.lower()):
+            titles = set().union(*(self.postings[field].get(word, ()) for field in fields))
+            result = titles if result is None else result & titles
+        return result or set()
+
+    def match_substring(self, search_term, fields):
+        """
+        Finds the notes that can contain the search term as a substring of one of the fields.
+
+        Every run of word characters in the term must lie inside an indexed word of the
+        field, so the candidates are the notes holding, for each run, a word that contains
+        it. A term made of a single run can only occur inside one word, so its candidates
+        are exact; other terms still need the final `in` check.
+
+        Returns:
+            tuple or None: (set of titles, whether they are exact), or None if the term has
+                           no word characters and cannot be answered from the index.
+        """
+        term = search_term.lower()
+        parts = WORD.findall(term)
+        if not parts:
+            return None
+        titles = set()
+        for field in fields:
+            postings = self.postings[field]
+            candidates = None
+            for part in parts:
+                words = self.trigrams[field].words_containing(part, postings)
+                found = set().union(*(postings[word] for word in words))
+                candidates = found if candidates is None else candidates & found
+            titles |= candidates
+        return titles, parts == [term]
+
+    def in_order(self, titles):
+        """Sorts note titles in the order the notes were added."""
+        return sorted(titles, key=self.order.__getitem__)
+
+
+def parse_tag_query(query):
+    """
+    Parses a boolean tag query such as "work AND (urgent OR NOT done)".
+
+    The operators are AND, OR and NOT in any case, plus parentheses; NOT binds tightest,
+    then AND, then OR. Consecutive words that are not operators form one multi-word tag.
+
+    Args:
+        query: The query string.
+
+    Returns:
+        tuple: A tree of ("or" | "and", left, right), ("not", operand) and ("tag", tag) nodes,
+            with every tag normalized like the tags of the notes.
+
+    Raises:
+        ValueError: If the query is empty or malformed.
+    """
+    tokens = TAG_QUERY_TOKEN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position].lower() if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "or":
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == "and":
+            take()
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        token = peek()
+        if token == "not":
+            take()
+            return ("not", parse_not())
+        if token == "(":
+            take()
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError("Invalid tag query: missing ')'.")
+            take()
+            return node
+        words = []
+        while peek() is not None and peek() not in TAG_OPERATORS + ("(", ")"):
+            words.append(take())
+        if not words:
+            raise ValueError("Invalid tag query: a tag is missing.")
+        return ("tag", Tags.normalize(" ".join(words)))
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Invalid tag query: unexpected '{tokens[position]}'.")
+    return tree
+
+
+class TagIndex:
+    """
+    An exact index from normalized tag to the titles of the notes carrying it.
+
+    Attributes:
+        notes (dict): Tag -> set of note titles.
+        order (dict): Note title -> insertion number, used to list matches in notebook order.
+    """
+
+    def __init__(self):
+        self.notes = {}
+        self.order = {}
+        self._counter = 0
+
+    def add(self, note):
+        title = note.title.value
+        self.order[title] = self._counter
+        self._counter += 1
+        for tag in note.tags.tags:
+            self.notes.setdefault(tag, set()).add(title)
+
+    def discard(self, note):
+        title = note.title.value
+        for tag in note.tags.tags:
+            titles = self.notes.get(tag)
+            if titles is not None:
+                titles.discard(title)
+                if not titles:
+                    del self.notes[tag]
+        self.order.pop(title, None)
+
+    def update(self, note):
+        self.discard(note)
+        self.add(note)
+
+    def counts(self):
+        """Returns (tag, number of notes) pairs, most used tags first."""
+        return sorted(((tag, len(titles)) for tag, titles in self.notes.items()),
+                      key=lambda item: (-item[1], item[0]))
+
+    def query(self, tree):
+        """Returns the titles matching a parsed tag query, in notebook order."""
+        def evaluate(node):
+            if node[0] == "tag":
+                return self.notes.get(node[1], set())
+            if node[0] == "not":
+                return self.order.keys() - evaluate(node[1])
+            left, right = evaluate(node[1]), evaluate(node[2])
+            return left & right if node[0] == "and" else left | right
+
+        return sorted(evaluate(tree), key=self.order.__getitem__)
+
+
+class NoteBook(PersistentDict):
     """
     A class to manage a collection of notes. Inherits from UserDict for dictionary-like behavior.
     """
+    storage_kind = "notes"
+    INDEXES = {
+        "words": InvertedIndex,
+        "tags": TagIndex,
+    }
 
     def add_note(self, note):
         """
@@ -27,33 +310,130 @@ class NoteBook(UserDict):
         if note.title.value in self.data:
             raise ValueError("Note with this title already exists.")
         self.data[note.title.value] = note
+        for index in self._built_indexes():
+            index.add(note)
+        self._log("put", note.title.value, note)
 
-    def display_all_notes(self):
+    def edit_note(self, old_title, new_note):
         """
-        Displays all notes in the notebook. If the notebook is empty, it notifies the user.
+        Replaces a note with its edited version, which may carry a new title.
+
+        Args:
+            old_title: The title of the note being edited.
+            new_note: The Note object replacing it.
+
+        Raises:
+            ValueError: If the new title is already used by another note.
         """
-        if not self.data:
-            print("The notebook is empty.")
-            return
-        print("All notes:")
-        for note in self.data.values():
-            print(note)
-            print()
+        if new_note.title.value != old_title and new_note.title.value in self.data:
+            raise ValueError("Note with this title already exists.")
+        self.delete_note(old_title)
+        self.data[new_note.title.value] = new_note
+        for index in self._built_indexes():
+            index.add(new_note)
+        self._log("put", new_note.title.value, new_note)
 
-    def find_notes(self, search_term, search_in):
+    def delete_note(self, title):
+        """
+        Removes a note from the notebook.
+
+        Args:
+            title: The title of the note to delete.
+
+        Raises:
+            KeyError: If there is no note with this title.
+        """
+        note = self.data.pop(title)
+        for index in self._built_indexes():
+            index.discard(note)
+        self._log("delete", title)
+
+    def tag_counts(self):
+        """
+        Returns every tag with the number of notes carrying it, most used tags first.
+
+        Returns:
+            list: (tag, count) pairs.
+        """
+        # A database-backed notebook counts the rows of its tag table instead
+        tag_counts = getattr(self.data, "tag_counts", None)
+        if tag_counts is not None:
+            return tag_counts()
+        return self._index("tags").counts()
+
+    def find_by_tags(self, query):
+        """
+        Finds the notes matching a boolean tag query, such as "work AND NOT done".
+
+        Args:
+            query: The query; see parse_tag_query for the syntax.
+
+        Returns:
+            list: The matching Note objects, in notebook order.
+
+        Raises:
+            ValueError: If the query is malformed.
+        """
+        tree = parse_tag_query(query)
+        # A database-backed notebook evaluates the query against its tag table
+        find_by_tags = getattr(self.data, "find_by_tags", None)
+        if find_by_tags is not None:
+            return find_by_tags(tree)
+        return [self.data[title] for title in self._index("tags").query(tree)]
+
+    def find_notes(self, search_term, search_in, mode="substring"):
         """
         Searches for notes based on a search term and a specified field.
 
+        Both modes are answered from the indexes:
+        - 'substring' returns the notes containing the search term anywhere in the field,
+          ignoring case (the original find-notes behaviour). The candidates come from the
+          words of the inverted index that contain the term, found through their trigrams,
+          and are checked with `in` when the term spans several words.
+        - 'words' returns the notes containing every word of the search term as a whole word.
+
         Args:
             search_term: The term to search for.
             search_in: The field to search in ('title', 'text', 'tags', or 'all').
+            mode: Either 'substring' (default) or 'words'.
 
         Returns:
-            list: A list of Note objects that match the search criteria.
+            list: A list of Note objects that match the search criteria, in notebook order.
 
         Raises:
-            ValueError: If an invalid search field is provided.
+            ValueError: If an invalid search field or mode is provided.
         """
+        if search_in not in FIELDS + ("all",):
+            raise ValueError("Invalid search field.")
+        if mode not in ("substring", "words"):
+            raise ValueError("Invalid search mode.")
+        fields = FIELDS if search_in == "all" else (search_in,)
+
+        # A database-backed notebook runs a substring search as a query
+        find_notes = getattr(self.data, "find_notes", None)
+        if find_notes is not None and mode == "substring":
+            return find_notes(search_term, search_in)
+
+        index = self._index("words")
+        if mode == "words":
+            titles = index.match_words(search_term, fields)
+        else:
+            match = index.match_substring(search_term, fields)
+            if match is None:
+                return self._scan(search_term, search_in)
+            titles, exact = match
+            if len(titles) * 2 > len(self.data):
+                # Most notes are candidates anyway, so one pass over them is cheaper
+                return self._scan(search_term, search_in)
+            if not exact:
+                term = search_term.lower()
+                titles = [title for title in titles
+                          if any(term in value for field in fields
+                                 for value in field_values(self.data[title], field))]
+        return [self.data[title] for title in index.in_order(titles)]
+
+    def _scan(self, search_term, search_in):
+        """Checks the search term against every note; used for terms the index cannot answer."""
         if search_in == "title":
             return [note for note in self.data.values() if search_term.lower() in note.title.value.lower()]
         elif search_in == "text":
@@ -0,0 +1,73 @@
+"""
+This module runs a script of commands without the interactive prompt.
+
+Each line of the script is one command, typed as it would be at the prompt. Blank lines
+and lines starting with '#' are skipped. When a command asks a question (the title of a
+new note, a search term), the answer is read from the next line of the script; yes/no
+confirmations are all answered the same way, as chosen on the command line, and optional
+offers are declined.
+
+The whole script runs as one transaction: mutations are not journaled and the books are
+saved once at the end. If a command fails with an unexpected error, the run stops and
+nothing is saved.
+"""
+
+from collections import namedtuple
+from contextlib import ExitStack, redirect_stdout
+import os
+import time
+
+from src.utils.command_registry import get_command
+from src.utils.metrics import METRICS
+from src.utils.user_input import ScriptInput, set_input
+from src.utils.utils import parse_input
+
+BatchStats = namedtuple("BatchStats", ["commands", "seconds"])
+
+
+def script_lines(stream):
+    """Yields the lines of a script without their line endings."""
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def run_batch(stream, state, answer="no", quiet=False):
+    """
+    Runs every command of a script against the books in one transaction.
+
+    Args:
+        stream: The script, an iterable of lines (an open file or sys.stdin).
+        state (dict): The books by name ("book", "notebook").
+        answer (str): The answer given to every yes/no question, "yes" or "no".
+        quiet (bool): Whether to suppress everything the commands print.
+
+    Returns:
+        BatchStats: The number of commands run and the time they took, without the save.
+    """
+    lines = script_lines(stream)
+    previous = set_input(ScriptInput(lines, answer))
+    commands = 0
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for book in state.values():
+                stack.enter_context(book.transaction())
+            if quiet:
+                stack.enter_context(redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            for line in lines:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                command, *args = parse_input(line)
+                commands += 1
+                spec = get_command(command)
+                if spec is None:
+                    result = "Invalid command."
+                else:
+                    result = METRICS.measure(spec.name, spec.run, args, state)
+                if result is not None:
+                    print(result)
+                if spec is not None and spec.exits:
+                    break
+    finally:
+        set_input(previous)
+    return BatchStats(commands, time.perf_counter() - start)
@@ -1,17 +1,168 @@
-"""This module contains the CommandCompleter class."""
+"""
+This module contains the CommandCompleter class and the CompletionEngine that runs it
+off the UI thread.
 
-from prompt_toolkit.completion import Completer, Completion
+CommandCompleter completes command names and the contact name argument of contact
+commands. Name completions are cached per prefix: while the user keeps typing, a cached
+result that was not cut at the limit is narrowed in place instead of querying the book.
+
+CompletionEngine runs the completer in a background thread like prompt_toolkit's
+ThreadedCompleter, drops requests superseded by a newer keystroke and keeps latency
+counters, so we can check that completion stays within one frame.
+"""
+
+from bisect import bisect_left
+import time
+
+from prompt_toolkit.completion import Completer, Completion, ThreadedCompleter
+from prompt_toolkit.eventloop import aclosing, generator_to_async_generator
+from src.constants.controls import COMMANDS
+
+# Commands whose first argument is a contact name
+NAME_COMMANDS = (
+    COMMANDS["show_contact"],
+    COMMANDS["change_contact"],
+    COMMANDS["delete_contact"],
+    COMMANDS["add_birthday"],
+    COMMANDS["show_birthday"],
+)
+NAME_COMPLETION_LIMIT = 20
+NAME_CACHE_SIZE = 256
+# One frame at 60 Hz
+FRAME_SECONDS = 1 / 60
 
 
 class CommandCompleter(Completer):
-    """The class to provide command completions."""
+    """The class to provide command completions and contact name completions."""
 
-    def __init__(self, commands):
-        self.commands = commands
+    def __init__(self, commands, book=None):
+        self.commands = sorted(commands)
+        self.book = book
+        self._cache = {}
+        self._cache_changes = None
 
     def get_completions(self, document, complete_event):
         if document.cursor_position == 0 or " " not in document.text_before_cursor:
             word_before_cursor = document.get_word_before_cursor()
-            for command in self.commands:
-                if command.startswith(word_before_cursor):
-                    yield Completion(command, start_position=-len(word_before_cursor))
+            i = bisect_left(self.commands, word_before_cursor)
+            while i < len(self.commands) and self.commands[i].startswith(word_before_cursor):
+                yield Completion(self.commands[i], start_position=-len(word_before_cursor))
+                i += 1
+            return
+
+        # Complete the (possibly multi-word) contact name after a contact command
+        command, _, name_prefix = document.text_before_cursor.lstrip().partition(" ")
+        if self.book is None or command.lower() not in NAME_COMMANDS:
+            return
+        name_prefix = name_prefix.lstrip()
+        for name in self.complete_name(name_prefix):
+            yield Completion(name, start_position=-len(name_prefix))
+
+    def complete_name(self, prefix):
+        """
+        Returns the contact names starting with the prefix, using the per-prefix cache.
+
+        Args:
+            prefix (str): The part of the name typed so far.
+        """
+        if self._cache_changes != self.book.changes:
+            # The book changed since the cache was filled
+            self._cache.clear()
+            self._cache_changes = self.book.changes
+        key = prefix.casefold()
+        if key in self._cache:
+            return self._cache[key][0]
+
+        # Narrow the result of the longest cached shorter prefix, if it holds every match
+        for cut in range(len(key) - 1, -1, -1):
+            cached = self._cache.get(key[:cut])
+            if cached is not None and not cached[1]:
+                names = [name for name in cached[0] if name.casefold().startswith(key)]
+                truncated = False
+                break
+        else:
+            # This runs on the completion thread, which must not build the index while a
+            # job changes the book; until the worker has built it, there is nothing to offer
+            names = self.book.complete_name(prefix, NAME_COMPLETION_LIMIT + 1, build=False)
+            if names is None:
+                return []
+            truncated = len(names) > NAME_COMPLETION_LIMIT
+            names = names[:NAME_COMPLETION_LIMIT]
+
+        if len(self._cache) >= NAME_CACHE_SIZE:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (names, truncated)
+        return names
+
+
+class CompletionLatency:
+    """
+    Per-keystroke completion latency counters.
+
+    Attributes:
+        count (int): The number of completion requests.
+        cancelled (int): Requests dropped because a newer keystroke superseded them.
+        over_frame (int): Requests that took longer than one frame.
+        total (float): The total time spent, in seconds.
+        worst (float): The slowest request, in seconds.
+    """
+
+    def __init__(self):
+        self.count = self.cancelled = self.over_frame = 0
+        self.total = self.worst = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+        if seconds > FRAME_SECONDS:
+            self.over_frame += 1
+
+    def __str__(self):
+        average = self.total / self.count * 1000 if self.count else 0.0
+        return (f"completions: {self.count}, cancelled: {self.cancelled}, "
+                f"average: {average:.2f} ms, worst: {self.worst * 1000:.2f} ms, "
+                f"over one frame: {self.over_frame}")
+
+    def as_dict(self):
+        """Returns the counters with the times in milliseconds, for the metrics file."""
+        return {
+            "count": self.count,
+            "cancelled": self.cancelled,
+            "over_frame": self.over_frame,
+            "total_ms": round(self.total * 1000, 3),
+            "max_ms": round(self.worst * 1000, 3),
+        }
+
+
+class CompletionEngine(ThreadedCompleter):
+    """
+    Runs a completer in a background thread, dropping requests made stale by newer keystrokes.
+
+    Attributes:
+        latency (CompletionLatency): The per-keystroke latency counters.
+    """
+
+    def __init__(self, completer):
+        super().__init__(completer)
+        self.latency = CompletionLatency()
+        self._generation = 0
+
+    def _complete(self, document, complete_event, generation):
+        start = time.perf_counter()
+        try:
+            for completion in self.completer.get_completions(document, complete_event):
+                if generation != self._generation:
+                    self.latency.cancelled += 1
+                    return
+                yield completion
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+    async def get_completions_async(self, document, complete_event):
+        self._generation += 1
+        generation = self._generation
+        async with aclosing(generator_to_async_generator(
+                lambda: self._complete(document, complete_event, generation))) as completions:
+            async for completion in completions:
+                yield completion
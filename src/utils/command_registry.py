@@ -0,0 +1,128 @@
+"""
+This module contains the registry that maps command names to their handlers.
+
+Every command in `src.constants.controls.COMMANDS` is registered with a CommandSpec that
+names the module and attribute of its handler instead of the handler itself. The module
+is imported the first time the command runs, so a session only pays for the subsystems
+it actually uses, and dispatch is a single dictionary lookup.
+
+New commands are added by calling `register`; `main.py` does not need to change.
+"""
+
+from importlib import import_module
+
+from src.constants.controls import COMMANDS
+
+GREETING = "How can I help you?"
+FAREWELL = "Good bye!"
+
+
+class CommandSpec:
+    """
+    Describes how to run one command.
+
+    Attributes:
+        name (str): The command name typed by the user.
+        module (str): The module holding the handler, imported on first use.
+        attribute (str): The dotted path of the handler inside the module.
+        state (str or tuple): The state passed to the handler: "book", "notebook", a tuple
+            of both, or None.
+        takes_args (bool): Whether the handler receives the command arguments.
+        interactive (bool): Whether the command always asks the user questions, so it
+            cannot run in the background.
+        exits (bool): Whether the command ends the session.
+    """
+
+    def __init__(self, name, module, attribute, state=None, takes_args=False, interactive=False, exits=False):
+        self.name = name
+        self.module = module
+        self.attribute = attribute
+        self.state = state
+        self.takes_args = takes_args
+        self.interactive = interactive
+        self.exits = exits
+        self._handler = None
+
+    @property
+    def handler(self):
+        """The handler function, importing its module on first access."""
+        if self._handler is None:
+            handler = import_module(self.module)
+            for part in self.attribute.split("."):
+                handler = getattr(handler, part)
+            self._handler = handler
+        return self._handler
+
+    def run(self, args, state):
+        """
+        Runs the handler and returns its result.
+
+        Args:
+            args (list): The arguments typed after the command name.
+            state (dict): The available state by name ("book", "notebook").
+        """
+        names = (self.state,) if isinstance(self.state, str) else self.state or ()
+        call_args = [state[name] for name in names]
+        if self.takes_args:
+            call_args.insert(0, args)
+        return self.handler(*call_args)
+
+
+REGISTRY = {}
+
+
+def register(key, module, attribute, **options):
+    """
+    Registers the handler of a command.
+
+    Args:
+        key (str): The key of the command in COMMANDS, or the command name itself.
+        module (str): The module holding the handler.
+        attribute (str): The dotted path of the handler inside the module.
+        **options: The remaining CommandSpec attributes.
+    """
+    name = COMMANDS.get(key, key)
+    REGISTRY[name] = CommandSpec(name, module, attribute, **options)
+
+
+def get_command(name):
+    """Returns the CommandSpec registered under a command name, or None."""
+    return REGISTRY.get(name)
+
+
+def hello():
+    """Greets the user."""
+    return GREETING
+
+
+def goodbye():
+    """Says goodbye before the session ends."""
+    return FAREWELL
+
+
+CONTACTS = "src.contacts.commands"
+NOTES = "src.notes.note_commands"
+
+register("hello", __name__, "hello")
+register("add_contact", CONTACTS, "add_contact", state="book", takes_args=True)
+register("change_contact", CONTACTS, "change_contact", state="book", takes_args=True)
+register("delete_contact", CONTACTS, "delete_contact", state="book", takes_args=True, interactive=True)
+register("show_contact", CONTACTS, "show_contact", state="book", takes_args=True)
+register("find_by_phone", CONTACTS, "find_by_phone", state="book", takes_args=True)
+register("all_contacts", CONTACTS, "all_contacts", state="book", takes_args=True)
+register("add_birthday", CONTACTS, "add_birthday", state="book", takes_args=True)
+register("show_birthday", CONTACTS, "show_birthday", state="book", takes_args=True)
+register("birthdays", CONTACTS, "birthdays", state="book", takes_args=True)
+register("import_contacts", CONTACTS, "import_contacts", state="book", takes_args=True)
+register("export_contacts", CONTACTS, "export_contacts", state="book", takes_args=True)
+register("add_note", NOTES, "add_note", state="notebook", interactive=True)
+register("all_notes", NOTES, "all_notes", state="notebook", takes_args=True)
+register("find_notes", NOTES, "find_notes_interactive", state="notebook", interactive=True)
+register("tags", NOTES, "list_tags", state="notebook", takes_args=True)
+register("stats", "src.utils.metrics", "show_stats")
+register("jobs", "src.utils.jobs", "list_jobs")
+register("cancel", "src.utils.jobs", "cancel_job", takes_args=True)
+register("mem_report", "src.features.memory_report", "mem_report", state=("book", "notebook"), takes_args=True)
+register("help", "src.features.help", "print_help")
+register("close", __name__, "goodbye", exits=True)
+register("exit", __name__, "goodbye", exits=True)
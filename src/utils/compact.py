@@ -0,0 +1,52 @@
+"""This module contains the base class of the compact objects stored in the books."""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def state_slots(cls):
+    """Returns the names of the slots of a class that are pickled, base classes first."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        slots = (slots,) if isinstance(slots, str) else slots
+        names += [name for name in slots if name != "__weakref__" and name not in cls._transient]
+    return tuple(names)
+
+
+class Compact:
+    """
+    Base class for objects that keep their attributes in __slots__ instead of a __dict__.
+
+    They pickle as a dict of their set slots: the same shape as the __dict__ pickled by
+    the earlier versions of the classes, so old data files load through `__setstate__`.
+    Keys that are no longer slots are dropped, and subclasses whose attributes changed
+    convert the old state in `_migrate`. The slots named in `_transient` are not pickled
+    and are reset to None when an object is loaded.
+    """
+    __slots__ = ()
+    _transient = ()
+
+    def __getstate__(self):
+        state = {}
+        for name in state_slots(type(self)):
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            # (dict, slots) pairs, as written by the default protocol for slotted objects
+            state = {**(state[0] or {}), **state[1]}
+        state = self._migrate(state)
+        for name in state_slots(type(self)):
+            if name in state:
+                setattr(self, name, state[name])
+        for name in self._transient:
+            setattr(self, name, None)
+
+    def _migrate(self, state):
+        """Converts the state pickled by an older version of the class; returns the new state."""
+        return state
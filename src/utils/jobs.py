@@ -0,0 +1,221 @@
+"""
+This module runs the commands that touch the books as jobs on a single worker thread.
+
+The interactive loop stays on the asyncio event loop and hands every command that needs
+the address book or the notebook to the JobRunner. One worker thread runs the jobs in the
+order they were submitted, so the books are never changed by two threads at once, while
+the prompt stays responsive: a command can run in the background, its progress can be
+followed, and it can be cancelled.
+
+Cancellation is cooperative. Long operations (imports, exports, index builds) call
+`checkpoint` every few thousand items; it records their progress and raises JobCancelled
+if the job was cancelled. Outside of a job, for example in batch mode, `checkpoint`
+does nothing.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import threading
+import time
+
+from src.utils.utils import input_error
+
+# Finished jobs kept for the `jobs` command
+KEEP_FINISHED = 10
+
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job that was cancelled, at its next checkpoint."""
+
+
+def current_job():
+    """Returns the job running on this thread, or None."""
+    return getattr(_local, "job", None)
+
+
+def checkpoint(done=None, total=None, unit=""):
+    """
+    Records the progress of the running job and stops it if it was cancelled.
+
+    Args:
+        done (int): The number of items processed so far.
+        total (int): The number of items to process, if known.
+        unit (str): What the items are, e.g. "rows".
+
+    Raises:
+        JobCancelled: If the running job was cancelled.
+    """
+    job = getattr(_local, "job", None)
+    if job is None:
+        return
+    if job.cancelled.is_set():
+        raise JobCancelled()
+    if done is not None:
+        job.progress = f"{done}/{total} {unit}" if total else f"{done} {unit}"
+
+
+class Job:
+    """
+    One command submitted to the worker thread.
+
+    A job dropped before it started has a cancelled future; a job stopped at a checkpoint
+    raises JobCancelled from its future.
+
+    Attributes:
+        number (int): The job number shown to the user.
+        line (str): The command line that started the job.
+        background (bool): Whether the job runs in the background.
+        status (str): "queued", "running", "done", "failed" or "cancelled".
+        progress (str): The last progress reported through `checkpoint`.
+        cancelled (threading.Event): Set when the job is asked to stop.
+        future (Future): The result of the job.
+    """
+
+    def __init__(self, number, line, func, background):
+        self.number = number
+        self.line = line
+        self.background = background
+        self.status = "queued"
+        self.progress = ""
+        self.cancelled = threading.Event()
+        self.future = None
+        self._func = func
+        self._started = self._finished = None
+
+    def cancel(self):
+        """Asks the job to stop at its next checkpoint; a queued job is dropped at once."""
+        self.cancelled.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def seconds(self):
+        """The time the job has been running, or ran, in seconds."""
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    def run(self):
+        """Runs the job on the worker thread and returns its result."""
+        if self.cancelled.is_set():
+            self.status = "cancelled"
+            raise JobCancelled()
+        _local.job = self
+        self.status = "running"
+        self._started = time.perf_counter()
+        try:
+            result = self._func()
+        except JobCancelled:
+            self.status = "cancelled"
+            raise
+        except BaseException:
+            self.status = "failed"
+            raise
+        finally:
+            self._finished = time.perf_counter()
+            _local.job = None
+        self.status = "done"
+        return result
+
+    def __str__(self):
+        line = f"[{self.number}] {self.status:<9} {self.seconds:7.1f} s  {self.line}"
+        if self.progress and not self.done:
+            line += f"  ({self.progress})"
+        return line
+
+
+class JobRunner:
+    """
+    Runs jobs one at a time on a worker thread.
+
+    Attributes:
+        jobs (dict): Job number -> Job, for the unfinished and the latest finished jobs.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._numbers = itertools.count(1)
+        self._executor = None
+
+    def submit(self, line, func, background=False):
+        """
+        Queues a function as a job.
+
+        Args:
+            line (str): The command line shown for the job.
+            func: The function to run, without arguments.
+            background (bool): Whether the job runs in the background.
+
+        Returns:
+            Job: The queued job; its `future` holds the result.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="books")
+        self._forget_finished()
+        job = Job(next(self._numbers), line, func, background)
+        job.future = self._executor.submit(job.run)
+        self.jobs[job.number] = job
+        return job
+
+    def pending(self):
+        """Returns the jobs that are queued or running."""
+        return [job for job in self.jobs.values() if not job.done]
+
+    def cancel(self, number):
+        """
+        Cancels a job by number.
+
+        Raises:
+            ValueError: If there is no such job or it already finished.
+        """
+        job = self.jobs.get(number)
+        if job is None or job.done:
+            raise ValueError(f"There is no running job {number}.")
+        job.cancel()
+        return job
+
+    def shutdown(self):
+        """Waits for the submitted jobs to finish and stops the worker thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _forget_finished(self):
+        finished = [number for number, job in self.jobs.items() if job.done]
+        for number in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[number]
+
+    def report(self):
+        """Returns the unfinished and the latest finished jobs, one per line."""
+        if not self.jobs:
+            return "No jobs."
+        return "\n".join(str(job) for job in self.jobs.values())
+
+
+JOBS = JobRunner()
+
+
+def list_jobs():
+    """Shows the queued, running and recently finished jobs."""
+    return JOBS.report()
+
+
+@input_error
+def cancel_job(args):
+    """
+    Cancels a queued or running job.
+
+    Args:
+        args (list): The job number, as shown by `jobs`.
+    """
+    number = args[0].strip("[]") if len(args) == 1 else ""
+    if not number.isdigit():
+        raise ValueError("Please provide the number of the job to cancel, as shown by 'jobs'.")
+    job = JOBS.cancel(int(number))
+    return f"Cancelling job [{job.number}] {job.line}."
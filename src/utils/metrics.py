@@ -0,0 +1,191 @@
+"""
+This module records how long each command takes in a session.
+
+Every dispatched command goes through `Metrics.measure`, which counts it, notes whether it
+failed and adds its latency to a histogram with fixed buckets. The bucket bounds grow by a
+factor of 2 ** (1 / 4), from 10 microseconds to about 100 seconds, so recording a sample is
+a binary search and an increment, and the percentiles shown by the `stats` command are
+accurate to about 10%.
+
+A command fails when it raises, or when `input_error` turns an exception into a message;
+the decorator reports those through `Metrics.handled_error`.
+
+With `main.py --metrics FILE`, the histograms are appended to FILE as JSON Lines when the
+session ends, one line per command, so several sessions can be added up.
+
+The latency of name completion, which runs per keystroke rather than per command, is
+kept by the prompt's CompletionEngine; once `completion` points at its counters, they
+are shown by `stats` and written to the file as a line of their own.
+"""
+
+from bisect import bisect_left
+from datetime import datetime, timezone
+import json
+import threading
+import time
+
+# Upper bounds of the histogram buckets, in seconds; a last bucket holds anything slower
+BUCKET_BOUNDS = tuple(1e-5 * 2 ** (i / 4) for i in range(94))
+
+
+class CommandMetrics:
+    """
+    The counters and latency histogram of one command.
+
+    Attributes:
+        count (int): How many times the command ran.
+        errors (int): How many of those runs failed.
+        total (float): The summed latency, in seconds.
+        slowest (float): The highest latency, in seconds.
+        buckets (list): Sample counts per bucket of BUCKET_BOUNDS, plus one for slower samples.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds, failed=False):
+        """Records one run of the command."""
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def percentile(self, q):
+        """
+        Returns an estimate of a latency percentile, in seconds.
+
+        The estimate is the upper bound of the bucket holding the percentile, capped
+        at the slowest run.
+
+        Args:
+            q (float): The percentile, between 0 and 100.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for i, samples in enumerate(self.buckets):
+            seen += samples
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.slowest
+                return min(bound, self.slowest)
+        return self.slowest
+
+
+class Metrics:
+    """
+    The per-command metrics of a session.
+
+    Attributes:
+        commands (dict): Command name -> CommandMetrics.
+        completion (CompletionLatency): The completion latency counters of the prompt, or None.
+        started (datetime): When the session started.
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.completion = None
+        self.started = datetime.now(timezone.utc)
+        # Errors turned into messages by `input_error`, counted per thread, as commands
+        # run both on the main thread and on the worker thread of `src.utils.jobs`
+        self._local = threading.local()
+
+    @property
+    def handled(self):
+        """The number of errors turned into messages on this thread so far."""
+        return getattr(self._local, "handled", 0)
+
+    def handled_error(self):
+        """Notes that the running command failed with an error that was turned into a message."""
+        self._local.handled = self.handled + 1
+
+    def measure(self, name, func, *args):
+        """
+        Runs a command and records its latency and outcome.
+
+        Args:
+            name (str): The command name the metrics are kept under.
+            func: The function running the command.
+            *args: The arguments passed to func.
+
+        Returns:
+            The result of func.
+        """
+        handled = self.handled
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except BaseException:
+            self.add(name, time.perf_counter() - start, True)
+            raise
+        self.add(name, time.perf_counter() - start, self.handled != handled)
+        return result
+
+    def add(self, name, seconds, failed=False):
+        """Records one run of a command."""
+        metrics = self.commands.get(name)
+        if metrics is None:
+            metrics = self.commands[name] = CommandMetrics()
+        metrics.add(seconds, failed)
+
+    def report(self):
+        """Returns the count, errors and latency percentiles of every command as a table."""
+        if not self.commands:
+            return self._with_completion("No commands have run yet.")
+        width = max(len("command"), *(len(name) for name in self.commands))
+        lines = [f"{'command':<{width}}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}"
+                 f"{'p99 ms':>10}{'max ms':>10}"]
+        for name, metrics in sorted(self.commands.items()):
+            p50, p95, p99 = (metrics.percentile(q) * 1000 for q in (50, 95, 99))
+            lines.append(f"{name:<{width}}{metrics.count:>7}{metrics.errors:>8}{p50:>10.2f}{p95:>10.2f}"
+                         f"{p99:>10.2f}{metrics.slowest * 1000:>10.2f}")
+        return self._with_completion("\n".join(lines))
+
+    def _with_completion(self, report):
+        if self.completion is None or not self.completion.count:
+            return report
+        return f"{report}\nName completion: {self.completion}"
+
+    def flush(self, filename):
+        """
+        Appends the metrics of every command to a JSON Lines file.
+
+        Each line holds the session start and end, the command, its counters, and the
+        non-empty histogram buckets keyed by their upper bound in milliseconds ("inf"
+        for the last one), so lines of the same command can be summed across sessions.
+        The completion counters, if any completion ran, go to a last line under "completion".
+        """
+        ended = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        session = {"session_start": self.started.isoformat(timespec="seconds"), "session_end": ended}
+        with open(filename, "a", encoding="utf-8") as f:
+            for name, metrics in sorted(self.commands.items()):
+                buckets = {}
+                for i, samples in enumerate(metrics.buckets):
+                    if samples:
+                        bound = f"{BUCKET_BOUNDS[i] * 1000:.6g}" if i < len(BUCKET_BOUNDS) else "inf"
+                        buckets[bound] = samples
+                f.write(json.dumps({
+                    **session,
+                    "command": name,
+                    "count": metrics.count,
+                    "errors": metrics.errors,
+                    "total_ms": round(metrics.total * 1000, 3),
+                    "max_ms": round(metrics.slowest * 1000, 3),
+                    "buckets": buckets,
+                }) + "\n")
+            if self.completion is not None and self.completion.count:
+                f.write(json.dumps({**session, "completion": self.completion.as_dict()}) + "\n")
+
+
+METRICS = Metrics()
+
+
+def show_stats():
+    """Shows the count, errors and p50/p95/p99 latency of every command run in this session."""
+    return METRICS.report()
@@ -1,16 +1,430 @@
-"""This module provides functions for saving and loading data using the pickle module."""
+"""This module provides functions for saving and loading data using the pickle module.
 
+Besides the full snapshot written by `save_data`, every book keeps an append-only
+journal next to its data file. Each mutation is appended to the journal as a small
+pickled entry, so a crash loses nothing that happened since the last snapshot.
+`load_data` replays the journal on top of the snapshot, and once the journal grows
+past `JOURNAL_COMPACT_BYTES` it is sealed and folded into the snapshot by a
+background thread. Journal writes are fsynced, one fsync per mutation or per batch.
+
+Snapshots are only written for books that changed since they were loaded. They go to a
+temporary file that is fsynced and then renamed over the old one, so an interrupted
+save never leaves a truncated data file behind.
+
+The pickle file is one of several storage backends; files ending in `.db` or `.sqlite`
+are stored in an indexed SQLite database instead (see `src.utils.sqlite_storage`), and
+files ending in `.rec` in a memory-mapped record store that decodes records on access
+(see `src.utils.record_store`).
+"""
+
+from collections import UserDict, namedtuple
+from contextlib import contextmanager
+import glob
+from itertools import islice
+import os
 import pickle
+import threading
+import time
 
+from src.utils.jobs import checkpoint
 
-def save_data(data, filename):
-    """Save the data to a file using the pickle module."""
-    with open(filename, "wb") as f:
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+# Values indexed between two progress checkpoints while an index is built
+INDEX_CHECKPOINT_EVERY = 10000
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+RECORD_STORE_EXTENSIONS = (".rec",)
+
+SaveStats = namedtuple("SaveStats", ["filename", "bytes_written", "seconds"])
+
+
+class PersistentDict(UserDict):
+    """
+    A UserDict that tracks whether it changed and reports its mutations to a journal.
+
+    Subclasses call `_log` after every change. The attributes named in `_transient` (the
+    journal, the dirty flag and the derived indexes) are not pickled.
+
+    Secondary indexes are listed in `INDEXES`. Each one is built from the stored values the
+    first time `_index` asks for it; afterwards subclasses keep it current by calling
+    `add`, `discard` or `update` with the changed value on every built index. An index
+    with a `finish` method has it called once it is built, so it is complete before
+    anything else can see it.
+    """
+    journal = None
+    dirty = False
+    # Incremented on every mutation, so caches derived from the data can tell they are stale
+    changes = 0
+    INDEXES = {}
+    _transient = ("journal", "dirty", "changes", "_indexes")
+
+    def _log(self, op, key, value=None):
+        """Mark the data as changed and append the mutation to the journal, if one is attached."""
+        self.dirty = True
+        self.changes += 1
+        if self.journal is not None:
+            self.journal.append(op, key, value)
+
+    def _log_many(self, op, items):
+        """Like `_log` for a batch of (key, value) pairs, written to the journal in one go."""
+        if not items:
+            return
+        self.dirty = True
+        self.changes += len(items)
+        if self.journal is not None:
+            self.journal.append_many(op, items)
+
+    def _adopt(self, value):
+        """Hook called for every value restored from a journal entry."""
+
+    def _index(self, name, build=True):
+        """
+        Returns a secondary index, building it from the stored values on first use.
+
+        Args:
+            name (str): The key of the index in INDEXES.
+            build (bool): Whether to build the index if it is not built yet. Threads other
+                than the one changing the book pass False, and get None instead.
+        """
+        if not build:
+            return self.__dict__.get("_indexes", {}).get(name)
+        indexes = self.__dict__.setdefault("_indexes", {})
+        if name not in indexes:
+            index = self.INDEXES[name]()
+            # Indexes over the keys alone are built without decoding any value
+            by_key = hasattr(index, "add_key")
+            add = index.add_key if by_key else index.add
+            total = len(self.data)
+            for count, item in enumerate(self.data if by_key else self.data.values(), start=1):
+                add(item)
+                if count % INDEX_CHECKPOINT_EVERY == 0:
+                    # A cancelled build stops here and the partial index is dropped
+                    checkpoint(count, total, f"values added to the {name} index")
+            finish = getattr(index, "finish", None)
+            if finish is not None:
+                finish()
+            indexes[name] = index
+        return indexes[name]
+
+    def page(self, number, size):
+        """
+        Returns the values on one page, in storage order, decoding only those values.
+
+        Args:
+            number (int): The page number, starting from 1.
+            size (int): The number of values per page.
+        """
+        start = (number - 1) * size
+        # A database-backed book fetches the page with a LIMIT/OFFSET query
+        page = getattr(self.data, "page", None)
+        if page is not None:
+            return page(start, size)
+        return [self.data[key] for key in islice(self.data, start, start + size)]
+
+    def _built_indexes(self):
+        return self.__dict__.get("_indexes", {}).values()
+
+    def apply(self, op, key, value=None):
+        """
+        Applies a single journal entry to the data without logging it again.
+
+        Replayed entries bypass the secondary indexes, so these are rebuilt on next use.
+
+        Args:
+            op (str): Either "put" or "delete".
+            key (str): The key the entry refers to.
+            value: The stored value for "put" entries.
+        """
+        self.__dict__.pop("_indexes", None)
+        self.changes += 1
+        if op == "put":
+            self.data[key] = value
+            self._adopt(value)
+        elif op == "delete":
+            self.data.pop(key, None)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups the mutations made inside the block into one unit written by the next save.
+
+        Mutations are not journaled inside the block and stores that commit in batches hold
+        their commits, so nothing reaches the disk until the book is saved. If the block
+        raises, stores that support it roll back, and the caller should not save the book.
+        """
+        journal, self.journal = self.journal, None
+        deferring = hasattr(self.data, "deferred")
+        if deferring:
+            self.data.deferred = True
+        try:
+            yield self
+        except BaseException:
+            if deferring:
+                self.data.rollback()
+            raise
+        finally:
+            self.journal = journal
+            if deferring:
+                self.data.deferred = False
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self._transient}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class Journal:
+    """
+    Append-only log of the mutations made to a book since its last snapshot.
+
+    The active log lives in `<filename>.journal`. When it passes the size threshold it is
+    renamed to a numbered segment, and a background thread folds the sealed segments into
+    the backend's snapshot so the cost of a write depends on the size of the change only.
+
+    Only one compaction runs at a time. Once it is done, the next one waits until the log
+    has grown by the threshold or by the size of the snapshot just written, whichever is
+    larger, counted from the end of the log at that moment. A bulk write therefore rewrites
+    the snapshot a logarithmic number of times instead of once per threshold.
+    """
+
+    def __init__(self, backend, default_factory=None, threshold=JOURNAL_COMPACT_BYTES):
+        self.backend = backend
+        self.path = backend.filename + JOURNAL_SUFFIX
+        self.default_factory = default_factory
+        self.threshold = threshold
+        self._file = None
+        self._lock = threading.Lock()
+        self._compactor = None
+        # The size of the active log at which the next compaction starts
+        self._compact_at = threshold
+
+    def append(self, op, key, value=None):
+        """Writes one entry to the active log, fsyncs it and starts a compaction when the log is too big."""
+        self._write(pickle.dumps((op, key, value), protocol=pickle.HIGHEST_PROTOCOL))
+
+    def append_many(self, op, items):
+        """Writes one entry per (key, value) pair with a single fsync."""
+        self._write(b"".join(pickle.dumps((op, key, value), protocol=pickle.HIGHEST_PROTOCOL)
+                             for key, value in items))
+
+    def _write(self, entries):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(entries)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            due = self._file.tell() >= self._compact_at
+        if due:
+            self.compact()
+
+    def segments(self):
+        """Returns the sealed segments in the order they were written."""
+        found = glob.glob(glob.escape(self.path) + ".*")
+        return sorted((p for p in found if p.rsplit(".", 1)[1].isdigit()),
+                      key=lambda p: int(p.rsplit(".", 1)[1]))
+
+    def replay(self, target):
+        """
+        Applies the sealed segments and the active log to the target book.
+
+        A torn entry at the end of the active log (left by a crash mid-write) is cut off,
+        so later appends do not land behind unreadable bytes.
+
+        Returns:
+            bool: True if any entry was applied.
+        """
+        applied = False
+        for segment in self.segments():
+            applied = _replay_file(segment, target) > 0 or applied
+        good = _replay_file(self.path, target)
+        if good is not None and good < os.path.getsize(self.path):
+            os.truncate(self.path, good)
+        return applied or bool(good)
+
+    def compact(self):
+        """Seals the active log and folds the sealed segments into the snapshot in the background."""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                numbers = [int(p.rsplit(".", 1)[1]) for p in self.segments()]
+                os.replace(self.path, f"{self.path}.{max(numbers, default=0) + 1}")
+            # Nothing else is compacted until this compaction is done
+            self._compact_at = float("inf")
+            self._compactor = threading.Thread(target=self._compact, daemon=True)
+            self._compactor.start()
+
+    def _compact(self):
+        size = 0
+        try:
+            segments = self.segments()
+            if segments:
+                target = self.backend.read_snapshot(self.default_factory)
+                for segment in segments:
+                    _replay_file(segment, target)
+                size = self.backend.write_snapshot(target) or 0
+                for segment in segments:
+                    os.remove(segment)
+        finally:
+            with self._lock:
+                written = self._file.tell() if self._file is not None else _file_size(self.path)
+                self._compact_at = written + max(self.threshold, size)
+
+    def wait(self):
+        """Blocks until a running compaction has finished."""
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def reset(self):
+        """Drops every journal file once a full snapshot has been written."""
+        self.wait()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for path in self.segments() + [self.path]:
+                if os.path.exists(path):
+                    os.remove(path)
+            self._compact_at = self.threshold
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _replay_file(path, target):
+    """Applies every complete entry of a journal file and returns the offset after the last one."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        good = 0
+        while True:
+            try:
+                op, key, value = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+                return good
+            target.apply(op, key, value)
+            good = f.tell()
+
+
+def _write_atomic(filename, data):
+    """Pickles the data into an fsynced temporary file, renames it over the target and returns its size."""
+    tmp = f"{filename}.tmp"
+    with open(tmp, "wb") as f:
         pickle.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp, filename)
+    return size
 
 
-def load_data(filename, default_factory=None):
-    """Load the data from a file using the pickle module."""
+class StorageBackend:
+    """
+    Base class for the storage engines behind `load_data` and `save_data`.
+
+    Attributes:
+        filename (str): The data file the backend reads and writes.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def load(self, default_factory=None):
+        """Loads a book from the data file, or builds an empty one with the default factory."""
+        raise NotImplementedError
+
+    def save(self, data):
+        """Persists the book and returns SaveStats, or None if there was nothing to write."""
+        raise NotImplementedError
+
+
+class JournaledBackend(StorageBackend):
+    """
+    Base class for backends that keep a snapshot file plus a journal of later mutations.
+
+    Subclasses only define how a snapshot is read and written.
+    """
+
+    def read_snapshot(self, default_factory=None):
+        """Reads the book from the snapshot file, without replaying the journal."""
+        raise NotImplementedError
+
+    def write_snapshot(self, data):
+        """Atomically replaces the snapshot file with the book and returns the bytes written."""
+        raise NotImplementedError
+
+    def load(self, default_factory=None):
+        data = self.read_snapshot(default_factory)
+        if isinstance(data, PersistentDict):
+            journal = Journal(self, default_factory)
+            # Unsaved journal entries make the snapshot stale, so the next save folds them in
+            data.dirty = journal.replay(data)
+            data.journal = journal
+        return data
+
+    def save(self, data):
+        tracked = isinstance(data, PersistentDict)
+        if tracked and not data.dirty:
+            return None
+        start = time.perf_counter()
+        if tracked and data.journal is not None:
+            data.journal.wait()
+        size = self.write_snapshot(data)
+        if tracked:
+            if data.journal is not None:
+                data.journal.reset()
+            data.dirty = False
+        return SaveStats(self.filename, size, time.perf_counter() - start)
+
+
+class PickleBackend(JournaledBackend):
+    """Keeps a whole book as one pickle snapshot plus a journal of later mutations."""
+
+    def read_snapshot(self, default_factory=None):
+        return load_snapshot(self.filename, default_factory)
+
+    def write_snapshot(self, data):
+        return _write_atomic(self.filename, data)
+
+
+def get_backend(filename):
+    """Returns the storage backend for a data file, chosen by the file extension."""
+    extension = os.path.splitext(filename)[1]
+    if extension in SQLITE_EXTENSIONS:
+        from src.utils.sqlite_storage import SQLiteBackend
+        return SQLiteBackend(filename)
+    if extension in RECORD_STORE_EXTENSIONS:
+        from src.utils.record_store import RecordStoreBackend
+        return RecordStoreBackend(filename)
+    return PickleBackend(filename)
+
+
+def save_data(data, filename):
+    """
+    Save the data to a file using the storage backend matching its extension.
+
+    Books that did not change since they were loaded or last saved are skipped.
+
+    Returns:
+        SaveStats or None: The number of bytes written and the time the save took,
+                           or None if the save was skipped.
+    """
+    return get_backend(filename).save(data)
+
+
+def load_snapshot(filename, default_factory=None):
+    """Load the last full snapshot from a file using the pickle module."""
     try:
         with open(filename, "rb") as f:
             return pickle.load(f)
@@ -19,3 +433,8 @@ def load_data(filename, default_factory=None):
             return default_factory()
         raise FileNotFoundError(
             f"The file '{filename}' was not found, and no default factory was provided.") from exc
+
+
+def load_data(filename, default_factory=None):
+    """Load the data from a file using the storage backend matching its extension."""
+    return get_backend(filename).load(default_factory)
@@ -0,0 +1,226 @@
+"""This module provides a memory-mapped record store for the address book and the notebook.
+
+A store file starts with a fixed header pointing at a key index. The index holds, for
+every key, the offset and length of its pickled payload plus a permutation sorted by key,
+so a lookup is a binary search over the mapped file. Nothing is unpickled at startup: a
+`Record` or `Note` is decoded only when it is accessed, and decoded objects are kept in a
+bounded LRU cache.
+
+File layout:
+    header   - magic, record count, offset of the entry table, offset of the sorted permutation
+    payloads - pickled values, in insertion order
+    keys     - UTF-8 encoded keys
+    entries  - (key offset, key length, payload offset, payload length) per record
+    sorted   - entry numbers ordered by key bytes
+"""
+
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import mmap
+import os
+import pickle
+import struct
+
+from src.utils.persistence import JournaledBackend
+
+MAGIC = b"ABRSTOR1"
+HEADER = struct.Struct("<8sQQQ")
+ENTRY = struct.Struct("<QIQI")
+POSITION = struct.Struct("<I")
+CACHE_SIZE = 1024
+
+
+class RecordStore(MutableMapping):
+    """
+    A mapping over a store file that decodes values lazily.
+
+    Changes are kept in memory on top of the mapped file until the store is rewritten
+    by `write`; unchanged payloads are then copied over without being decoded.
+    """
+
+    def __init__(self, filename, adopt=None, cache_size=CACHE_SIZE):
+        self.filename = filename
+        self._adopt = adopt
+        self._cache_size = cache_size
+        self._open()
+
+    def _open(self):
+        self._mm = None
+        self._count = 0
+        self._cache = OrderedDict()
+        self._changed = {}
+        self._added = set()
+        self._deleted = set()
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0:
+            return
+        with open(self.filename, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._entries, self._sorted = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"The file '{self.filename}' is not a record store.")
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._mm, self._entries + i * ENTRY.size)
+
+    def _key(self, i):
+        key_offset, key_length, _, _ = self._entry(i)
+        return self._mm[key_offset:key_offset + key_length]
+
+    def _payload(self, i):
+        _, _, offset, length = self._entry(i)
+        return self._mm[offset:offset + length]
+
+    def _find(self, key):
+        """Returns the entry number of a key in the mapped file, or -1."""
+        wanted = key.encode()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            i = POSITION.unpack_from(self._mm, self._sorted + middle * POSITION.size)[0]
+            found = self._key(i)
+            if found < wanted:
+                low = middle + 1
+            elif found > wanted:
+                high = middle
+            else:
+                return i
+        return -1
+
+    def _in_file(self, key):
+        return self._count > 0 and self._find(key) >= 0
+
+    def __getitem__(self, key):
+        if key in self._changed:
+            return self._changed[key]
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        i = self._find(key) if key not in self._deleted and self._count else -1
+        if i < 0:
+            raise KeyError(key)
+        value = pickle.loads(self._payload(i))
+        if self._adopt is not None:
+            self._adopt(value)
+        self._cache[key] = value
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def __setitem__(self, key, value):
+        self._cache.pop(key, None)
+        if key in self._deleted:
+            self._deleted.discard(key)
+        elif key not in self._changed and not self._in_file(key):
+            self._added.add(key)
+        self._changed[key] = value
+
+    def __delitem__(self, key):
+        self._cache.pop(key, None)
+        if key in self._changed:
+            del self._changed[key]
+            if key in self._added:
+                self._added.discard(key)
+            else:
+                self._deleted.add(key)
+        elif key not in self._deleted and self._in_file(key):
+            self._deleted.add(key)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._changed or (key not in self._deleted and self._in_file(key))
+
+    def __iter__(self):
+        for i in range(self._count):
+            key = self._key(i).decode()
+            if key not in self._deleted:
+                yield key
+        yield from (key for key in self._changed if key in self._added)
+
+    def __len__(self):
+        return self._count - len(self._deleted) + len(self._added)
+
+    def values(self):
+        return (self[key] for key in self)
+
+    def raw_items(self):
+        """Yields (key, payload) pairs, copying unchanged payloads straight from the mapped file."""
+        for i in range(self._count):
+            key = self._key(i).decode()
+            if key in self._deleted:
+                continue
+            if key in self._changed:
+                yield key, pickle.dumps(self._changed[key], protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                yield key, self._payload(i)
+        # Added keys follow in insertion order, as in `__iter__`, so saving keeps the order
+        for key in self._changed:
+            if key in self._added:
+                yield key, pickle.dumps(self._changed[key], protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(self):
+        """Rewrites the store file with the pending changes and maps the new file."""
+        size = write_store(self.filename, self.raw_items())
+        cache = {**self._cache, **self._changed}
+        self.close()
+        self._open()
+        # Objects already handed out stay valid: they match the payloads just written
+        self._cache.update(list(cache.items())[-self._cache_size:])
+        return size
+
+    def close(self):
+        """Unmaps the store file."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def write_store(filename, items):
+    """
+    Writes (key, payload) pairs to a new store file and atomically renames it into place.
+
+    Returns:
+        int: The size of the written file in bytes.
+    """
+    tmp = f"{filename}.tmp"
+    keys, entries = [], []
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0, 0))
+        offset = HEADER.size
+        for key, payload in items:
+            keys.append(key.encode())
+            entries.append((offset, len(payload)))
+            f.write(payload)
+            offset += len(payload)
+        key_offsets = []
+        for key in keys:
+            key_offsets.append(offset)
+            f.write(key)
+            offset += len(key)
+        entries_offset = offset
+        for key, key_offset, (payload_offset, payload_length) in zip(keys, key_offsets, entries):
+            f.write(ENTRY.pack(key_offset, len(key), payload_offset, payload_length))
+        sorted_offset = f.tell()
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            f.write(POSITION.pack(i))
+        size = f.tell()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(keys), entries_offset, sorted_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+    return size
+
+
+class RecordStoreBackend(JournaledBackend):
+    """Keeps a book in a memory-mapped record store plus a journal of later mutations."""
+
+    def read_snapshot(self, default_factory=None):
+        if default_factory is None:
+            raise ValueError("The record store backend needs a default factory to build the book.")
+        data = default_factory()
+        data.data = RecordStore(self.filename, data._adopt)
+        return data
+
+    def write_snapshot(self, data):
+        return data.data.write()
@@ -0,0 +1,299 @@
+"""
+This module contains the interactive loop of the bot, which runs on asyncio.
+
+The prompt is read with `prompt_async`, so it stays responsive while a command works.
+Commands that need no book (help, stats, jobs, cancel) run on the event loop; every other
+command becomes a job on the worker thread of `src.utils.jobs`:
+- In the foreground, the loop waits for the job, shows its progress once it has taken
+  longer than a second, and Ctrl-C cancels it at its next checkpoint.
+- Ending the line with a separate `&` runs the command in the background: the prompt comes back at
+  once and the result is printed when the job finishes. The prompt belongs to the user,
+  so commands that always ask questions (CommandSpec.interactive) are refused before they
+  start, and optional offers made by a background command are declined.
+
+Questions asked by a foreground job (`ask` and `confirm`) are answered with a prompt on
+the event loop, through PromptInput.
+
+The index behind name completion is built by a background job at startup: completion
+runs on its own thread and only reads the books, never builds anything in them.
+
+Two optional background jobs run alongside the user's commands:
+- `--autosave SECONDS` saves the changed books periodically;
+- `--warm-indexes` builds the secondary indexes of the books one after the other, so the
+  first search or birthday listing does not wait for them.
+"""
+
+import asyncio
+import signal
+
+from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
+
+from src.constants.file_names import CONTACTS_FILE_NAME, NOTES_FILE_NAME
+from src.utils.command_registry import get_command
+from src.utils.jobs import JOBS, JobCancelled, current_job
+from src.utils.metrics import METRICS
+from src.utils.persistence import save_data
+from src.utils.sqlite_storage import SQLiteTable
+from src.utils.user_input import set_input
+from src.utils.utils import parse_input
+
+BACKGROUND_MARK = "&"
+# Seconds a foreground command runs before its progress is shown, and between updates
+PROGRESS_DELAY = 1.0
+PROGRESS_INTERVAL = 1.0
+# Seconds between checks for the end of a question asked by a foreground job
+PROMPT_POLL = 0.1
+
+
+async def _result(job):
+    """Waits for a job and returns its result; raises JobCancelled if it was cancelled."""
+    try:
+        return await asyncio.wrap_future(job.future)
+    except asyncio.CancelledError:
+        if not job.future.cancelled():
+            # This task was cancelled, not the job
+            raise
+        raise JobCancelled() from None
+
+
+class PromptInput:
+    """
+    Answers the questions of foreground jobs with a prompt on the event loop.
+
+    Attributes:
+        prompting (bool): Whether a question is waiting for an answer; progress lines
+            are held back meanwhile, so they do not land on the user's typing.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        # Answers are free text, so the session has no command completer
+        self.session = PromptSession()
+        self.prompting = False
+
+    async def _prompt(self, question):
+        self.prompting = True
+        try:
+            return await self.session.prompt_async(question)
+        except (KeyboardInterrupt, EOFError):
+            return None
+        finally:
+            self.prompting = False
+
+    def ask(self, question):
+        job = current_job()
+        if job is None:
+            # Not called from a job, so the event loop is not waiting for us
+            return input(question)
+        if job.background:
+            # Interactive commands are refused before they start, so this is a missing flag
+            raise ValueError(f"'{job.line}' asks questions, so it cannot run in the background.")
+        answer = asyncio.run_coroutine_threadsafe(self._prompt(question), self.loop).result()
+        if answer is None:
+            raise JobCancelled()
+        return answer
+
+    def confirm(self, question):
+        return self.ask(question)
+
+    def offer(self, question):
+        job = current_job()
+        if job is not None and job.background:
+            return "no"
+        return self.ask(question)
+
+
+def _on_interrupt(callback):
+    """Calls callback on Ctrl-C until the returned function is called."""
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, callback)
+    except (NotImplementedError, RuntimeError):
+        # No signal handlers on this platform or outside of the main thread
+        return lambda: None
+    return lambda: loop.remove_signal_handler(signal.SIGINT)
+
+
+def _split_background(args):
+    """
+    Returns the arguments without a trailing `&`, and whether it was there.
+
+    Only a separate last argument counts: an `&` at the end of a word belongs to the word.
+    """
+    if args and args[-1] == BACKGROUND_MARK:
+        return args[:-1], True
+    return args, False
+
+
+class Repl:
+    """
+    The interactive loop.
+
+    Attributes:
+        session (PromptSession): The session the commands are read with.
+        state (dict): The books by name ("book", "notebook").
+        autosave (float): Seconds between autosaves, or None.
+        warm_indexes (bool): Whether to build the secondary indexes in the background.
+    """
+
+    def __init__(self, session, state, autosave=None, warm_indexes=False):
+        self.session = session
+        self.state = state
+        self.autosave = autosave
+        self.warm_indexes = warm_indexes
+        self.input = None
+
+    async def run(self):
+        """Reads and runs commands until the user exits, then waits for the unfinished jobs."""
+        self.input = PromptInput(asyncio.get_running_loop())
+        previous = set_input(self.input)
+        # Name completion only reads the name index from its own thread, so the worker builds it
+        book = self.state["book"]
+        JOBS.submit("build the name_prefixes index", lambda: book._index("name_prefixes"), background=True)
+        tasks = []
+        if self.autosave:
+            tasks.append(asyncio.ensure_future(self._autosave()))
+        if self.warm_indexes:
+            tasks.append(asyncio.ensure_future(self._warm_indexes()))
+        try:
+            with patch_stdout(raw=True):
+                await self._read_commands()
+                await self._finish_jobs()
+        finally:
+            for task in tasks:
+                task.cancel()
+            set_input(previous)
+            JOBS.shutdown()
+
+    async def _read_commands(self):
+        while True:
+            try:
+                line = await self.session.prompt_async("Enter a command: ")
+            except KeyboardInterrupt:
+                print("\nUse 'close' or 'exit' to quit.")
+                continue
+            except EOFError:
+                return
+            if not line.strip():
+                continue
+            command, *args = parse_input(line)
+            args, background = _split_background(args)
+            spec = get_command(command)
+            if spec is None:
+                print("Invalid command.")
+                continue
+            if background and spec.interactive:
+                print(f"'{spec.name}' asks questions, so it cannot run in the background.")
+                continue
+            if spec.state is None and not background or spec.exits:
+                result = METRICS.measure(spec.name, spec.run, args, self.state)
+                if result is not None:
+                    print(result)
+                if spec.exits:
+                    return
+                continue
+            line = line.strip()
+            if background:
+                line = line[:-len(BACKGROUND_MARK)].rstrip()
+            job = JOBS.submit(line,
+                              lambda spec=spec, args=args: METRICS.measure(spec.name, spec.run, args, self.state),
+                              background)
+            if background:
+                print(f"[{job.number}] {job.line}")
+                asyncio.ensure_future(self._report_when_done(job))
+            else:
+                await self._wait(job)
+
+    async def _wait(self, job):
+        """Waits for a foreground job, showing its progress; Ctrl-C cancels it."""
+        restore = _on_interrupt(job.cancel)
+        progress = asyncio.ensure_future(self._show_progress(job))
+        try:
+            result = await _result(job)
+        except JobCancelled:
+            print("Cancelled.")
+            return
+        except Exception as e:
+            print(f"The command failed: {e!r}")
+            return
+        finally:
+            progress.cancel()
+            restore()
+        if result is not None:
+            print(result)
+
+    async def _show_progress(self, job):
+        await asyncio.sleep(PROGRESS_DELAY)
+        shown = None
+        while True:
+            if self.input.prompting:
+                # Nothing is shown while the job waits for an answer, and the delay starts over after it
+                while self.input.prompting:
+                    await asyncio.sleep(PROMPT_POLL)
+                await asyncio.sleep(PROGRESS_DELAY)
+                continue
+            if job.status == "queued":
+                text = "waiting for the background jobs before it"
+            else:
+                text = job.progress or "working"
+            if text != shown:
+                print(f"  ... {text} (Ctrl-C to cancel)")
+                shown = text
+            await asyncio.sleep(PROGRESS_INTERVAL)
+
+    async def _report_when_done(self, job):
+        try:
+            result = await _result(job)
+        except JobCancelled:
+            print(f"[{job.number}] cancelled: {job.line}")
+        except Exception as e:
+            print(f"[{job.number}] failed: {job.line}: {e!r}")
+        else:
+            print(f"[{job.number}] finished in {job.seconds:.1f} s: {job.line}")
+            if result is not None:
+                print(result)
+
+    async def _finish_jobs(self):
+        pending = JOBS.pending()
+        if not pending:
+            return
+        print(f"Waiting for {len(pending)} unfinished job(s); press Ctrl-C to cancel them.")
+        restore = _on_interrupt(lambda: [job.cancel() for job in JOBS.pending()])
+        try:
+            await asyncio.gather(*(_result(job) for job in pending), return_exceptions=True)
+        finally:
+            restore()
+
+    def _save_changed(self):
+        for name, file_name in (("book", CONTACTS_FILE_NAME), ("notebook", NOTES_FILE_NAME)):
+            save_data(self.state[name], file_name)
+
+    async def _autosave(self):
+        while True:
+            await asyncio.sleep(self.autosave)
+            books = (self.state["book"], self.state["notebook"])
+            if not any(book.dirty for book in books) or any(job.line == "autosave" for job in JOBS.pending()):
+                continue
+            job = JOBS.submit("autosave", self._save_changed, background=True)
+            try:
+                await _result(job)
+            except JobCancelled:
+                pass
+            except Exception as e:
+                print(f"Autosave failed: {e!r}")
+
+    async def _warm_indexes(self):
+        # One job per index, so the user's commands run in between
+        for name in ("book", "notebook"):
+            book = self.state[name]
+            if isinstance(book.data, SQLiteTable):
+                # The database answers searches with queries instead of indexes
+                continue
+            for index in book.INDEXES:
+                job = JOBS.submit(f"build the {index} index", lambda book=book, index=index: book._index(index),
+                                  background=True)
+                try:
+                    await _result(job)
+                except JobCancelled:
+                    return
@@ -0,0 +1,379 @@
+"""This module provides the SQLite storage backend for the address book and the notebook.
+
+Contacts and notes are stored in tables indexed by name, email, birthday, phone number
+and note tags; tag counts and tag queries are answered from the tag table.
+The tables are exposed to the books as mappings, so `AddressBook` and `NoteBook` keep
+their dictionary interface while lookups and searches run as SQL queries and only the
+matching rows are unpickled.
+
+The database has no separate journal: it runs in WAL mode with `synchronous=FULL`, and the
+book's writes are committed every time the book logs a mutation (one commit per change,
+or per batch for bulk merges), so each committed change has reached the disk like a
+journal entry would. Inside `PersistentDict.transaction` the commits are held until the
+book is saved.
+"""
+
+import calendar
+from collections.abc import MutableMapping
+import pickle
+import sqlite3
+import time
+import weakref
+
+from src.utils.persistence import StorageBackend, SaveStats
+
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    name TEXT PRIMARY KEY,
+    email TEXT,
+    birthday INTEGER,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_contacts_email ON contacts (email);
+CREATE INDEX IF NOT EXISTS idx_contacts_birthday ON contacts (birthday);
+CREATE TABLE IF NOT EXISTS contact_phones (
+    name TEXT NOT NULL,
+    phone INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_contact_phones_phone ON contact_phones (phone);
+CREATE INDEX IF NOT EXISTS idx_contact_phones_name ON contact_phones (name);
+
+CREATE TABLE IF NOT EXISTS notes (
+    title TEXT PRIMARY KEY,
+    title_lower TEXT NOT NULL,
+    text_lower TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS note_tags (
+    title TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_note_tags_tag ON note_tags (tag);
+CREATE INDEX IF NOT EXISTS idx_note_tags_title ON note_tags (title);
+"""
+
+
+class SQLiteTable(MutableMapping):
+    """
+    A mapping over one table, storing every value as a pickled payload next to its key.
+
+    Decoded objects are kept in a weak cache, so two lookups of the same key return the
+    same object for as long as it is in use.
+
+    Attributes:
+        pending (int): The number of writes not committed yet.
+        pending_bytes (int): The size of the payloads written since the last commit.
+        deferred (bool): Whether commits are held until the book is saved.
+    """
+    table = None
+    key_column = None
+
+    def __init__(self, conn, adopt=None):
+        self._conn = conn
+        self._adopt = adopt
+        self._live = weakref.WeakValueDictionary()
+        self.pending = 0
+        self.pending_bytes = 0
+        self.deferred = False
+
+    def _decode(self, key, payload):
+        value = self._live.get(key)
+        if value is None:
+            value = pickle.loads(payload)
+            self._live[key] = value
+            if self._adopt is not None:
+                self._adopt(value)
+        return value
+
+    def _select(self, where, params=()):
+        """Yields the decoded values of the rows matching a WHERE clause."""
+        sql = f"SELECT {self.key_column}, payload FROM {self.table} WHERE {where} ORDER BY rowid"
+        for key, payload in self._conn.execute(sql, params).fetchall():
+            yield self._decode(key, payload)
+
+    def _stream(self, where, params=()):
+        """
+        Like `_select`, but fetches the rows in batches of BATCH_SIZE instead of all at once.
+
+        The table must not be written to while the rows are being consumed.
+        """
+        sql = f"SELECT {self.key_column}, payload FROM {self.table} WHERE {where} ORDER BY rowid"
+        cursor = self._conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            for key, payload in rows:
+                yield self._decode(key, payload)
+
+    def upgrade(self):
+        """Brings a database written by an older version of the schema up to date."""
+
+    def _write(self, key, value, payload):
+        raise NotImplementedError
+
+    def _wrote(self, size):
+        self.pending += 1
+        self.pending_bytes += size
+
+    def commit(self):
+        """Commits the open transaction and returns the number of payload bytes it wrote."""
+        self._conn.commit()
+        size = self.pending_bytes
+        self.pending = self.pending_bytes = 0
+        return size
+
+    def rollback(self):
+        """Discards the writes made since the last commit."""
+        self._conn.rollback()
+        self._live.clear()
+        self.pending = self.pending_bytes = 0
+
+    def __getitem__(self, key):
+        value = self._live.get(key)
+        if value is not None:
+            return value
+        row = self._conn.execute(
+            f"SELECT payload FROM {self.table} WHERE {self.key_column} = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._decode(key, row[0])
+
+    def __setitem__(self, key, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(key, value, payload)
+        self._live[key] = value
+        self._wrote(len(payload))
+
+    def __delitem__(self, key):
+        cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+        self._live.pop(key, None)
+        self._wrote(0)
+
+    def __contains__(self, key):
+        return self._conn.execute(
+            f"SELECT 1 FROM {self.table} WHERE {self.key_column} = ?", (key,)).fetchone() is not None
+
+    def __iter__(self):
+        # Keys are fetched in batches, so a partial iteration reads only the rows it uses
+        cursor = self._conn.execute(f"SELECT {self.key_column} FROM {self.table} ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            for (key,) in rows:
+                yield key
+
+    def page(self, start, size):
+        """
+        Returns `size` values in storage order, starting at position `start`, with one query.
+
+        Args:
+            start (int): The position of the first value, starting from 0.
+            size (int): The number of values.
+        """
+        rows = self._conn.execute(
+            f"SELECT {self.key_column}, payload FROM {self.table} ORDER BY rowid LIMIT ? OFFSET ?",
+            (size, start)).fetchall()
+        return [self._decode(key, payload) for key, payload in rows]
+
+    def __len__(self):
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def values(self):
+        return self._select("1")
+
+
+class ContactTable(SQLiteTable):
+    """
+    The contacts table, indexed by name, casefolded email and birthday (month * 100 + day),
+    plus a separate table of packed phone numbers.
+    """
+    table = "contacts"
+    key_column = "name"
+    # Version 1 added the contact_phones table
+    VERSION = 1
+
+    def upgrade(self):
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= self.VERSION:
+            return
+        # Fill the phone table from the contacts stored before it existed
+        self._conn.execute("DELETE FROM contact_phones")
+        for record in self._select("1"):
+            self._conn.executemany("INSERT INTO contact_phones (name, phone) VALUES (?, ?)",
+                                   [(record.name.value, number) for number in record.phone_numbers])
+        self._conn.execute(f"PRAGMA user_version = {self.VERSION}")
+        self._conn.commit()
+
+    def _write(self, key, value, payload):
+        email = str(value.email).casefold() if value.email else None
+        birthday = value.birthday.date.month * 100 + value.birthday.date.day if value.birthday else None
+        self._conn.execute(
+            "INSERT INTO contacts (name, email, birthday, payload) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET email = excluded.email, "
+            "birthday = excluded.birthday, payload = excluded.payload",
+            (key, email, birthday, payload))
+        self._conn.execute("DELETE FROM contact_phones WHERE name = ?", (key,))
+        self._conn.executemany("INSERT INTO contact_phones (name, phone) VALUES (?, ?)",
+                               [(key, number) for number in value.phone_numbers])
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._conn.execute("DELETE FROM contact_phones WHERE name = ?", (key,))
+
+    def phone_owners(self, number):
+        """Returns the set of names of the contacts using a packed phone number."""
+        rows = self._conn.execute("SELECT name FROM contact_phones WHERE phone = ?", (number,))
+        return {name for (name,) in rows}
+
+    def find_by_email(self, email):
+        """Returns the first record with the given email (case-insensitive), or None."""
+        return next(self._select("email = ?", (email.casefold(),)), None)
+
+    def select_contacts(self, has_birthday=False, has_email=False):
+        """Streams the records, optionally only those with a birthday and/or an email."""
+        conditions = ["1"]
+        if has_birthday:
+            conditions.append("birthday IS NOT NULL")
+        if has_email:
+            conditions.append("email IS NOT NULL")
+        return self._stream(" AND ".join(conditions))
+
+    def find_birthdays(self, start, end):
+        """
+        Yields the records whose birthday (month and day) falls between two dates.
+
+        Args:
+            start (date): The first day of the window.
+            end (date): The last day of the window.
+        """
+        low, high = start.month * 100 + start.day, end.month * 100 + end.day
+        if high == 228 and not calendar.isleap(end.year):
+            # 29 February birthdays are celebrated on 28 February in non-leap years
+            high = 229
+        if (end - start).days >= 365:
+            return self._select("birthday IS NOT NULL")
+        if low <= high:
+            return self._select("birthday BETWEEN ? AND ?", (low, high))
+        # The window wraps around the new year
+        return self._select("birthday >= ? OR birthday <= ?", (low, high))
+
+
+class NoteTable(SQLiteTable):
+    """The notes table with lowercased search columns, plus a separate table of indexed tags."""
+    table = "notes"
+    key_column = "title"
+
+    def _write(self, key, value, payload):
+        self._conn.execute(
+            "INSERT INTO notes (title, title_lower, text_lower, payload) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (title) DO UPDATE SET title_lower = excluded.title_lower, "
+            "text_lower = excluded.text_lower, payload = excluded.payload",
+            (key, value.title.value.lower(), value.text.value.lower(), payload))
+        self._conn.execute("DELETE FROM note_tags WHERE title = ?", (key,))
+        self._conn.executemany("INSERT INTO note_tags (title, tag) VALUES (?, ?)",
+                               [(key, tag.lower()) for tag in value.tags.tags])
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._conn.execute("DELETE FROM note_tags WHERE title = ?", (key,))
+
+    def find_notes(self, search_term, search_in):
+        """
+        Returns the notes containing the search term (case-insensitive) in the given field.
+
+        Args:
+            search_term (str): The substring to look for.
+            search_in (str): One of 'title', 'text', 'tags' or 'all'.
+        """
+        term = search_term.lower()
+        title = "instr(title_lower, ?) > 0"
+        text = "instr(text_lower, ?) > 0"
+        tags = "title IN (SELECT title FROM note_tags WHERE instr(tag, ?) > 0)"
+        if search_in == "title":
+            return list(self._select(title, (term,)))
+        if search_in == "text":
+            return list(self._select(text, (term,)))
+        if search_in == "tags":
+            return list(self._select(tags, (term,)))
+        return list(self._select(f"{title} OR {text} OR {tags}", (term, term, term)))
+
+    def tag_counts(self):
+        """Returns (tag, number of notes) pairs, most used tags first."""
+        return self._conn.execute(
+            "SELECT tag, COUNT(*) AS notes FROM note_tags GROUP BY tag ORDER BY notes DESC, tag").fetchall()
+
+    def find_by_tags(self, tree):
+        """
+        Returns the notes matching a parsed tag query, in notebook order.
+
+        Every tag of the query becomes a lookup in `idx_note_tags_tag`.
+
+        Args:
+            tree (tuple): The query, as returned by `src.notes.notebook.parse_tag_query`.
+        """
+        params = []
+
+        def condition(node):
+            if node[0] == "tag":
+                params.append(node[1])
+                return "title IN (SELECT title FROM note_tags WHERE tag = ?)"
+            if node[0] == "not":
+                return f"NOT ({condition(node[1])})"
+            operator = "AND" if node[0] == "and" else "OR"
+            return f"({condition(node[1])}) {operator} ({condition(node[2])})"
+
+        where = condition(tree)
+        return list(self._select(where, params))
+
+
+class CommitLog:
+    """
+    Takes the place of the journal for a database-backed book: the database logs the
+    writes itself, so every mutation the book reports only commits them.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def append(self, op, key, value=None):
+        if not self.table.deferred:
+            self.table.commit()
+
+    def append_many(self, op, items):
+        self.append(op, None)
+
+
+class SQLiteBackend(StorageBackend):
+    """Stores a book in an SQLite database, one table per kind of book."""
+    TABLES = {"contacts": ContactTable, "notes": NoteTable}
+
+    def load(self, default_factory=None):
+        if default_factory is None:
+            raise ValueError("The SQLite backend needs a default factory to build the book.")
+        # The interactive loop runs commands on a worker thread, one at a time (see src.utils.jobs)
+        conn = sqlite3.connect(self.filename, check_same_thread=False)
+        # With write-ahead logging a commit appends to the WAL file and fsyncs it once
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = FULL")
+        conn.executescript(SCHEMA)
+        data = default_factory()
+        data.data = self.TABLES[data.storage_kind](conn, data._adopt)
+        data.data.upgrade()
+        data.journal = CommitLog(data.data)
+        return data
+
+    def save(self, data):
+        table = data.data
+        if not table.pending:
+            # Every change was committed when it was made
+            data.dirty = False
+            return None
+        start = time.perf_counter()
+        size = table.commit()
+        data.dirty = False
+        return SaveStats(self.filename, size, time.perf_counter() - start)
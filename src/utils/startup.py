@@ -0,0 +1,36 @@
+"""This module contains the StartupProfile class used by `main.py --startup-profile`."""
+
+import time
+
+
+class StartupProfile:
+    """
+    Records how long each startup phase takes.
+
+    Attributes:
+        started (float): The perf_counter value startup is measured from.
+        phases (list): (phase name, seconds) pairs in the order the phases ran.
+    """
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases = []
+        self._mark = self.started
+
+    def lap(self, name):
+        """Ends the current phase under the given name and starts the next one."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._mark))
+        self._mark = now
+
+    @property
+    def total(self):
+        """The time from the start of the profile to the end of the last phase, in seconds."""
+        return self._mark - self.started
+
+    def report(self):
+        """Returns the breakdown as printable lines, one per phase plus the total."""
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = [f"{name:<{width}}  {seconds * 1000:8.1f} ms" for name, seconds in self.phases]
+        lines.append(f"{'total':<{width}}  {self.total * 1000:8.1f} ms")
+        return "\n".join(lines)
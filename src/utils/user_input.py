@@ -0,0 +1,75 @@
+"""
+This module contains the functions command handlers use to ask the user for input.
+
+Handlers call `ask` for data (a note title, a search term), `confirm` for yes/no
+questions that decide what a command does (deleting a contact), and `offer` for optional
+yes/no offers that lead to more questions (adding more details to a new contact), instead
+of calling `input()` directly. By default all of them read from the terminal; batch mode
+installs a ScriptInput so the answers come from the command script, the confirmations
+from a command line flag, and every offer is declined, as a script cannot know whether
+the line after a command answers an offer or is the next command.
+"""
+
+
+class TerminalInput:
+    """Reads answers from the terminal."""
+
+    def ask(self, question):
+        return input(question)
+
+    def confirm(self, question):
+        return input(question)
+
+    def offer(self, question):
+        return input(question)
+
+
+class ScriptInput:
+    """
+    Reads answers from the lines of a command script.
+
+    Attributes:
+        lines (iterator): The remaining script lines, shared with the batch runner.
+        answer (str): The answer given to every yes/no question, "yes" or "no".
+    """
+
+    def __init__(self, lines, answer="no"):
+        self.lines = lines
+        self.answer = answer
+
+    def ask(self, question):
+        try:
+            return next(self.lines)
+        except StopIteration:
+            raise ValueError(f"The script ended while waiting for an answer to: {question.strip()}") from None
+
+    def confirm(self, question):
+        return self.answer
+
+    def offer(self, question):
+        return "no"
+
+
+_source = TerminalInput()
+
+
+def set_input(source):
+    """Makes `ask` and `confirm` read from the given source and returns the previous one."""
+    global _source
+    previous, _source = _source, source
+    return previous
+
+
+def ask(question):
+    """Asks the user for a value and returns the answer."""
+    return _source.ask(question)
+
+
+def confirm(question):
+    """Asks the user a yes/no question and returns the answer as typed."""
+    return _source.confirm(question)
+
+
+def offer(question):
+    """Asks the user whether they want an optional extra step and returns the answer as typed."""
+    return _source.offer(question)
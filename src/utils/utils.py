@@ -1,16 +1,25 @@
 """The module with the utility functions."""
 
+from src.utils.metrics import METRICS
+
 
 def input_error(func):
-    """The decorator to handle exceptions in the functions."""
+    """
+    The decorator to handle exceptions in the functions.
+
+    The handled errors are counted as failures of the running command in the session metrics.
+    """
     def inner(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except KeyError:
+            METRICS.handled_error()
             return "Contact not found."
         except ValueError as e:
+            METRICS.handled_error()
             return str(e)
         except IndexError:
+            METRICS.handled_error()
             return "Invalid number of arguments."
     return inner
 
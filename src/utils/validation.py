@@ -0,0 +1,82 @@
+"""
+This module contains the validation path shared by the fields of contacts and notes.
+
+A validated field class implements `parse`, which turns the raw input into the value the
+field stores, or returns an error message. `parse` never raises for bad input, so the same
+code serves two callers:
+- the constructor, used by the commands, which raises ValueError with the message;
+- `validate_many`, which checks a batch of values (an import, a benchmark) and returns a
+  (field, error) pair per value instead of raising and catching an exception per failure.
+"""
+
+
+class Validated:
+    """
+    Mixin for field classes whose value is parsed and validated by `parse`.
+
+    Subclasses set `slot` to the name of the slot the parsed value is stored in.
+    """
+    __slots__ = ()
+    slot = "value"
+
+    def __init__(self, value):
+        """
+        Parses and validates the value, then stores it.
+
+        Raises:
+            ValueError: If the value is invalid.
+        """
+        parsed, error = self.parse(value)
+        if error is not None:
+            raise ValueError(error)
+        setattr(self, self.slot, parsed)
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Parses a raw value.
+
+        Returns:
+            tuple: (the value to store, None) if the value is valid, else (None, error message).
+        """
+        return value, None
+
+    @classmethod
+    def validate(cls, value, message=None):
+        """
+        Checks a raw value without building a field.
+
+        Args:
+            value: The raw value.
+            message (str): The error message to raise instead of the field's own, for
+                callers whose wording differs from the constructor's.
+
+        Raises:
+            ValueError: If the value is invalid.
+        """
+        error = cls.parse(value)[1]
+        if error is not None:
+            raise ValueError(message or error)
+
+    @classmethod
+    def from_parsed(cls, parsed):
+        """Builds a field from a value already returned by `parse`, without parsing it again."""
+        field = cls.__new__(cls)
+        setattr(field, cls.slot, parsed)
+        return field
+
+    @classmethod
+    def validate_many(cls, values):
+        """
+        Validates a batch of raw values.
+
+        Returns:
+            list: One (field, None) pair per valid value and (None, error message) per
+                invalid one, in order.
+        """
+        parse, build = cls.parse, cls.from_parsed
+        results = []
+        for value in values:
+            parsed, error = parse(value)
+            results.append((None, error) if error is not None else (build(parsed), None))
+        return results
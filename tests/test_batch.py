@@ -0,0 +1,33 @@
+import io
+
+from src.contacts.address_book import AddressBook
+from src.notes.notebook import NoteBook
+from src.utils.batch import run_batch
+
+
+def run(script, answer="no"):
+    state = {"book": AddressBook(), "notebook": NoteBook()}
+    stats = run_batch(io.StringIO(script), state, answer, quiet=True)
+    return state, stats
+
+
+def test_consecutive_add_contact_lines_under_yes():
+    state, stats = run("add-contact Anna Smith 0123456789\n"
+                       "add-contact Bob Brown 0987654321\n", answer="yes")
+    assert stats.commands == 2
+    assert state["book"].find("Anna Smith") is not None
+    assert state["book"].find("Bob Brown") is not None
+
+
+def test_confirmations_follow_the_answer():
+    script = "add-contact Anna 0123456789\ndelete-contact Anna\n"
+    state, _ = run(script, answer="no")
+    assert state["book"].find("Anna") is not None
+    state, _ = run(script, answer="yes")
+    assert state["book"].find("Anna") is None
+
+
+def test_questions_read_the_following_lines():
+    state, stats = run("add-note\nShopping\nMilk and bread\nhome\nall-notes\n")
+    assert stats.commands == 2
+    assert [note.title.value for note in state["notebook"].data.values()] == ["Shopping"]
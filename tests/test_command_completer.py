@@ -0,0 +1,38 @@
+import pytest
+from prompt_toolkit.completion import CompleteEvent
+from prompt_toolkit.document import Document
+
+from src.constants.controls import COMMANDS
+from src.contacts.address_book import AddressBook
+from src.contacts.record import Record
+from src.utils.command_completer import CommandCompleter
+
+
+@pytest.fixture
+def completer():
+    book = AddressBook()
+    for name in ("John Smith", "Jane Doe", "Bob"):
+        book.add_record(Record(name))
+    book._index("name_prefixes")
+    return CommandCompleter(COMMANDS.values(), book)
+
+
+def complete(completer, text):
+    return [completion.text for completion in completer.get_completions(Document(text), CompleteEvent())]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", sorted(COMMANDS.values())),
+    (" ", []),
+    ("sh", ["show-birthday", "show-contact"]),
+    ("show-contact jo", ["John Smith"]),
+    ("  show-contact  J", ["Jane Doe", "John Smith"]),
+])
+def test_completions(completer, text, expected):
+    assert complete(completer, text) == expected
+
+
+def test_names_are_not_offered_before_the_index_is_built():
+    book = AddressBook()
+    book.add_record(Record("John Smith"))
+    assert complete(CommandCompleter(COMMANDS.values(), book), "show-contact Jo") == []
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from src.contacts.address_book import AddressBook
+from src.contacts.indexes import FuzzyNameIndex
+from src.contacts.record import Record
+
+
+def build_book(*names):
+    book = AddressBook()
+    for name in names:
+        book.add_record(Record(name))
+    return book
+
+
+@pytest.mark.parametrize("typo", [
+    "Jonh Smith",     # swapped neighbours
+    "John Smyth",     # substitution
+    "John Smiths",    # insertion
+    "Jon Smith",      # deletion
+    "JOHN SMITH",     # case only
+])
+def test_suggests_names_one_edit_away(typo):
+    book = build_book("John Smith", "Jane Doe")
+    assert book.suggest_names(typo) == ["John Smith"]
+
+
+def test_names_two_edits_away_are_not_suggested():
+    # Two substitutions: the names share no single-deletion key
+    book = build_book("John Smith")
+    assert book.suggest_names("Jahn Smoth") == []
+
+
+def test_closest_refuses_distances_it_cannot_find():
+    index = FuzzyNameIndex()
+    index.add_key("John Smith")
+    with pytest.raises(ValueError):
+        index.closest("Jahn Smoth", max_distance=2)
+
+
+def test_suggestions_are_ranked_by_distance():
+    book = build_book("Anna", "Ann", "Hanna")
+    assert book.suggest_names("Anna") == ["Anna", "Ann", "Hanna"]
+
+
+def test_name_completion_reads_while_another_thread_writes():
+    book = build_book(*(f"Name {i:04}" for i in range(1000)))
+    index = book._index("name_prefixes")
+    records = [Record(f"Name {i:04}x") for i in range(1000)]
+    done = threading.Event()
+    errors = []
+
+    def write():
+        for _ in range(20):
+            for record in records:
+                index.add(record)
+            for record in records:
+                index.discard(record)
+        done.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not done.is_set():
+        try:
+            found = index.complete("name 0", limit=50)
+        except Exception as e:
+            errors.append(e)
+            break
+        if found != sorted(found, key=str.casefold):
+            errors.append(found)
+            break
+    writer.join()
+    assert not errors
+    assert index.complete("name 000") == [f"Name {i:04}" for i in range(10)]
@@ -0,0 +1,42 @@
+import json
+
+from src.utils.command_completer import FRAME_SECONDS, CompletionLatency
+from src.utils.metrics import Metrics
+
+
+def completion_latency():
+    latency = CompletionLatency()
+    latency.record(0.001)
+    latency.record(FRAME_SECONDS * 2)
+    latency.cancelled = 1
+    return latency
+
+
+def test_report_lists_commands_with_their_errors():
+    metrics = Metrics()
+    metrics.add("show-contact", 0.002)
+    metrics.add("show-contact", 0.004, failed=True)
+    line = metrics.report().splitlines()[1].split()
+    assert line[:3] == ["show-contact", "2", "1"]
+
+
+def test_report_includes_completion_latency():
+    metrics = Metrics()
+    assert "Name completion" not in metrics.report()
+    metrics.completion = completion_latency()
+    report = metrics.report()
+    assert "Name completion: completions: 2, cancelled: 1" in report
+    assert "over one frame: 1" in report
+
+
+def test_flush_writes_completion_counters(tmp_path):
+    metrics = Metrics()
+    metrics.add("hello", 0.001)
+    metrics.completion = completion_latency()
+    filename = tmp_path / "metrics.jsonl"
+    metrics.flush(filename)
+    lines = [json.loads(line) for line in filename.read_text(encoding="utf-8").splitlines()]
+    assert [line.get("command") for line in lines] == ["hello", None]
+    assert lines[1]["completion"]["count"] == 2
+    assert lines[1]["completion"]["over_frame"] == 1
+    assert lines[1]["completion"]["cancelled"] == 1
@@ -0,0 +1,87 @@
+import io
+import os
+import subprocess
+import sys
+import tarfile
+from array import array
+from datetime import date
+
+import pytest
+
+from src.contacts.address_book import AddressBook
+from src.notes.notebook import NoteBook
+from src.utils.persistence import load_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Saves an address book and a notebook with the classes of the first commit
+BASELINE_SCRIPT = """
+from src.contacts.address_book import AddressBook
+from src.contacts.record import Record
+from src.notes.note import Note
+from src.notes.notebook import NoteBook
+from src.utils.persistence import save_data
+
+book = AddressBook()
+record = Record("John Smith")
+record.add_phone("0501234567")
+record.add_phone("0671234567")
+record.add_birthday("29.02.1992")
+record.add_email("john@example.com")
+record.add_address("1 Main Street")
+book.add_record(record)
+book.add_record(Record("Jane"))
+save_data(book, "addressbook.pkl")
+
+notebook = NoteBook()
+notebook.add_note(Note("Plan", "Sprint plan", " Work ,  Very   Urgent,work"))
+save_data(notebook, "notebook.pkl")
+"""
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True).stdout
+
+
+@pytest.fixture(scope="module")
+def baseline_files(tmp_path_factory):
+    try:
+        first = git("rev-list", "--max-parents=0", "HEAD").split()[-1].decode()
+        archive = git("archive", "--format=tar", first, "src")
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("the first commit is not available")
+    directory = tmp_path_factory.mktemp("baseline")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    subprocess.run([sys.executable, "-c", BASELINE_SCRIPT], cwd=directory, check=True,
+                   env=dict(os.environ, PYTHONPATH=str(directory)))
+    return directory
+
+
+def test_baseline_record_loads_into_packed_phones(baseline_files):
+    book = load_data(str(baseline_files / "addressbook.pkl"), AddressBook)
+    record = book.data["John Smith"]
+    assert isinstance(record.phone_numbers, array)
+    assert record.phone_numbers.typecode == "q"
+    assert record.phone_numbers.tolist() == [501234567, 671234567]
+    assert [phone.value for phone in record.phones] == ["0501234567", "0671234567"]
+    assert record.birthday.date == date(1992, 2, 29)
+    assert str(record.email) == "john@example.com"
+    assert str(record.address) == "1 Main Street"
+    assert record._book is book
+    assert not hasattr(record, "__dict__")
+    assert book.data["Jane"].phone_numbers.tolist() == []
+
+
+def test_migrated_records_work_with_the_indexes(baseline_files):
+    book = load_data(str(baseline_files / "addressbook.pkl"), AddressBook)
+    assert [record.name.value for record in book.find_by_phone("0671234567")] == ["John Smith"]
+    with pytest.raises(ValueError):
+        book.data["John Smith"].add_phone("0501234567")
+
+
+def test_baseline_note_tags_are_normalized(baseline_files):
+    notebook = load_data(str(baseline_files / "notebook.pkl"), NoteBook)
+    note = notebook.data["Plan"]
+    assert note.tags.tags == ["work", "very urgent"]
+    assert [found.title.value for found in notebook.find_by_tags("very urgent")] == ["Plan"]
@@ -0,0 +1,143 @@
+import os
+import threading
+
+import pytest
+
+from src.contacts.address_book import AddressBook
+from src.contacts.record import Record
+from src.utils.persistence import JOURNAL_SUFFIX, Journal, PickleBackend, load_data, save_data
+
+
+def add(book, *names):
+    for name in names:
+        record = Record(name)
+        record.add_phone("0501234567")
+        book.add_record(record)
+
+
+def names(book):
+    return sorted(book.data)
+
+
+def test_unsaved_session_is_replayed(tmp_path):
+    filename = str(tmp_path / "book.pkl")
+    book = load_data(filename, AddressBook)
+    add(book, "Ann", "Bob")
+    save_data(book, filename)
+    add(book, "Carl")
+    book.delete("Bob")
+    book.data["Ann"].add_phone("0507654321")
+    # The session ends here without a save
+
+    loaded = load_data(filename, AddressBook)
+    assert names(loaded) == ["Ann", "Carl"]
+    assert loaded.data["Ann"].phone_numbers.tolist() == [501234567, 507654321]
+    # The snapshot is stale, so the next save must write it
+    assert loaded.dirty
+
+
+def test_saving_an_unchanged_book_is_skipped(tmp_path):
+    filename = str(tmp_path / "book.pkl")
+    book = load_data(filename, AddressBook)
+    add(book, "Ann")
+    assert save_data(book, filename).bytes_written == os.path.getsize(filename)
+    written = os.stat(filename).st_mtime_ns
+
+    assert save_data(book, filename) is None
+    assert save_data(load_data(filename, AddressBook), filename) is None
+    assert os.stat(filename).st_mtime_ns == written
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise RuntimeError("cannot pickle")
+
+
+def test_failed_save_keeps_the_previous_file(tmp_path):
+    filename = str(tmp_path / "book.pkl")
+    book = load_data(filename, AddressBook)
+    add(book, "Ann")
+    save_data(book, filename)
+    with open(filename, "rb") as f:
+        before = f.read()
+
+    book.data["Broken"] = Unpicklable()
+    book.dirty = True
+    with pytest.raises(RuntimeError):
+        save_data(book, filename)
+
+    with open(filename, "rb") as f:
+        assert f.read() == before
+    assert names(load_data(filename, AddressBook)) == ["Ann"]
+
+
+def test_torn_journal_tail_is_cut_off(tmp_path):
+    filename = str(tmp_path / "book.pkl")
+    journal_path = filename + JOURNAL_SUFFIX
+    book = load_data(filename, AddressBook)
+    add(book, "Ann", "Bob")
+    # A crash in the middle of the last entry
+    size = os.path.getsize(journal_path)
+    os.truncate(journal_path, size - 5)
+
+    loaded = load_data(filename, AddressBook)
+    assert names(loaded) == ["Ann"]
+    good = os.path.getsize(journal_path)
+    assert good < size - 5
+
+    # Entries appended after the trim are readable again
+    add(loaded, "Carl")
+    assert names(load_data(filename, AddressBook)) == ["Ann", "Carl"]
+
+
+class SlowBackend(PickleBackend):
+    """Holds every snapshot write until `release` is set."""
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write_snapshot(self, data):
+        self.writing.set()
+        assert self.release.wait(10)
+        return super().write_snapshot(data)
+
+
+def test_save_during_a_compaction_keeps_every_change(tmp_path):
+    filename = str(tmp_path / "book.pkl")
+    backend = SlowBackend(filename)
+    book = backend.load(AddressBook)
+    book.journal = Journal(backend, AddressBook, threshold=1)
+    add(book, "Ann")
+    # The first entry passed the threshold: the log is sealed and folded in the background
+    assert backend.writing.wait(10)
+    add(book, "Bob")
+    book.delete("Ann")
+
+    saver = threading.Thread(target=backend.save, args=(book,))
+    saver.start()
+    # The save waits for the compaction instead of writing the same snapshot concurrently
+    saver.join(0.2)
+    assert saver.is_alive()
+    backend.release.set()
+    saver.join(10)
+
+    assert not book.dirty
+    assert sorted(os.listdir(tmp_path)) == ["book.pkl"]
+    assert names(load_data(filename, AddressBook)) == ["Bob"]
+
+
+def test_compaction_folds_the_sealed_log_into_the_snapshot(tmp_path):
+    filename = str(tmp_path / "book.pkl")
+    backend = PickleBackend(filename)
+    book = backend.load(AddressBook)
+    book.journal = Journal(backend, AddressBook, threshold=1)
+    add(book, "Ann")
+    book.journal.wait()
+    # The next compaction waits until the log grows by the size of the new snapshot
+    add(book, "Bob")
+    book.journal.wait()
+
+    assert names(backend.read_snapshot(AddressBook)) == ["Ann"]
+    assert names(load_data(filename, AddressBook)) == ["Ann", "Bob"]
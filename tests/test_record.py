@@ -0,0 +1,28 @@
+import pytest
+
+from src.contacts.record import Record
+
+
+@pytest.fixture
+def record():
+    record = Record("John Smith")
+    record.add_phone("0501234567")
+    record.add_phone("0671234567")
+    return record
+
+
+def test_find_phone_returns_the_phone_without_printing(record, capsys):
+    assert record.find_phone("0671234567").value == "0671234567"
+    assert record.find_phone("0991234567") is None
+    assert record.find_phone("not a phone") is None
+    assert capsys.readouterr().out == ""
+
+
+def test_duplicate_phones_are_rejected(record):
+    with pytest.raises(ValueError, match="already has the phone 0501234567"):
+        record.add_phone("0501234567")
+    with pytest.raises(ValueError):
+        record.edit_phone("0671234567", "0501234567")
+    # Replacing a phone with itself is not a duplicate
+    record.edit_phone("0671234567", "0671234567")
+    assert record.phone_numbers.tolist() == [501234567, 671234567]
@@ -0,0 +1,71 @@
+from src.contacts.address_book import AddressBook
+from src.contacts.record import Record
+from src.utils.persistence import JOURNAL_SUFFIX, load_data, save_data
+from src.utils.record_store import RecordStore, write_store
+
+
+def build(filename, *names):
+    book = load_data(filename, AddressBook)
+    for name in names:
+        record = Record(name)
+        record.add_phone("0501234567")
+        book.add_record(record)
+    return book
+
+
+def test_round_trip_with_deleted_changed_and_added_keys(tmp_path):
+    filename = str(tmp_path / "book.rec")
+    book = build(filename, "Ann", "Bob", "Carl")
+    save_data(book, filename)
+
+    book = load_data(filename, AddressBook)
+    book.delete("Bob")
+    book.data["Ann"].add_phone("0507654321")
+    book.add_record(Record("Dora"))
+    save_data(book, filename)
+    book.data.close()
+
+    loaded = load_data(filename, AddressBook)
+    assert list(loaded.data) == ["Ann", "Carl", "Dora"]
+    assert len(loaded.data) == 3
+    assert "Bob" not in loaded.data
+    assert loaded.data["Ann"].phone_numbers.tolist() == [501234567, 507654321]
+    assert loaded.data["Carl"].phone_numbers.tolist() == [501234567]
+    assert loaded.data["Ann"]._book is loaded
+
+
+def test_unsaved_changes_are_replayed_from_the_journal(tmp_path):
+    filename = str(tmp_path / "book.rec")
+    save_data(build(filename, "Ann", "Bob"), filename)
+
+    book = load_data(filename, AddressBook)
+    book.delete("Ann")
+    book.add_record(Record("Carl"))
+    book.data.close()
+
+    loaded = load_data(filename, AddressBook)
+    assert sorted(loaded.data) == ["Bob", "Carl"]
+    assert loaded.dirty
+    save_data(loaded, filename)
+    assert not (tmp_path / ("book.rec" + JOURNAL_SUFFIX)).exists()
+
+
+def test_store_changes_stay_in_memory_until_written(tmp_path):
+    filename = str(tmp_path / "plain.rec")
+    write_store(filename, [("b", b"payload b"), ("a", b"payload a")])
+    store = RecordStore(filename)
+    assert list(store) == ["b", "a"]
+    assert "a" in store and "c" not in store
+
+    store["c"] = "new"
+    del store["b"]
+    # Deleting and re-adding a key stored in the file keeps it in its place
+    del store["a"]
+    store["a"] = "changed"
+    assert list(store) == ["a", "c"]
+    assert store["a"] == "changed"
+
+    store.write()
+    assert list(store) == ["a", "c"]
+    assert store["c"] == "new"
+    store.close()
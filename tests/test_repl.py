@@ -0,0 +1,16 @@
+import pytest
+
+from src.utils.repl import _split_background
+
+
+@pytest.mark.parametrize("args, expected", [
+    (["big.csv", "&"], (["big.csv"], True)),
+    (["&"], ([], True)),
+    (["big.csv"], (["big.csv"], False)),
+    ([], ([], False)),
+    # An `&` at the end of a word is part of the argument
+    (["text", "AT&"], (["text", "AT&"], False)),
+    (["X", "Smith&"], (["X", "Smith&"], False)),
+])
+def test_split_background(args, expected):
+    assert _split_background(args) == expected
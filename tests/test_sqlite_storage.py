@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.notes.note import Note
+from src.notes.notebook import NoteBook
+from src.utils.persistence import load_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NOTES = [
+    ("Plan", "Sprint plan", "work, Urgent"),
+    ("Groceries", "Milk and bread", "home"),
+    ("Report", "Quarterly report", "work,  done "),
+    ("Call mum", "Sunday", "home, urgent"),
+    ("Ideas", "No tags here", None),
+]
+
+
+def fill(notebook):
+    for title, text, tags in NOTES:
+        notebook.add_note(Note(title, text, tags))
+    return notebook
+
+
+@pytest.fixture
+def notebooks(tmp_path):
+    stored = fill(load_data(str(tmp_path / "notes.db"), NoteBook))
+    yield stored, fill(NoteBook())
+    stored.data._conn.close()
+
+
+def titles(notes):
+    return [note.title.value for note in notes]
+
+
+def test_tag_counts_come_from_the_tag_table(notebooks):
+    stored, in_memory = notebooks
+    assert stored.tag_counts() == [("home", 2), ("urgent", 2), ("work", 2), ("done", 1)]
+    assert stored.tag_counts() == in_memory.tag_counts()
+    assert "_indexes" not in stored.__dict__
+
+
+@pytest.mark.parametrize("query", [
+    "work",
+    "WORK and not done",
+    "urgent OR home",
+    "not work",
+    "(home or work) and not urgent",
+    "missing",
+])
+def test_tag_queries_match_the_in_memory_index(notebooks, query):
+    stored, in_memory = notebooks
+    assert titles(stored.find_by_tags(query)) == titles(in_memory.find_by_tags(query))
+    assert "_indexes" not in stored.__dict__
+
+
+def test_tag_queries_see_deleted_notes_go(notebooks):
+    stored, _ = notebooks
+    stored.delete_note("Plan")
+    assert titles(stored.find_by_tags("work")) == ["Report"]
+    assert ("urgent", 1) in stored.tag_counts()
+
+
+def test_pages_and_iteration_follow_storage_order(tmp_path):
+    stored = load_data(str(tmp_path / "notes.db"), NoteBook)
+    try:
+        for i in range(1234):
+            stored.add_note(Note(f"Note {i}", "text"))
+        expected = [f"Note {i}" for i in range(1234)]
+        assert list(stored.data) == expected
+        assert titles(stored.page(1, 10)) == expected[:10]
+        assert titles(stored.page(124, 10)) == expected[1230:]
+        # Notes on a page are the objects already in use, not fresh copies
+        assert stored.page(2, 10)[0] is stored.data["Note 10"]
+    finally:
+        stored.data._conn.close()
+
+
+def test_changes_survive_a_kill_without_saving(tmp_path):
+    filename = str(tmp_path / "notes.db")
+    script = f"""
+import os, signal
+from src.notes.note import Note
+from src.notes.notebook import NoteBook
+from src.utils.persistence import load_data
+
+notebook = load_data({filename!r}, NoteBook)
+notebook.add_note(Note("Kept", "text", "work"))
+notebook.add_note(Note("Gone", "text"))
+notebook.delete_note("Gone")
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+    process = subprocess.run([sys.executable, "-c", script], cwd=ROOT)
+    assert process.returncode != 0
+    stored = load_data(filename, NoteBook)
+    try:
+        assert list(stored.data) == ["Kept"]
+        assert stored.tag_counts() == [("work", 1)]
+    finally:
+        stored.data._conn.close()
+
+
+def test_a_failed_transaction_commits_nothing(tmp_path):
+    stored = load_data(str(tmp_path / "notes.db"), NoteBook)
+    try:
+        stored.add_note(Note("Before", "text"))
+        with pytest.raises(RuntimeError):
+            with stored.transaction():
+                stored.add_note(Note("Inside", "text"))
+                raise RuntimeError()
+        assert list(stored.data) == ["Before"]
+    finally:
+        stored.data._conn.close()
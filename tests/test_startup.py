@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("prompt_toolkit", "tabulate", "colorama", "asyncio")
+# A cold start with an empty book measures about 200 ms (`--startup-profile`, three runs);
+# slow CI machines can raise the budget with STARTUP_BUDGET_MS
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 1000))
+
+# Runs main() and reports which heavy modules were loaded when the welcome line was printed
+SCRIPT = f"""
+import builtins, json, sys
+import main
+
+loaded_at_welcome = None
+print_ = builtins.print
+
+def spy(*args, **kwargs):
+    global loaded_at_welcome
+    if loaded_at_welcome is None and args and str(args[0]).startswith("Welcome"):
+        loaded_at_welcome = sorted(m for m in sys.modules if m.split(".")[0] in {HEAVY_MODULES!r})
+    print_(*args, **kwargs)
+
+builtins.print = spy
+status = main.main(sys.argv[1:])
+print_("LOADED " + json.dumps(loaded_at_welcome))
+sys.exit(status)
+"""
+
+
+def run_main(directory, *args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, "-c", SCRIPT, *args], cwd=directory, env=env,
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60)
+
+
+def loaded_at_welcome(result):
+    line = next(line for line in result.stdout.splitlines() if line.startswith("LOADED "))
+    return json.loads(line[len("LOADED "):])
+
+
+def test_cold_start_fits_the_budget(tmp_path):
+    result = run_main(tmp_path, "--startup-profile", "--startup-budget", str(BUDGET_MS))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "total" in result.stdout
+
+
+def test_heavy_modules_are_not_loaded_before_the_welcome_line(tmp_path):
+    # Heavy modules loaded before the welcome line are the usual cause of a slow start
+    result = run_main(tmp_path, "--startup-profile")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert loaded_at_welcome(result) == []
+
+
+def test_startup_over_budget_fails(tmp_path):
+    result = run_main(tmp_path, "--startup-profile", "--startup-budget", "0")
+    assert result.returncode == 1
+    assert "longer than the budget" in result.stdout